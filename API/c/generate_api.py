@@ -47,7 +47,8 @@ class GenericType:
     type_params: list["GenericType"]
 
     def __init__(self, base_type: str, type_params: list["GenericType"] | None = None):
-        self.base_type = base_type
+        # Nested C# types come through as Outer+Inner, e.g. ResoniteEnv+ResoniteType.
+        self.base_type = base_type.rsplit("+", 1)[-1]
         self.type_params = type_params if type_params is not None else []
 
     @staticmethod
@@ -62,6 +62,13 @@ EMSCRIPTEN_KEEPALIVE resonite_error_t _slot__get_children(
     resonite_buff_t* outChildren) {
     return slot__get_children(slot, outChildren);
 }
+EMSCRIPTEN_KEEPALIVE resonite_error_t _slot__get_children_range(
+    resonite_refid_t slot, 
+    int32_t start, 
+    int32_t count, 
+    resonite_buff_t* outChildren) {
+    return slot__get_children_range(slot, start, count, outChildren);
+}
 EMSCRIPTEN_KEEPALIVE resonite_error_t _slot__find_child_by_name(
     resonite_refid_t slot, 
     char * name, 
@@ -89,6 +96,12 @@ EMSCRIPTEN_KEEPALIVE resonite_error_t _slot__get_components(
     resonite_buff_t* outComponents) {
     return slot__get_components(slot, outComponents);
 }
+EMSCRIPTEN_KEEPALIVE resonite_error_t _slot__get_components_with_type_names(
+    resonite_refid_t slot, 
+    resonite_buff_t* outComponents, 
+    char ** outTypeNames) {
+    return slot__get_components_with_type_names(slot, outComponents, outTypeNames);
+}
 EMSCRIPTEN_KEEPALIVE resonite_error_t _component__get_type_name(
     resonite_refid_t component, 
     char ** outTypeName) {
@@ -131,3 +144,162 @@ EMSCRIPTEN_KEEPALIVE resonite_error_t _value__set_double(
     double value) {
     return value__set_double(refId, value);
 }
+EMSCRIPTEN_KEEPALIVE resonite_error_t _changes__create_feed(
+    int32_t capacity, 
+    int32_t* outFeed) {
+    return changes__create_feed(capacity, outFeed);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _changes__destroy_feed(
+    int32_t feed) {
+    return changes__destroy_feed(feed);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _changes__watch(
+    int32_t feed, 
+    resonite_refid_t refId) {
+    return changes__watch(feed, refId);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _changes__unwatch(
+    int32_t feed, 
+    resonite_refid_t refId) {
+    return changes__unwatch(feed, refId);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _commands__create_buffer(
+    int32_t capacity, 
+    int32_t* outBuffer) {
+    return commands__create_buffer(capacity, outBuffer);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _commands__destroy_buffer(
+    int32_t buffer) {
+    return commands__destroy_buffer(buffer);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _commands__apply(
+    int32_t buffer, 
+    int32_t length, 
+    int32_t* outApplied) {
+    return commands__apply(buffer, length, outApplied);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__get_length(
+    resonite_refid_t refId, 
+    int32_t* outLength) {
+    return array__get_length(refId, outLength);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_int(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_int(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_float(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_float(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_double(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_double(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_float2(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_float2(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_float3(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_float3(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_float4(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_float4(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_floatQ(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_floatQ(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__read_color(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount) {
+    return array__read_color(refId, start, buffer, count, outCount);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_int(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_int(refId, start, buffer, count);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_float(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_float(refId, start, buffer, count);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_double(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_double(refId, start, buffer, count);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_float2(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_float2(refId, start, buffer, count);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_float3(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_float3(refId, start, buffer, count);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_float4(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_float4(refId, start, buffer, count);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_floatQ(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_floatQ(refId, start, buffer, count);
+}
+EMSCRIPTEN_KEEPALIVE resonite_error_t _array__write_color(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count) {
+    return array__write_color(refId, start, buffer, count);
+}
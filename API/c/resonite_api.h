@@ -41,6 +41,11 @@ extern __attribute__((import_module("resonite"))) resonite_error_t slot__get_chi
 extern __attribute__((import_module("resonite"))) resonite_error_t slot__get_children(
     resonite_refid_t slot, 
     resonite_buff_t* outChildren);
+extern __attribute__((import_module("resonite"))) resonite_error_t slot__get_children_range(
+    resonite_refid_t slot, 
+    int32_t start, 
+    int32_t count, 
+    resonite_buff_t* outChildren);
 extern __attribute__((import_module("resonite"))) resonite_error_t slot__find_child_by_name(
     resonite_refid_t slot, 
     const char * name, 
@@ -60,7 +65,146 @@ extern __attribute__((import_module("resonite"))) resonite_error_t slot__get_com
 extern __attribute__((import_module("resonite"))) resonite_error_t slot__get_components(
     resonite_refid_t slot, 
     resonite_buff_t* outComponents);
+extern __attribute__((import_module("resonite"))) resonite_error_t slot__get_components_with_type_names(
+    resonite_refid_t slot, 
+    resonite_buff_t* outComponents, 
+    char ** outTypeNames);
 extern __attribute__((import_module("resonite"))) resonite_error_t component__get_type_name(
     resonite_refid_t component, 
     char ** outTypeName);
-extern __attribute__((import_module("resonite"))) resonite_error_t component__get_member(
\ No newline at end of file
+extern __attribute__((import_module("resonite"))) resonite_error_t component__get_member(
+    resonite_refid_t component, 
+    const char * name, 
+    resonite_type_t* outType, 
+    resonite_refid_t* outMember);
+extern __attribute__((import_module("resonite"))) resonite_error_t value__get_int(
+    resonite_refid_t refId, 
+    int32_t* outPtr);
+extern __attribute__((import_module("resonite"))) resonite_error_t value__get_float(
+    resonite_refid_t refId, 
+    float* outPtr);
+extern __attribute__((import_module("resonite"))) resonite_error_t value__get_double(
+    resonite_refid_t refId, 
+    double* outPtr);
+extern __attribute__((import_module("resonite"))) resonite_error_t value__set_int(
+    resonite_refid_t refId, 
+    int32_t value);
+extern __attribute__((import_module("resonite"))) resonite_error_t value__set_float(
+    resonite_refid_t refId, 
+    float value);
+extern __attribute__((import_module("resonite"))) resonite_error_t value__set_double(
+    resonite_refid_t refId, 
+    double value);
+extern __attribute__((import_module("resonite"))) resonite_error_t changes__create_feed(
+    int32_t capacity, 
+    int32_t* outFeed);
+extern __attribute__((import_module("resonite"))) resonite_error_t changes__destroy_feed(
+    int32_t feed);
+extern __attribute__((import_module("resonite"))) resonite_error_t changes__watch(
+    int32_t feed, 
+    resonite_refid_t refId);
+extern __attribute__((import_module("resonite"))) resonite_error_t changes__unwatch(
+    int32_t feed, 
+    resonite_refid_t refId);
+extern __attribute__((import_module("resonite"))) resonite_error_t commands__create_buffer(
+    int32_t capacity, 
+    int32_t* outBuffer);
+extern __attribute__((import_module("resonite"))) resonite_error_t commands__destroy_buffer(
+    int32_t buffer);
+extern __attribute__((import_module("resonite"))) resonite_error_t commands__apply(
+    int32_t buffer, 
+    int32_t length, 
+    int32_t* outApplied);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__get_length(
+    resonite_refid_t refId, 
+    int32_t* outLength);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_int(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_float(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_double(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_float2(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_float3(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_float4(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_floatQ(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__read_color(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count, 
+    int32_t* outCount);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_int(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_float(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_double(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_float2(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_float3(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_float4(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_floatQ(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+extern __attribute__((import_module("resonite"))) resonite_error_t array__write_color(
+    resonite_refid_t refId, 
+    int32_t start, 
+    int32_t buffer, 
+    int32_t count);
+
+#endif // __DERGWASM_C_RESONITE_API_H__
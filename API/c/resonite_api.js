@@ -8,10 +8,12 @@ mergeInto(LibraryManager.library, { slot__set_name: function () { } });
 mergeInto(LibraryManager.library, { slot__get_num_children: function () { } });
 mergeInto(LibraryManager.library, { slot__get_child: function () { } });
 mergeInto(LibraryManager.library, { slot__get_children: function () { } });
+mergeInto(LibraryManager.library, { slot__get_children_range: function () { } });
 mergeInto(LibraryManager.library, { slot__find_child_by_name: function () { } });
 mergeInto(LibraryManager.library, { slot__find_child_by_tag: function () { } });
 mergeInto(LibraryManager.library, { slot__get_component: function () { } });
 mergeInto(LibraryManager.library, { slot__get_components: function () { } });
+mergeInto(LibraryManager.library, { slot__get_components_with_type_names: function () { } });
 mergeInto(LibraryManager.library, { component__get_type_name: function () { } });
 mergeInto(LibraryManager.library, { component__get_member: function () { } });
 mergeInto(LibraryManager.library, { value__get_int: function () { } });
@@ -20,3 +22,27 @@ mergeInto(LibraryManager.library, { value__get_double: function () { } });
 mergeInto(LibraryManager.library, { value__set_int: function () { } });
 mergeInto(LibraryManager.library, { value__set_float: function () { } });
 mergeInto(LibraryManager.library, { value__set_double: function () { } });
+mergeInto(LibraryManager.library, { changes__create_feed: function () { } });
+mergeInto(LibraryManager.library, { changes__destroy_feed: function () { } });
+mergeInto(LibraryManager.library, { changes__watch: function () { } });
+mergeInto(LibraryManager.library, { changes__unwatch: function () { } });
+mergeInto(LibraryManager.library, { commands__create_buffer: function () { } });
+mergeInto(LibraryManager.library, { commands__destroy_buffer: function () { } });
+mergeInto(LibraryManager.library, { commands__apply: function () { } });
+mergeInto(LibraryManager.library, { array__get_length: function () { } });
+mergeInto(LibraryManager.library, { array__read_int: function () { } });
+mergeInto(LibraryManager.library, { array__read_float: function () { } });
+mergeInto(LibraryManager.library, { array__read_double: function () { } });
+mergeInto(LibraryManager.library, { array__read_float2: function () { } });
+mergeInto(LibraryManager.library, { array__read_float3: function () { } });
+mergeInto(LibraryManager.library, { array__read_float4: function () { } });
+mergeInto(LibraryManager.library, { array__read_floatQ: function () { } });
+mergeInto(LibraryManager.library, { array__read_color: function () { } });
+mergeInto(LibraryManager.library, { array__write_int: function () { } });
+mergeInto(LibraryManager.library, { array__write_float: function () { } });
+mergeInto(LibraryManager.library, { array__write_double: function () { } });
+mergeInto(LibraryManager.library, { array__write_float2: function () { } });
+mergeInto(LibraryManager.library, { array__write_float3: function () { } });
+mergeInto(LibraryManager.library, { array__write_float4: function () { } });
+mergeInto(LibraryManager.library, { array__write_floatQ: function () { } });
+mergeInto(LibraryManager.library, { array__write_color: function () { } });
@@ -0,0 +1,60 @@
+"""Precompiles the Python files under a directory into Dergwasm bytecode cache files.
+
+For each foo.py, writes foo.mpy next to it in the format that Dergwasm's FilesystemEnv
+serves in place of the source (see Dergwasm/Environments/BytecodeCache.cs). Copy the .mpy
+files into the slot filesystem alongside their .py files.
+
+Requires mpy-cross from the same MicroPython version as the firmware:
+
+    python build_bytecode_cache.py [--mpy-cross PATH] [DIR]
+
+DIR defaults to the fs directory next to this file.
+"""
+
+import argparse
+import base64
+import hashlib
+import pathlib
+import subprocess
+import tempfile
+
+MAGIC = "dergwasm-mpy:"
+
+
+def encode(source: bytes, bytecode: bytes) -> str:
+    source_hash = hashlib.sha256(source).hexdigest()
+    return f"{MAGIC}{source_hash}:{base64.b64encode(bytecode).decode('ascii')}"
+
+
+def compile_file(mpy_cross: str, py_path: pathlib.Path) -> bytes:
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = pathlib.Path(tmp) / "out.mpy"
+        subprocess.run(
+            [mpy_cross, "-o", str(out_path), str(py_path)],
+            check=True,
+        )
+        return out_path.read_bytes()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mpy-cross", default="mpy-cross", help="path to mpy-cross")
+    parser.add_argument(
+        "dir",
+        nargs="?",
+        default=pathlib.Path(__file__).parent / "fs",
+        type=pathlib.Path,
+    )
+    args = parser.parse_args()
+
+    for py_path in sorted(args.dir.rglob("*.py")):
+        # Dergwasm hashes the UTF-8 encoding of the slot's string, so this only matches if
+        # the source is copied into the slot verbatim (same line endings, no BOM).
+        source = py_path.read_bytes()
+        mpy_path = py_path.with_suffix(".mpy")
+        mpy_path.write_text(encode(source, compile_file(args.mpy_cross, py_path)))
+        print(f"{py_path} -> {mpy_path}")
+
+
+if __name__ == "__main__":
+    main()
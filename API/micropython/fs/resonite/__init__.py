@@ -1,4 +1,11 @@
+# api is imported first, since the wrapper classes' modules import it, and it imports
+# them back once its own classes are defined.
+from .api import clear_cache, set_cache_limit
 from .component import Component
 from .slot import Slot
 from .user import User
 from .userroot import UserRoot
+from .value import Value
+from .changefeed import ChangeFeed, ChangeKind, Change
+from .commands import CommandBuffer, CommandOp
+from .arrays import array_length, read_array, read_array_into, write_array
@@ -0,0 +1,188 @@
+"""Base classes for the resonite package's wrapper classes.
+
+Autogenerated from resonite_api.json by generate_api.py. DO NOT EDIT.
+
+Wrapper classes with host functions (Slot, Component, Value) subclass the class here of
+the same name plus Api, which has a method for each host function on that class. Results
+of functions annotated immutable_result are cached, and calls to functions annotated
+batchable are queued into the active CommandBuffer, if there is one. Some methods call a
+bulk host function that also returns results of a cached function for each element, and
+store those in the cache, so that using the elements costs no further calls.
+"""
+
+import resonitenative
+
+# Results of immutable_result functions, keyed by function and arguments.
+_cache = {}
+_cache_limit = 4096
+
+
+def _store(key, rets) -> None:
+    if key not in _cache and len(_cache) >= _cache_limit:
+        # Evict one entry: the oldest, where dicts keep insertion order.
+        del _cache[next(iter(_cache))]
+    _cache[key] = rets
+
+
+def _call_cached(func, *args) -> tuple:
+    key = (func, args)
+    rets = _cache.get(key)
+    if rets is None:
+        rets = func(*args)
+        _store(key, rets)
+    return rets
+
+
+def _prefetch(func, reference_ids, results) -> None:
+    for reference_id, result in zip(reference_ids, results):
+        _store((func, (reference_id,)), (result,))
+
+
+def clear_cache() -> None:
+    """Forgets cached results, for when reference IDs are reused by a new world."""
+    _cache.clear()
+
+
+def set_cache_limit(limit: int) -> None:
+    """Sets how many results are cached before the oldest are evicted."""
+    global _cache_limit
+    _cache_limit = limit
+    while len(_cache) > limit:
+        del _cache[next(iter(_cache))]
+
+
+class SlotApi:
+    reference_id: int
+
+    @staticmethod
+    def root_slot() -> "Slot | None":
+        rets = _call_cached(resonitenative.slot__root_slot)
+        return Slot.make_new(rets[0])
+
+    def get_parent(self) -> "Slot | None":
+        rets = resonitenative.slot__get_parent(self.reference_id)
+        return Slot.make_new(rets[0])
+
+    def get_active_user(self) -> "User | None":
+        rets = resonitenative.slot__get_active_user(self.reference_id)
+        return User.make_new(rets[0])
+
+    def get_active_user_root(self) -> "UserRoot | None":
+        rets = resonitenative.slot__get_active_user_root(self.reference_id)
+        return UserRoot.make_new(rets[0])
+
+    def get_object_root(self, only_explicit: bool = False) -> "Slot | None":
+        rets = resonitenative.slot__get_object_root(self.reference_id, only_explicit)
+        return Slot.make_new(rets[0])
+
+    def get_name(self) -> "str | None":
+        rets = resonitenative.slot__get_name(self.reference_id)
+        return rets[0]
+
+    def set_name(self, name: str) -> None:
+        commands = active_command_buffer()
+        if commands is not None:
+            commands.set_name(self, name)
+            return
+        resonitenative.slot__set_name(self.reference_id, name)
+
+    def children_count(self) -> int:
+        rets = resonitenative.slot__get_num_children(self.reference_id)
+        return rets[0]
+
+    def get_child(self, index: int) -> "Slot | None":
+        rets = resonitenative.slot__get_child(self.reference_id, index)
+        return Slot.make_new(rets[0])
+
+    def get_children(self) -> "list[Slot]":
+        rets = resonitenative.slot__get_children(self.reference_id)
+        return [Slot(ret) for ret in rets[0]]
+
+    def get_children_range(self, start: int, count: int) -> "list[Slot]":
+        rets = resonitenative.slot__get_children_range(self.reference_id, start, count)
+        return [Slot(ret) for ret in rets[0]]
+
+    def find_child_by_name(
+        self,
+        name: str,
+        match_substring: bool = True,
+        ignore_case: bool = False,
+        max_depth: int = -1,
+    ) -> "Slot | None":
+        rets = resonitenative.slot__find_child_by_name(
+            self.reference_id, name, match_substring, ignore_case, max_depth
+        )
+        return Slot.make_new(rets[0])
+
+    def find_child_by_tag(self, tag: str, max_depth: int = -1) -> "Slot | None":
+        rets = resonitenative.slot__find_child_by_tag(self.reference_id, tag, max_depth)
+        return Slot.make_new(rets[0])
+
+    def get_component(self, component_type_name: str) -> "Component | None":
+        rets = resonitenative.slot__get_component(
+            self.reference_id, component_type_name
+        )
+        return Component.make_new(rets[0])
+
+    def get_components(self) -> "list[Component]":
+        rets = resonitenative.slot__get_components_with_type_names(self.reference_id)
+        _prefetch(resonitenative.component__get_type_name, rets[0], rets[1].split("\n"))
+        return [Component(ret) for ret in rets[0]]
+
+
+class ComponentApi:
+    reference_id: int
+
+    def get_type_name(self) -> "str | None":
+        rets = _call_cached(resonitenative.component__get_type_name, self.reference_id)
+        return rets[0]
+
+    def get_member(self, name: str) -> tuple:
+        rets = _call_cached(
+            resonitenative.component__get_member, self.reference_id, name
+        )
+        return rets[0], rets[1]
+
+
+class ValueApi:
+    reference_id: int
+
+    def get_int(self) -> int:
+        rets = resonitenative.value__get_int(self.reference_id)
+        return rets[0]
+
+    def get_float(self) -> float:
+        rets = resonitenative.value__get_float(self.reference_id)
+        return rets[0]
+
+    def get_double(self) -> float:
+        rets = resonitenative.value__get_double(self.reference_id)
+        return rets[0]
+
+    def set_int(self, value: int) -> None:
+        commands = active_command_buffer()
+        if commands is not None:
+            commands.set_int(self, value)
+            return
+        resonitenative.value__set_int(self.reference_id, value)
+
+    def set_float(self, value: float) -> None:
+        commands = active_command_buffer()
+        if commands is not None:
+            commands.set_float(self, value)
+            return
+        resonitenative.value__set_float(self.reference_id, value)
+
+    def set_double(self, value: float) -> None:
+        commands = active_command_buffer()
+        if commands is not None:
+            commands.set_double(self, value)
+            return
+        resonitenative.value__set_double(self.reference_id, value)
+
+
+from resonite.commands import active_command_buffer
+from resonite.slot import Slot
+from resonite.component import Component
+from resonite.user import User
+from resonite.userroot import UserRoot
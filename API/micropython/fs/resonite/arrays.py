@@ -0,0 +1,99 @@
+import array
+import struct
+import uctypes
+
+import resonitenative
+
+# The element types that arrays can be transferred as, mapped to the array typecode of
+# an element's components and the number of components. Elements are packed, so a
+# float3 array is transferred as the floats x0, y0, z0, x1, y1, z1, and so on.
+ELEMENT_TYPES = {
+    "int": ("i", 1),
+    "float": ("f", 1),
+    "double": ("d", 1),
+    "float2": ("f", 2),
+    "float3": ("f", 3),
+    "float4": ("f", 4),
+    "floatQ": ("f", 4),
+    "color": ("f", 4),
+}
+
+_READERS = {t: getattr(resonitenative, "array__read_" + t) for t in ELEMENT_TYPES}
+_WRITERS = {t: getattr(resonitenative, "array__write_" + t) for t in ELEMENT_TYPES}
+
+
+def _reference_id(obj) -> int:
+    return obj if isinstance(obj, int) else obj.reference_id
+
+
+def _components(element_type: str) -> int:
+    if element_type not in ELEMENT_TYPES:
+        raise ValueError(f"Unsupported element type {element_type}")
+    return ELEMENT_TYPES[element_type][1]
+
+
+def array_length(field) -> int:
+    """Returns the number of elements in an array or list field.
+
+    The field is given as a Component-like object or a reference ID. Any other field
+    counts as an array of one element.
+    """
+    return resonitenative.array__get_length(_reference_id(field))[0]
+
+
+def read_array(field, element_type: str, start: int = 0, count: int | None = None):
+    """Reads elements of an array or list field into a new, packed array.
+
+    Reads from start up to count elements, or to the end of the field if count is
+    None. The result is an array.array of components, such as array("f") of x, y, z
+    triples for float3, and can be wrapped in a memoryview. Any other field of the
+    element type reads as one element, so read_array(field, "float3") also gets a
+    single float3 value's components.
+    """
+    components = _components(element_type)
+    if count is None:
+        count = max(array_length(field) - start, 0)
+    typecode = ELEMENT_TYPES[element_type][0]
+    # A bytearray initializer is copied as raw bytes, so this allocates no list of
+    # zeros.
+    size = count * components * struct.calcsize(typecode)
+    buffer = array.array(typecode, bytearray(size))
+    read = read_array_into(field, element_type, buffer, start)
+    if read < count:
+        # The field shrank between the calls.
+        buffer = buffer[: read * components]
+    return buffer
+
+
+def read_array_into(field, element_type: str, buffer, start: int = 0) -> int:
+    """Reads elements of an array or list field into an existing buffer.
+
+    The buffer is an array.array of the element type's typecode (see ELEMENT_TYPES),
+    and is filled with as many whole elements as it holds, or as remain in the field.
+    Returns the number of elements read. Reusing one buffer across updates avoids
+    allocating anything per read.
+    """
+    count = len(buffer) // _components(element_type)
+    rets = _READERS[element_type](
+        _reference_id(field), start, uctypes.addressof(buffer), count
+    )
+    return rets[0]
+
+
+def write_array(field, element_type: str, values, start: int = 0) -> None:
+    """Writes packed elements into an array or list field, starting at start.
+
+    values is an array.array of the element type's typecode (see ELEMENT_TYPES), or
+    any other iterable of components, which is packed into one first. Elements past
+    the end of the field are appended to it. Any other field of the element type can
+    be written as a one element array.
+    """
+    components = _components(element_type)
+    if not isinstance(values, array.array):
+        values = array.array(ELEMENT_TYPES[element_type][0], values)
+    count, extra = divmod(len(values), components)
+    if extra:
+        raise ValueError(f"{len(values)} components aren't whole {element_type}s")
+    _WRITERS[element_type](
+        _reference_id(field), start, uctypes.addressof(values), count
+    )
@@ -0,0 +1,94 @@
+import struct
+import uctypes
+
+import resonitenative
+from resonite.deserialize import deserialize
+
+# The ring buffer header is capacity, head, tail, dropped, all uint32. head and tail are
+# free-running byte counts: the host advances head, and we advance tail. The capacity is
+# a power of two, so masking a count gives its position even after the count wraps.
+_HEADER = "<IIII"
+_HEADER_SIZE = 16
+_HEAD_OFFSET = 4
+_TAIL_OFFSET = 8
+_DROPPED_OFFSET = 12
+
+# Each record starts with payload length (int32), kind (int32), and refid (uint64).
+_RECORD_HEADER = "<iiQ"
+_RECORD_HEADER_SIZE = 16
+
+
+class ChangeKind:
+    FIELD_CHANGED = 1
+    CHILD_ADDED = 2
+    CHILD_REMOVED = 3
+    NAME_CHANGED = 4
+
+
+class Change:
+    kind: int
+    reference_id: int
+    value: object
+
+    def __init__(self, kind: int, reference_id: int, value: object):
+        self.kind = kind
+        self.reference_id = reference_id
+        self.value = value
+
+    def __str__(self):
+        return f"Change<kind={self.kind}, ID={self.reference_id:X}, value={self.value}>"
+
+
+class ChangeFeed:
+    """Receives changes to watched slots and fields, without polling.
+
+    The host appends a record to a ring buffer in WASM memory whenever a watched
+    element changes. drain() reads the records straight out of that buffer, so
+    draining an idle feed doesn't call into the host at all.
+
+    Slots report children added and removed, and name changes. Fields report
+    their new value. The capacity, in bytes, must be a power of two.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        rets = resonitenative.changes__create_feed(capacity)
+        self._addr = rets[0]
+        self._capacity = capacity
+        self._header = uctypes.bytearray_at(self._addr, _HEADER_SIZE)
+        self._data = uctypes.bytearray_at(self._addr + _HEADER_SIZE, capacity)
+
+    def watch(self, obj) -> None:
+        resonitenative.changes__watch(self._addr, obj.reference_id)
+
+    def unwatch(self, obj) -> None:
+        resonitenative.changes__unwatch(self._addr, obj.reference_id)
+
+    def dropped(self) -> int:
+        """Returns the number of changes dropped because the buffer was full."""
+        return struct.unpack_from("<I", self._header, _DROPPED_OFFSET)[0]
+
+    def _read(self, pos: int, size: int) -> bytes:
+        start = pos & (self._capacity - 1)
+        end = start + size
+        if end <= self._capacity:
+            return bytes(self._data[start:end])
+        return bytes(self._data[start:]) + bytes(self._data[: end - self._capacity])
+
+    def drain(self):
+        """Yields each pending Change, oldest first."""
+        _, head, tail, _ = struct.unpack(_HEADER, self._header)
+        while tail != head:
+            length, kind, reference_id = struct.unpack(
+                _RECORD_HEADER, self._read(tail, _RECORD_HEADER_SIZE)
+            )
+            payload = self._read(tail + _RECORD_HEADER_SIZE, length)
+            tail = (tail + _RECORD_HEADER_SIZE + length) & 0xFFFFFFFF
+            # Free the space before yielding, so the host can reuse it even if the
+            # caller stops iterating early.
+            struct.pack_into("<I", self._header, _TAIL_OFFSET, tail)
+            yield Change(kind, reference_id, deserialize(payload))
+
+    def close(self) -> None:
+        if self._addr:
+            resonitenative.changes__destroy_feed(self._addr)
+            self._addr = 0
@@ -0,0 +1,133 @@
+import struct
+import uctypes
+
+import resonitenative
+from resonite.deserialize import SimpleType
+from resonite.serialize import serialize
+
+# Each command starts with op (int32) and the target's refid (uint64), followed by the
+# payload value, serialized inline.
+_COMMAND_HEADER = "<iQ"
+_COMMAND_HEADER_SIZE = 12
+
+
+class CommandOp:
+    SET_VALUE = 1
+    SET_NAME = 2
+
+
+# The CommandBuffers whose with blocks are running, innermost last.
+_active = []
+
+
+def active_command_buffer() -> "CommandBuffer | None":
+    """Returns the CommandBuffer of the innermost running with block, if any."""
+    return _active[-1] if _active else None
+
+
+def _reference_id(obj) -> int:
+    return obj if isinstance(obj, int) else obj.reference_id
+
+
+class CommandBuffer:
+    """Collects world mutations and applies them together, in one host call.
+
+    Use it as a context manager:
+
+        with CommandBuffer() as commands:
+            for field_id in field_ids:
+                commands.set_value(field_id, 0.5)
+
+    The commands are applied when the block exits, or sooner if the buffer fills
+    up. If the block raises, pending commands are discarded. While the block runs,
+    wrapper methods of batchable host functions, such as Slot.set_name and
+    Value.set_int, also queue their changes here instead of applying them
+    immediately.
+
+    The host checks every command in a submission before applying any of them, so
+    a bad command fails its whole submission and changes nothing. If the engine
+    still rejects a change while applying, the commands before it stay applied,
+    and flush raises RuntimeError saying how many were. Submissions already made
+    when the buffer filled up are not undone.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        rets = resonitenative.commands__create_buffer(capacity)
+        self._addr = rets[0]
+        self._capacity = capacity
+        self._data = uctypes.bytearray_at(self._addr, capacity)
+        self._length = 0
+        self._count = 0
+
+    def set_value(self, field, value, simple_type: SimpleType | None = None) -> None:
+        """Sets a field, given as a Component-like object or a reference ID.
+
+        Numbers are converted to the field's type by the host, so an int or float
+        value works for any numeric field. See serialize for how other types are
+        inferred.
+        """
+        self._append(
+            CommandOp.SET_VALUE, _reference_id(field), serialize(value, simple_type)
+        )
+
+    def set_int(self, field, value: int) -> None:
+        self.set_value(field, value, SimpleType.INT)
+
+    def set_float(self, field, value: float) -> None:
+        self.set_value(field, value, SimpleType.FLOAT)
+
+    def set_double(self, field, value: float) -> None:
+        self.set_value(field, value, SimpleType.DOUBLE)
+
+    def set_name(self, slot, name: str | None) -> None:
+        self._append(CommandOp.SET_NAME, _reference_id(slot), serialize(name))
+
+    def _append(self, op: int, reference_id: int, payload: bytes) -> None:
+        size = _COMMAND_HEADER_SIZE + len(payload)
+        if size > self._capacity:
+            raise ValueError(f"Command needs {size} bytes, more than the buffer holds")
+        if self._length + size > self._capacity:
+            self.flush()
+        start = self._length + _COMMAND_HEADER_SIZE
+        struct.pack_into(_COMMAND_HEADER, self._data, self._length, op, reference_id)
+        self._data[start : start + len(payload)] = payload
+        self._length += size
+        self._count += 1
+
+    def flush(self) -> int:
+        """Applies the pending commands, returning the number applied.
+
+        Raises RuntimeError if the host stopped partway through.
+        """
+        if self._length == 0:
+            return 0
+        length, count = self._length, self._count
+        # Even if the host rejects them, the commands are gone, so the buffer can be
+        # reused.
+        self.discard()
+        applied = resonitenative.commands__apply(self._addr, length)[0]
+        if applied < count:
+            raise RuntimeError(f"Only {applied} of {count} commands were applied")
+        return applied
+
+    def discard(self) -> None:
+        """Drops the pending commands without applying them."""
+        self._length = 0
+        self._count = 0
+
+    def close(self) -> None:
+        if self._addr:
+            resonitenative.commands__destroy_buffer(self._addr)
+            self._addr = 0
+
+    def __enter__(self) -> "CommandBuffer":
+        _active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _active.remove(self)
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.close()
@@ -1,7 +1,7 @@
-import resonitenative
+from resonite.api import ComponentApi
 
 
-class Component:
+class Component(ComponentApi):
     reference_id: int
     typename: str
 
@@ -10,12 +10,13 @@ class Component:
         if typename:
             self.typename = typename
         else:
-            self.typename = resonitenative.component__get_type_name(reference_id)
+            self.typename = self.get_type_name()
 
     def __str__(self):
         return f"Component<ID={self.reference_id:X}>({self.typename})"
 
-    @classmethod
-    def make_new(cls, reference_id: int) -> "Component":
-        typename = resonitenative.component__get_type_name(reference_id)
-        return Component(reference_id, typename)
+    @staticmethod
+    def make_new(reference_id: int) -> "Component | None":
+        if reference_id == 0:
+            return None
+        return Component(reference_id)
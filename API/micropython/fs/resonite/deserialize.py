@@ -47,12 +47,14 @@ class SimpleType(Enum):
     SLOT = 35
     USER = 36
     USERROOT = 37
+    NULL = 38
+    REFID_LIST = 39
 
 
 def deserialize(data: bytes) -> Any:
     f = io.BytesIO(data)
     simple_type = SimpleType(struct.unpack("<i", f.read(4))[0])
-    if simple_type == SimpleType.UNKNOWN:
+    if simple_type == SimpleType.UNKNOWN or simple_type == SimpleType.NULL:
         return None
     if simple_type == SimpleType.BOOL:
         return struct.unpack("<i", f.read(4))[0] != 0
@@ -172,6 +174,10 @@ def deserialize(data: bytes) -> Any:
     if simple_type == SimpleType.REFID:
         return struct.unpack("<Q", f.read(8))[0]
 
+    if simple_type == SimpleType.REFID_LIST:
+        count = struct.unpack("<i", f.read(4))[0]
+        return [struct.unpack("<Q", f.read(8))[0] for _ in range(count)]
+
     if simple_type == SimpleType.SLOT:
         return Slot(struct.unpack("<Q", f.read(8))[0])
 
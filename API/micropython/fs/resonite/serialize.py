@@ -0,0 +1,82 @@
+import struct
+
+from resonite.deserialize import SimpleType
+from resonite.slot import Slot
+from resonite.user import User
+from resonite.userroot import UserRoot
+
+# The numeric and vector types, mapped to their element's struct format and count.
+_NUMERIC: dict = {}
+for _base, _code in (
+    (SimpleType.BOOL, "i"),
+    (SimpleType.INT, "i"),
+    (SimpleType.UINT, "I"),
+    (SimpleType.LONG, "q"),
+    (SimpleType.ULONG, "Q"),
+    (SimpleType.FLOAT, "f"),
+    (SimpleType.DOUBLE, "d"),
+):
+    for _n in range(4):
+        _NUMERIC[SimpleType(_base.value + _n)] = (_code, _n + 1)
+_NUMERIC[SimpleType.FLOATQ] = ("f", 4)
+_NUMERIC[SimpleType.DOUBLEQ] = ("d", 4)
+_NUMERIC[SimpleType.COLOR] = ("f", 4)
+_NUMERIC[SimpleType.COLORX] = ("f", 4)
+
+_REFERENCES = {
+    Slot: SimpleType.SLOT,
+    User: SimpleType.USER,
+    UserRoot: SimpleType.USERROOT,
+}
+
+
+def _infer_type(value) -> SimpleType:
+    if value is None:
+        return SimpleType.NULL
+    if isinstance(value, bool):
+        return SimpleType.BOOL
+    if isinstance(value, int):
+        return SimpleType.INT if -(1 << 31) <= value < (1 << 31) else SimpleType.LONG
+    if isinstance(value, float):
+        return SimpleType.DOUBLE
+    if isinstance(value, str):
+        return SimpleType.STRING
+    if isinstance(value, (tuple, list)) and 2 <= len(value) <= 4:
+        return SimpleType(SimpleType.FLOAT.value + len(value) - 1)
+    for cls, simple_type in _REFERENCES.items():
+        if isinstance(value, cls):
+            return simple_type
+    raise TypeError(f"Can't serialize {value!r}")
+
+
+def serialize(value, simple_type: SimpleType | None = None) -> bytes:
+    """Serializes a value inline, the way SimpleSerialization.SerializeInline does.
+
+    Without a simple_type, it's inferred: ints are INT (or LONG if they don't fit),
+    floats are DOUBLE, and tuples of 2 to 4 numbers are FLOAT2 to FLOAT4. Pass a
+    simple_type for anything else, such as a double3 or a colorX.
+    """
+    if simple_type is None:
+        simple_type = _infer_type(value)
+
+    if simple_type in _NUMERIC:
+        code, count = _NUMERIC[simple_type]
+        values = (value,) if count == 1 else tuple(value)
+        if len(values) != count:
+            raise ValueError(f"{simple_type} needs {count} values, not {len(values)}")
+        return struct.pack(f"<i{count}{code}", simple_type.value, *values)
+
+    if simple_type == SimpleType.NULL:
+        return struct.pack("<i", simple_type.value)
+
+    if simple_type == SimpleType.STRING:
+        data = value.encode("utf-8")
+        return struct.pack("<ii", simple_type.value, len(data)) + data
+
+    if simple_type == SimpleType.REFID:
+        return struct.pack("<iQ", simple_type.value, value)
+
+    if simple_type in (SimpleType.SLOT, SimpleType.USER, SimpleType.USERROOT):
+        return struct.pack("<iQ", simple_type.value, value.reference_id)
+
+    raise TypeError(f"Can't serialize {value!r} as {simple_type}")
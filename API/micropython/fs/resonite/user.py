@@ -1,6 +1,3 @@
-import resonitenative
-
-
 class User:
     reference_id: int
 
@@ -11,7 +8,7 @@ class User:
         return f"User<ID={self.reference_id:X}>"
 
     @staticmethod
-    def make_new(reference_id: int) -> "User" | None:
+    def make_new(reference_id: int) -> "User | None":
         if reference_id == 0:
             return None
         return User(reference_id)
@@ -1,6 +1,3 @@
-import resonitenative
-
-
 class UserRoot:
     reference_id: int
 
@@ -11,7 +8,7 @@ class UserRoot:
         return f"UserRoot<ID={self.reference_id:X}>"
 
     @staticmethod
-    def make_new(reference_id: int) -> "UserRoot" | None:
+    def make_new(reference_id: int) -> "UserRoot | None":
         if reference_id == 0:
             return None
         return UserRoot(reference_id)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from resonite.api import ValueApi
+
+
+class Value(ValueApi):
+    """A field holding a value, such as a component member found with get_member."""
+
+    reference_id: int
+
+    def __init__(self, reference_id: int):
+        self.reference_id = reference_id
+
+    def __str__(self):
+        return f"Value<ID={self.reference_id:X}>"
+
+    @staticmethod
+    def make_new(reference_id: int) -> "Value | None":
+        if reference_id == 0:
+            return None
+        return Value(reference_id)
@@ -0,0 +1,186 @@
+"""Benchmarks high-level operations of the resonite package against the fake.
+
+For each operation, reports the host calls and bytes transferred per run, which is what
+an API-layer optimization should reduce, and the time per run under CPython:
+
+    python bench_resonite.py [pyperf options]
+
+Timing uses pyperf if it's installed, and timeit otherwise. The host call counts don't
+depend on timing, and are checked by test_bench_resonite.py.
+"""
+
+import array
+import pathlib
+import sys
+import timeit
+
+_HERE = pathlib.Path(__file__).resolve().parent
+sys.path[:0] = [str(_HERE), str(_HERE.parent / "fs")]
+
+import resonitenative  # noqa: E402
+from resonite import CommandBuffer, Component, Slot, clear_cache  # noqa: E402
+from resonite import read_array, write_array  # noqa: E402
+
+try:
+    import pyperf
+except ImportError:
+    pyperf = None
+
+# The benchmark world: a tree of DEPTH levels with FANOUT children per slot, and
+# COMPONENTS components on each slot below the root.
+DEPTH = 3
+FANOUT = 5
+COMPONENTS = 3
+
+# The number of float3 points in the point list on the root.
+POINTS = 1000
+POINTS_TYPE = "FrooxEngine.PointMesh"
+
+
+def build_world() -> int:
+    """Resets the fake to the benchmark world, returning the number of slots in it."""
+    resonitenative.reset()
+    clear_cache()
+    points = [(float(i), 0.0, 0.0) for i in range(POINTS)]
+    resonitenative.root().add_component(
+        POINTS_TYPE, Points=resonitenative.FakeArrayField("float3", points)
+    )
+    return 1 + resonitenative.build_tree(resonitenative.root(), DEPTH, FANOUT, COMPONENTS)
+
+
+def walk_subtree() -> int:
+    """Visits every slot under the root, reading its name. Returns the slot count."""
+
+    def walk(slot: Slot) -> int:
+        slot.get_name()
+        return 1 + sum(walk(child) for child in slot.get_children())
+
+    return walk(Slot.root_slot())
+
+
+def walk_subtree_by_index() -> int:
+    """Like walk_subtree, but fetches each child by index."""
+
+    def walk(slot: Slot) -> int:
+        slot.get_name()
+        return 1 + sum(walk(slot.get_child(i)) for i in range(slot.children_count()))
+
+    return walk(Slot.root_slot())
+
+
+def walk_subtree_paged() -> int:
+    """Like walk_subtree, but streams each slot's children in pages."""
+
+    def walk(slot: Slot) -> int:
+        slot.get_name()
+        children = slot.iter_children(page_size=FANOUT)
+        return 1 + sum(walk(child) for child in children)
+
+    return walk(Slot.root_slot())
+
+
+def read_components() -> int:
+    """Reads the type name of every component on the root's first child."""
+    slot = Slot.root_slot().get_child(0)
+    return len([c.typename for c in slot.get_components()])
+
+
+def read_values() -> int:
+    """Reads the Value field of every component on the root's first child."""
+    slot = Slot.root_slot().get_child(0)
+    total = 0
+    for component in slot.get_components():
+        _, ref = component.get_member("Value")
+        total += resonitenative.value__get_int(ref)[0]
+    return total
+
+
+def _value_fields() -> list:
+    slot = Slot.root_slot().get_child(0)
+    return [component.get_member("Value")[1] for component in slot.get_components()]
+
+
+def write_values() -> int:
+    """Sets the Value field of every component on the root's first child."""
+    fields = _value_fields()
+    for i, ref in enumerate(fields):
+        resonitenative.value__set_int(ref, i)
+    return len(fields)
+
+
+def write_values_batched() -> int:
+    """Like write_values, but submits the writes through a CommandBuffer."""
+    fields = _value_fields()
+    with CommandBuffer() as commands:
+        for i, ref in enumerate(fields):
+            commands.set_value(ref, i)
+    return len(fields)
+
+
+def _points_field() -> int:
+    return Slot.root_slot().get_component(POINTS_TYPE).get_member("Points")[1]
+
+
+def read_points() -> int:
+    """Reads every point in the root's point list as packed floats."""
+    return len(read_array(_points_field(), "float3")) // 3
+
+
+_point_data = array.array("f", [0.0] * (3 * POINTS))
+
+
+def write_points() -> int:
+    """Overwrites every point in the root's point list from packed floats."""
+    write_array(_points_field(), "float3", _point_data)
+    return POINTS
+
+
+def find_by_name() -> int:
+    """Finds the last slot in the tree by name."""
+    name = ".".join(["Root"] + [str(FANOUT - 1)] * DEPTH)
+    return Slot.root_slot().find_child_by_name(name, match_substring=False).reference_id
+
+
+OPERATIONS = [
+    walk_subtree,
+    walk_subtree_by_index,
+    walk_subtree_paged,
+    read_components,
+    read_values,
+    write_values,
+    write_values_batched,
+    read_points,
+    write_points,
+    find_by_name,
+]
+
+
+def measure_calls(operation) -> tuple:
+    """Runs the operation once, returning (host calls, bytes transferred)."""
+    resonitenative.stats.reset()
+    operation()
+    return resonitenative.stats.calls, resonitenative.stats.bytes
+
+
+def main() -> None:
+    slots = build_world()
+    print(f"World: {slots} slots, {COMPONENTS} components per slot", file=sys.stderr)
+    for operation in OPERATIONS:
+        calls, transferred = measure_calls(operation)
+        print(
+            f"{operation.__name__}: {calls} host calls, {transferred} bytes",
+            file=sys.stderr,
+        )
+
+    if pyperf is not None:
+        runner = pyperf.Runner()
+        for operation in OPERATIONS:
+            runner.bench_func(operation.__name__, operation)
+        return
+    for operation in OPERATIONS:
+        runs, seconds = timeit.Timer(operation).autorange()
+        print(f"{operation.__name__}: {seconds / runs * 1e6:.1f} us", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
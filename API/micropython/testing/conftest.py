@@ -0,0 +1,20 @@
+"""pytest setup: runs the resonite package in ../fs against the resonitenative fake."""
+
+import pathlib
+import sys
+
+import pytest
+
+_HERE = pathlib.Path(__file__).resolve().parent
+sys.path[:0] = [str(_HERE), str(_HERE.parent / "fs")]
+
+import resonitenative  # noqa: E402
+import resonite  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def world():
+    """Starts each test with an empty world, and returns its root slot."""
+    resonitenative.reset()
+    resonite.clear_cache()
+    return resonitenative.root()
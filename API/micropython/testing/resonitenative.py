@@ -0,0 +1,937 @@
+"""An in-memory CPython stand-in for the resonitenative module.
+
+The firmware's resonitenative module calls into Dergwasm's ResoniteEnv. This module
+implements the same functions, with the same arguments and results, against a fake world
+held in memory, so that the resonite package in ../fs can be run and measured under
+CPython, without Resonite or the firmware.
+
+Every function listed in resonite_api.json is implemented. Each call is counted in
+`stats`, along with the number of bytes that would cross the WASM/host boundary: the
+inputs that the host reads, and the outputs that it writes into WASM memory.
+
+Build a world with the Fake* classes, starting from root():
+
+    import resonitenative
+    resonitenative.reset()
+    child = resonitenative.root().add_child("child", tag="tag")
+    child.add_component("FrooxEngine.ValueField<int>", Value=3)
+
+Change feeds are delivered into `memory`, which the uctypes stand-in next to this file
+reads from. Buffers outside of it, such as arrays passed to the array__ functions, are
+given addresses past its end by uctypes.addressof.
+"""
+
+import json
+import pathlib
+import struct
+import weakref
+from collections import Counter
+
+_API_PATH = pathlib.Path(__file__).resolve().parents[2] / "resonite_api.json"
+
+# Error codes, from Dergwasm/Resonite/ResoniteError.cs, and their descriptions, from
+# API/c/resonite_api_types.c.
+NULL_ARGUMENT = -1
+INVALID_REF_ID = -2
+FAILED_PRECONDITION = -3
+
+_ERROR_STRINGS = {
+    NULL_ARGUMENT: "Null argument",
+    INVALID_REF_ID: "Invalid reference ID",
+    FAILED_PRECONDITION: "Failed precondition",
+}
+
+# Member types returned by component__get_member (ResoniteEnv.ResoniteType).
+TYPE_UNKNOWN = 0
+TYPE_VALUE_INT = 1
+
+# SimpleSerialization type tags (see deserialize.SimpleType).
+_SIMPLE_BOOL = 1
+_SIMPLE_INT = 5
+_SIMPLE_LONG = 13
+_SIMPLE_FLOAT = 21
+_SIMPLE_DOUBLE = 26
+_SIMPLE_STRING = 31
+_SIMPLE_SLOT = 35
+_SIMPLE_NULL = 38
+
+# Change feed layout (see Dergwasm/Resonite/ChangeFeed.cs).
+_FEED_HEADER_SIZE = 16
+_RECORD_HEADER_SIZE = 16
+_FIELD_CHANGED = 1
+_CHILD_ADDED = 2
+_CHILD_REMOVED = 3
+_NAME_CHANGED = 4
+
+# Command buffer layout (see Dergwasm/Resonite/CommandBuffer.cs).
+_COMMAND_HEADER_SIZE = 12
+_SET_VALUE = 1
+_SET_NAME = 2
+
+# The struct format of each array__ function's element type, which packs an element's
+# components in order.
+_ARRAY_FORMATS = {
+    "int": "<i",
+    "float": "<f",
+    "double": "<d",
+    "float2": "<2f",
+    "float3": "<3f",
+    "float4": "<4f",
+    "floatQ": "<4f",
+    "color": "<4f",
+}
+
+MEMORY_SIZE = 1 << 20
+
+# The fake WASM memory that change feeds are written into.
+memory = bytearray(MEMORY_SIZE)
+
+
+class _ResoniteError(Exception):
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code = code
+
+
+class Stats:
+    """Counts host calls, and the bytes they transfer across the WASM boundary."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.calls_by_name = Counter()
+
+    @property
+    def bytes(self) -> int:
+        return self.bytes_in + self.bytes_out
+
+    def snapshot(self) -> tuple:
+        return (self.calls, self.bytes_in, self.bytes_out)
+
+
+stats = Stats()
+
+
+def _wire_size(cs_type: str, value) -> int:
+    """Returns the number of bytes a value of the given C# type takes in WASM memory."""
+    if cs_type.startswith("Output<"):
+        cs_type = cs_type[len("Output<") : -1]
+    if cs_type.startswith("Buff<"):
+        # A pointer and a length, plus the elements.
+        return 8 + sum(_wire_size(cs_type[len("Buff<") : -1], v) for v in value)
+    if cs_type.startswith("WasmRefID") or cs_type in ("double", "long", "ulong"):
+        return 8
+    if cs_type == "NullTerminatedString":
+        return len(value.encode("utf-8")) + 1
+    return 4
+
+
+def _load_api() -> dict:
+    with open(_API_PATH) as f:
+        return {func["Name"]: func for func in json.load(f)}
+
+
+_API = _load_api()
+
+
+def _host_function(func):
+    """Makes a host function behave like its generated shim.
+
+    The function returns its outputs as a tuple, and raises _ResoniteError on
+    failure. The shim raises ValueError for errors, as mp_resonite_check_error does.
+    Every call is counted in stats, whether it succeeds or not.
+    """
+    name = func.__name__
+    spec = _API[name]
+    types = [p["CSType"] for p in spec["Parameters"]]
+    in_types = [t for t in types if not t.startswith("Output<")]
+    out_types = [t for t in types if t.startswith("Output<")]
+
+    def shim(*args):
+        if len(args) != len(in_types):
+            raise TypeError(f"{name} takes {len(in_types)} arguments, got {len(args)}")
+        stats.calls += 1
+        stats.calls_by_name[name] += 1
+        stats.bytes_in += sum(_wire_size(t, v) for t, v in zip(in_types, args))
+        try:
+            outs = func(*args)
+        except _ResoniteError as e:
+            message = _ERROR_STRINGS.get(e.code, "Unknown error code")
+            raise ValueError(f"Resonite API error: {message}") from None
+        outs = () if outs is None else outs
+        stats.bytes_out += sum(_wire_size(t, v) for t, v in zip(out_types, outs))
+        return tuple(outs)
+
+    shim.__name__ = name
+    shim.__doc__ = func.__doc__
+    return shim
+
+
+#
+# The fake world.
+#
+
+_objects = {}
+_next_refid = 1
+_root = None
+_feeds = {}
+_command_buffers = {}
+# The fake malloc's block sizes, by address, and freed blocks, by size.
+_block_sizes = {}
+_free_blocks = {}
+_next_addr = 8
+# Buffers given addresses by address_of, by address, and the next address to give out.
+_external = {}
+_next_external_addr = MEMORY_SIZE
+
+
+def _serialize(value) -> bytes:
+    """Serializes a value the way SimpleSerialization.SerializeInline does."""
+    if value is None:
+        return struct.pack("<i", _SIMPLE_NULL)
+    if isinstance(value, bool):
+        return struct.pack("<ii", _SIMPLE_BOOL, 1 if value else 0)
+    if isinstance(value, int):
+        return struct.pack("<ii", _SIMPLE_INT, value)
+    if isinstance(value, float):
+        return struct.pack("<if", _SIMPLE_FLOAT, value)
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        return struct.pack("<ii", _SIMPLE_STRING, len(data)) + data
+    if isinstance(value, FakeSlot):
+        return struct.pack("<iQ", _SIMPLE_SLOT, value.reference_id)
+    raise TypeError(f"Can't serialize {value!r}")
+
+
+class FakeElement:
+    """Something in the fake world with a reference ID."""
+
+    def __init__(self):
+        global _next_refid
+        self.reference_id = _next_refid
+        _next_refid += 1
+        _objects[self.reference_id] = self
+        self.feeds = set()
+
+    def _notify(self, kind: int, payload: bytes) -> None:
+        for feed in list(self.feeds):
+            feed.append(self.reference_id, kind, payload)
+
+
+class FakeUser(FakeElement):
+    pass
+
+
+class FakeUserRoot(FakeElement):
+    pass
+
+
+class FakeField(FakeElement):
+    """A component's field. value_type is int, float, double, bool, or string."""
+
+    def __init__(self, value_type: str, value):
+        super().__init__()
+        self.value_type = value_type
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value) -> None:
+        self._value = value
+        payload = (
+            struct.pack("<id", _SIMPLE_DOUBLE, value)
+            if self.value_type == "double"
+            else _serialize(value)
+        )
+        self._notify(_FIELD_CHANGED, payload)
+
+
+class FakeArrayField(FakeElement):
+    """An array or list field, such as a SyncArray<float3> or SyncFieldList<int>.
+
+    element_type is one of the types the array__ functions support. Elements of vector
+    types are tuples of their components.
+    """
+
+    def __init__(self, element_type: str, values=()):
+        super().__init__()
+        self.element_type = element_type
+        self.values = list(values)
+
+
+_FIELD_TYPES = {bool: "bool", int: "int", float: "float", str: "string"}
+
+
+class FakeComponent(FakeElement):
+    def __init__(self, slot: "FakeSlot", type_name: str, fields: dict):
+        super().__init__()
+        self.slot = slot
+        self.type_name = type_name
+        self.members = {}
+        for name, value in fields.items():
+            if not isinstance(value, (FakeField, FakeArrayField)):
+                value = FakeField(_FIELD_TYPES[type(value)], value)
+            self.members[name] = value
+
+
+class FakeSlot(FakeElement):
+    def __init__(self, name: str, parent: "FakeSlot | None" = None, tag: str = ""):
+        super().__init__()
+        self._name = name
+        self.tag = tag
+        self.parent = parent
+        self.children = []
+        self.components = []
+        self.is_object_root = False
+        self.active_user = None
+        self.active_user_root = None
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._name = name
+        self._notify(_NAME_CHANGED, _serialize(name))
+
+    def add_child(self, name: str, tag: str = "") -> "FakeSlot":
+        child = FakeSlot(name, self, tag)
+        child.active_user = self.active_user
+        child.active_user_root = self.active_user_root
+        self.children.append(child)
+        self._notify(_CHILD_ADDED, _serialize(child))
+        return child
+
+    def remove_child(self, child: "FakeSlot") -> None:
+        self.children.remove(child)
+        child.parent = None
+        self._notify(_CHILD_REMOVED, _serialize(child))
+
+    def add_component(self, type_name: str, **fields) -> FakeComponent:
+        component = FakeComponent(self, type_name, fields)
+        self.components.append(component)
+        return component
+
+    def find_child(self, predicate, max_depth: int):
+        # Breadth-first, like Slot.FindChild.
+        level = self.children
+        depth = 0
+        while level and (max_depth < 0 or depth <= max_depth):
+            for child in level:
+                if predicate(child):
+                    return child
+            level = [grandchild for child in level for grandchild in child.children]
+            depth += 1
+        return None
+
+    def get_object_root(self, only_explicit: bool) -> "FakeSlot":
+        slot = self
+        while slot is not None:
+            if slot.is_object_root:
+                return slot
+            slot = slot.parent
+        return None if only_explicit else self
+
+
+class FakeChangeFeed:
+    """A ring buffer of changes in `memory` (see ChangeFeed.cs for the layout)."""
+
+    def __init__(self, addr: int, capacity: int):
+        self.addr = addr
+        self.capacity = capacity
+        self.watched = set()
+        struct.pack_into("<IIII", memory, addr, capacity, 0, 0, 0)
+
+    def append(self, reference_id: int, kind: int, payload: bytes) -> None:
+        _, head, tail, dropped = struct.unpack_from("<IIII", memory, self.addr)
+        record = struct.pack("<iiQ", len(payload), kind, reference_id) + payload
+        if len(record) > self.capacity - ((head - tail) & 0xFFFFFFFF):
+            struct.pack_into("<I", memory, self.addr + 12, dropped + 1)
+            return
+        data = self.addr + _FEED_HEADER_SIZE
+        for i, b in enumerate(record):
+            memory[data + ((head + i) & (self.capacity - 1))] = b
+        struct.pack_into("<I", memory, self.addr + 4, (head + len(record)) & 0xFFFFFFFF)
+
+
+def reset() -> None:
+    """Empties the fake world, leaving only a root slot, and clears memory and stats."""
+    global _next_refid, _root, _next_addr, _next_external_addr
+    _objects.clear()
+    _feeds.clear()
+    _command_buffers.clear()
+    _block_sizes.clear()
+    _free_blocks.clear()
+    _external.clear()
+    _next_refid = 1
+    _next_addr = 8
+    _next_external_addr = MEMORY_SIZE
+    memory[:] = bytes(MEMORY_SIZE)
+    _root = FakeSlot("Root")
+    stats.reset()
+
+
+def root() -> FakeSlot:
+    return _root
+
+
+def build_tree(parent: FakeSlot, depth: int, fanout: int, components: int = 0) -> int:
+    """Adds a complete tree of slots under parent, returning the number of slots added.
+
+    Each slot gets `components` components, each with an int field named Value.
+    """
+    added = 0
+    for i in range(fanout):
+        child = parent.add_child(f"{parent.name}.{i}", tag=f"tag{i}")
+        for j in range(components):
+            child.add_component("FrooxEngine.ValueField<int>", Value=j)
+        added += 1
+        if depth > 1:
+            added += build_tree(child, depth - 1, fanout, components)
+    return added
+
+
+def lookup(reference_id: int):
+    """Returns the fake element with the given reference ID, or None."""
+    return _objects.get(reference_id)
+
+
+def _get(reference_id: int, cls, predicate=None):
+    obj = _objects.get(reference_id)
+    if not isinstance(obj, cls) or (predicate is not None and not predicate(obj)):
+        raise _ResoniteError(INVALID_REF_ID)
+    return obj
+
+
+def _refid(obj) -> int:
+    return 0 if obj is None else obj.reference_id
+
+
+def _malloc(size: int) -> int:
+    global _next_addr
+    # Keep allocations 8-byte aligned, as malloc does.
+    size = (size + 7) & ~7
+    if _free_blocks.get(size):
+        return _free_blocks[size].pop()
+    addr = _next_addr
+    if addr + size > MEMORY_SIZE:
+        raise MemoryError("Out of fake WASM memory")
+    _next_addr += size
+    _block_sizes[addr] = size
+    return addr
+
+
+def _free(addr: int) -> None:
+    _free_blocks.setdefault(_block_sizes[addr], []).append(addr)
+
+
+def address_of(obj) -> int:
+    """Returns an address that host functions can reach a buffer at while it's alive.
+
+    The buffer is given an address past the end of `memory`. The uctypes stand-in's
+    addressof uses this.
+    """
+    global _next_external_addr
+    for addr, ref in _external.items():
+        if ref() is obj:
+            return addr
+    addr = _next_external_addr
+    size = memoryview(obj).nbytes
+    # Leave a gap after each buffer, so that overruns don't land in the next one.
+    _next_external_addr += (size + 15) & ~7
+    _external[addr] = weakref.ref(obj, lambda _: _external.pop(addr, None))
+    return addr
+
+
+def _view(addr: int, size: int) -> memoryview:
+    """Returns the bytes at an address in `memory`, or in a buffer from address_of.
+
+    Fails the way the host does if the bytes are out of bounds.
+    """
+    if 0 <= addr and addr + size <= MEMORY_SIZE:
+        return memoryview(memory)[addr : addr + size]
+    for base, ref in list(_external.items()):
+        obj = ref()
+        if obj is None:
+            continue
+        data = memoryview(obj).cast("B")
+        if base <= addr and addr + size <= base + data.nbytes:
+            return data[addr - base : addr - base + size]
+    raise _ResoniteError(FAILED_PRECONDITION)
+
+
+def _get_feed(feed: int) -> FakeChangeFeed:
+    if feed not in _feeds:
+        raise _ResoniteError(FAILED_PRECONDITION)
+    return _feeds[feed]
+
+
+#
+# The host functions, in the order of resonite_api.json.
+#
+
+
+@_host_function
+def slot__root_slot():
+    return (_refid(_root),)
+
+
+@_host_function
+def slot__get_parent(slot):
+    return (_refid(_get(slot, FakeSlot).parent),)
+
+
+@_host_function
+def slot__get_active_user(slot):
+    return (_refid(_get(slot, FakeSlot).active_user),)
+
+
+@_host_function
+def slot__get_active_user_root(slot):
+    return (_refid(_get(slot, FakeSlot).active_user_root),)
+
+
+@_host_function
+def slot__get_object_root(slot, only_explicit):
+    return (_refid(_get(slot, FakeSlot).get_object_root(bool(only_explicit))),)
+
+
+@_host_function
+def slot__get_name(slot):
+    return (_get(slot, FakeSlot).name,)
+
+
+@_host_function
+def slot__set_name(slot, name):
+    _get(slot, FakeSlot).name = name
+
+
+@_host_function
+def slot__get_num_children(slot):
+    return (len(_get(slot, FakeSlot).children),)
+
+
+@_host_function
+def slot__get_child(slot, index):
+    children = _get(slot, FakeSlot).children
+    if not 0 <= index < len(children):
+        raise _ResoniteError(FAILED_PRECONDITION)
+    return (children[index].reference_id,)
+
+
+@_host_function
+def slot__get_children(slot):
+    return ([child.reference_id for child in _get(slot, FakeSlot).children],)
+
+
+@_host_function
+def slot__get_children_range(slot, start, count):
+    children = _get(slot, FakeSlot).children
+    if start < 0 or count < 0:
+        raise _ResoniteError(FAILED_PRECONDITION)
+    return ([child.reference_id for child in children[start : start + count]],)
+
+
+@_host_function
+def slot__find_child_by_name(slot, name, match_substring, ignore_case, max_depth):
+    def matches(child):
+        child_name = child.name
+        search = name
+        if ignore_case:
+            child_name, search = child_name.lower(), search.lower()
+        return search in child_name if match_substring else search == child_name
+
+    return (_refid(_get(slot, FakeSlot).find_child(matches, max_depth)),)
+
+
+@_host_function
+def slot__find_child_by_tag(slot, tag, max_depth):
+    return (_refid(_get(slot, FakeSlot).find_child(lambda c: c.tag == tag, max_depth)),)
+
+
+@_host_function
+def slot__get_component(slot, typeName):
+    components = _get(slot, FakeSlot).components
+    return (_refid(next((c for c in components if c.type_name == typeName), None)),)
+
+
+@_host_function
+def slot__get_components(slot):
+    return ([c.reference_id for c in _get(slot, FakeSlot).components],)
+
+
+@_host_function
+def slot__get_components_with_type_names(slot):
+    components = _get(slot, FakeSlot).components
+    return (
+        [c.reference_id for c in components],
+        "\n".join(c.type_name for c in components),
+    )
+
+
+@_host_function
+def component__get_type_name(component):
+    return (_get(component, FakeComponent).type_name,)
+
+
+@_host_function
+def component__get_member(component, name):
+    member = _get(component, FakeComponent).members.get(name)
+    if member is None:
+        raise _ResoniteError(FAILED_PRECONDITION)
+    is_int = isinstance(member, FakeField) and member.value_type == "int"
+    member_type = TYPE_VALUE_INT if is_int else TYPE_UNKNOWN
+    return (member_type, member.reference_id)
+
+
+def _value_getter(value_type):
+    def get(refId):
+        return (_get(refId, FakeField, lambda f: f.value_type == value_type).value,)
+
+    return get
+
+
+def _value_setter(value_type, convert):
+    def setter(refId, value):
+        field = _get(refId, FakeField, lambda f: f.value_type == value_type)
+        field.value = convert(value)
+
+    return setter
+
+
+def _float32(value) -> float:
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def _int32(value) -> int:
+    return struct.unpack("<i", struct.pack("<I", int(value) & 0xFFFFFFFF))[0]
+
+
+@_host_function
+def value__get_int(refId):
+    return _value_getter("int")(refId)
+
+
+@_host_function
+def value__get_float(refId):
+    return _value_getter("float")(refId)
+
+
+@_host_function
+def value__get_double(refId):
+    return _value_getter("double")(refId)
+
+
+@_host_function
+def value__set_int(refId, value):
+    _value_setter("int", _int32)(refId, value)
+
+
+@_host_function
+def value__set_float(refId, value):
+    _value_setter("float", _float32)(refId, value)
+
+
+@_host_function
+def value__set_double(refId, value):
+    _value_setter("double", float)(refId, value)
+
+
+@_host_function
+def changes__create_feed(capacity):
+    if capacity < _RECORD_HEADER_SIZE or capacity & (capacity - 1):
+        raise _ResoniteError(FAILED_PRECONDITION)
+    addr = _malloc(_FEED_HEADER_SIZE + capacity)
+    _feeds[addr] = FakeChangeFeed(addr, capacity)
+    return (addr,)
+
+
+@_host_function
+def changes__destroy_feed(feed):
+    change_feed = _get_feed(feed)
+    for element in change_feed.watched:
+        element.feeds.discard(change_feed)
+    del _feeds[feed]
+    _free(feed)
+
+
+@_host_function
+def changes__watch(feed, refId):
+    change_feed = _get_feed(feed)
+    element = _get(refId, FakeElement)
+    if not isinstance(element, (FakeSlot, FakeField)):
+        raise _ResoniteError(FAILED_PRECONDITION)
+    element.feeds.add(change_feed)
+    change_feed.watched.add(element)
+
+
+@_host_function
+def changes__unwatch(feed, refId):
+    change_feed = _get_feed(feed)
+    element = _get(refId, FakeElement)
+    element.feeds.discard(change_feed)
+    change_feed.watched.discard(element)
+
+
+def _read_value(data: bytes, pos: int):
+    """Reads an inline SimpleSerialization value, returning it and the next position.
+
+    Only the types the fake world's fields can hold are supported.
+    """
+    (simple_type,) = struct.unpack_from("<i", data, pos)
+    pos += 4
+    if simple_type == _SIMPLE_NULL:
+        return None, pos
+    if simple_type == _SIMPLE_BOOL:
+        return struct.unpack_from("<i", data, pos)[0] != 0, pos + 4
+    if simple_type == _SIMPLE_INT:
+        return struct.unpack_from("<i", data, pos)[0], pos + 4
+    if simple_type == _SIMPLE_LONG:
+        return struct.unpack_from("<q", data, pos)[0], pos + 8
+    if simple_type == _SIMPLE_FLOAT:
+        return struct.unpack_from("<f", data, pos)[0], pos + 4
+    if simple_type == _SIMPLE_DOUBLE:
+        return struct.unpack_from("<d", data, pos)[0], pos + 8
+    if simple_type == _SIMPLE_STRING:
+        (length,) = struct.unpack_from("<i", data, pos)
+        pos += 4
+        if length < 0 or pos + length > len(data):
+            raise struct.error("String runs past the end of the buffer")
+        return data[pos : pos + length].decode("utf-8"), pos + length
+    raise struct.error(f"Unsupported simple type {simple_type}")
+
+
+def _convert_field_value(field: FakeField, value):
+    """Converts a value for a field the way CommandBuffer.ConvertValue does."""
+    if field.value_type == "string":
+        if value is not None and not isinstance(value, str):
+            raise _ResoniteError(FAILED_PRECONDITION)
+        return value
+    if value is None or isinstance(value, str):
+        raise _ResoniteError(FAILED_PRECONDITION)
+    if field.value_type == "bool":
+        return bool(value)
+    if field.value_type == "int":
+        value = round(value)
+        if not -(1 << 31) <= value < (1 << 31):
+            raise _ResoniteError(FAILED_PRECONDITION)
+        return value
+    if field.value_type == "float":
+        return _float32(value)
+    return float(value)
+
+
+def _decode_commands(data: bytes) -> list:
+    commands = []
+    pos = 0
+    while pos < len(data):
+        if len(data) - pos < _COMMAND_HEADER_SIZE:
+            raise _ResoniteError(FAILED_PRECONDITION)
+        op, reference_id = struct.unpack_from("<iQ", data, pos)
+        try:
+            value, pos = _read_value(data, pos + _COMMAND_HEADER_SIZE)
+        except struct.error:
+            raise _ResoniteError(FAILED_PRECONDITION)
+        target = _get(reference_id, FakeElement)
+        if op == _SET_VALUE:
+            if not isinstance(target, FakeField):
+                raise _ResoniteError(INVALID_REF_ID)
+            commands.append((target, "value", _convert_field_value(target, value)))
+        elif op == _SET_NAME:
+            if not isinstance(target, FakeSlot):
+                raise _ResoniteError(INVALID_REF_ID)
+            if value is not None and not isinstance(value, str):
+                raise _ResoniteError(FAILED_PRECONDITION)
+            commands.append((target, "name", value))
+        else:
+            raise _ResoniteError(FAILED_PRECONDITION)
+    return commands
+
+
+@_host_function
+def commands__create_buffer(capacity):
+    if capacity < _COMMAND_HEADER_SIZE:
+        raise _ResoniteError(FAILED_PRECONDITION)
+    addr = _malloc(capacity)
+    _command_buffers[addr] = capacity
+    return (addr,)
+
+
+@_host_function
+def commands__destroy_buffer(buffer):
+    if buffer not in _command_buffers:
+        raise _ResoniteError(FAILED_PRECONDITION)
+    del _command_buffers[buffer]
+    _free(buffer)
+
+
+@_host_function
+def commands__apply(buffer, length):
+    if buffer not in _command_buffers or not 0 <= length <= _command_buffers[buffer]:
+        raise _ResoniteError(FAILED_PRECONDITION)
+    commands = _decode_commands(bytes(memory[buffer : buffer + length]))
+    # Like the host, stop at the first command that fails to apply.
+    for applied, (target, attr, value) in enumerate(commands):
+        try:
+            setattr(target, attr, value)
+        except Exception:
+            return (applied,)
+    return (len(commands),)
+
+
+def _array_values(refId, element_type: str) -> list:
+    """Returns the elements of an array field, or of a field as a one element array."""
+    element = _get(refId, FakeElement)
+    if isinstance(element, FakeArrayField) and element.element_type == element_type:
+        return element.values
+    if isinstance(element, FakeField) and element.value_type == element_type:
+        return [element.value]
+    raise _ResoniteError(INVALID_REF_ID)
+
+
+def _array_reader(element_type: str):
+    fmt = _ARRAY_FORMATS[element_type]
+    size = struct.calcsize(fmt)
+
+    def read(refId, start, buffer, count):
+        values = _array_values(refId, element_type)
+        if start < 0 or count < 0 or start > len(values):
+            raise _ResoniteError(FAILED_PRECONDITION)
+        values = values[start : start + count]
+        data = _view(buffer, len(values) * size)
+        for i, value in enumerate(values):
+            components = value if isinstance(value, tuple) else (value,)
+            struct.pack_into(fmt, data, i * size, *components)
+        stats.bytes_out += len(values) * size
+        return (len(values),)
+
+    return read
+
+
+def _array_writer(element_type: str):
+    fmt = _ARRAY_FORMATS[element_type]
+    size = struct.calcsize(fmt)
+
+    def write(refId, start, buffer, count):
+        element = _get(refId, FakeElement)
+        length = len(_array_values(refId, element_type))
+        is_field = isinstance(element, FakeField)
+        if start < 0 or count < 0 or start > length or (is_field and start + count > 1):
+            raise _ResoniteError(FAILED_PRECONDITION)
+        data = _view(buffer, count * size)
+        values = [struct.unpack_from(fmt, data, i * size) for i in range(count)]
+        if len(fmt) == 2:
+            values = [value[0] for value in values]
+        stats.bytes_in += count * size
+        if is_field:
+            if values:
+                element.value = values[0]
+            return
+        element.values[start : start + count] = values
+
+    return write
+
+
+@_host_function
+def array__get_length(refId):
+    element = _get(refId, FakeElement)
+    if isinstance(element, FakeArrayField):
+        return (len(element.values),)
+    if isinstance(element, FakeField):
+        return (1,)
+    raise _ResoniteError(INVALID_REF_ID)
+
+
+@_host_function
+def array__read_int(refId, start, buffer, count):
+    return _array_reader("int")(refId, start, buffer, count)
+
+
+@_host_function
+def array__read_float(refId, start, buffer, count):
+    return _array_reader("float")(refId, start, buffer, count)
+
+
+@_host_function
+def array__read_double(refId, start, buffer, count):
+    return _array_reader("double")(refId, start, buffer, count)
+
+
+@_host_function
+def array__read_float2(refId, start, buffer, count):
+    return _array_reader("float2")(refId, start, buffer, count)
+
+
+@_host_function
+def array__read_float3(refId, start, buffer, count):
+    return _array_reader("float3")(refId, start, buffer, count)
+
+
+@_host_function
+def array__read_float4(refId, start, buffer, count):
+    return _array_reader("float4")(refId, start, buffer, count)
+
+
+@_host_function
+def array__read_floatQ(refId, start, buffer, count):
+    return _array_reader("floatQ")(refId, start, buffer, count)
+
+
+@_host_function
+def array__read_color(refId, start, buffer, count):
+    return _array_reader("color")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_int(refId, start, buffer, count):
+    _array_writer("int")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_float(refId, start, buffer, count):
+    _array_writer("float")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_double(refId, start, buffer, count):
+    _array_writer("double")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_float2(refId, start, buffer, count):
+    _array_writer("float2")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_float3(refId, start, buffer, count):
+    _array_writer("float3")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_float4(refId, start, buffer, count):
+    _array_writer("float4")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_floatQ(refId, start, buffer, count):
+    _array_writer("floatQ")(refId, start, buffer, count)
+
+
+@_host_function
+def array__write_color(refId, start, buffer, count):
+    _array_writer("color")(refId, start, buffer, count)
+
+
+_missing = set(_API) - {name for name, value in globals().items() if callable(value)}
+if _missing:
+    raise ImportError(f"resonitenative fake is missing {sorted(_missing)}")
+
+reset()
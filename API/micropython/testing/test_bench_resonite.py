@@ -0,0 +1,94 @@
+"""Checks the host calls each benchmarked operation makes.
+
+When an optimization changes how many host calls an operation takes, update the expected
+count here.
+"""
+
+import pytest
+
+import bench_resonite
+from bench_resonite import COMPONENTS, DEPTH, FANOUT
+
+
+@pytest.fixture
+def slots():
+    return bench_resonite.build_world()
+
+
+def test_walk_subtree(slots):
+    # get_name and get_children for each slot, plus finding the root.
+    assert bench_resonite.measure_calls(bench_resonite.walk_subtree)[0] == 1 + 2 * slots
+
+
+def test_walk_subtree_by_index(slots):
+    # get_name and children_count for each slot, get_child for each but the root, plus
+    # finding the root.
+    calls = bench_resonite.measure_calls(bench_resonite.walk_subtree_by_index)[0]
+    assert calls == 1 + 2 * slots + (slots - 1)
+
+
+def test_walk_subtree_paged(slots):
+    # A full page means another call to check for more children, so each slot with
+    # children takes an extra call.
+    parents = sum(FANOUT**level for level in range(DEPTH))
+    calls = bench_resonite.measure_calls(bench_resonite.walk_subtree_paged)[0]
+    assert calls == 1 + 2 * slots + parents
+
+
+def test_read_components(slots):
+    # Finding the slot, then get_components, which brings the type names with it.
+    calls = bench_resonite.measure_calls(bench_resonite.read_components)[0]
+    assert calls == 3
+
+
+def test_read_values(slots):
+    # Finding the slot, get_components, then a member and value per component.
+    calls = bench_resonite.measure_calls(bench_resonite.read_values)[0]
+    assert calls == 3 + 2 * COMPONENTS
+
+
+def test_read_values_warm(slots):
+    # Once the root, type names, and members are cached, only finding the slot,
+    # get_components, and the values themselves need the host.
+    bench_resonite.read_values()
+    calls = bench_resonite.measure_calls(bench_resonite.read_values)[0]
+    assert calls == 2 + COMPONENTS
+
+
+def test_write_values(slots):
+    # Finding the slot, get_components, then a member and write per component.
+    calls = bench_resonite.measure_calls(bench_resonite.write_values)[0]
+    assert calls == 3 + 2 * COMPONENTS
+
+
+def test_write_values_batched(slots):
+    # The writes collapse into creating, applying, and destroying one command buffer.
+    calls = bench_resonite.measure_calls(bench_resonite.write_values_batched)[0]
+    assert calls == 3 + COMPONENTS + 3
+
+
+def test_read_points(slots):
+    # Finding the root, the component, its type name, and the member, then the length
+    # and the points, however many there are.
+    calls = bench_resonite.measure_calls(bench_resonite.read_points)[0]
+    assert calls == 6
+    assert bench_resonite.read_points() == bench_resonite.POINTS
+
+
+def test_write_points(slots):
+    # Finding the member as in read_points, then one write for all the points.
+    assert bench_resonite.measure_calls(bench_resonite.write_points)[0] == 5
+
+
+def test_find_by_name(slots):
+    assert bench_resonite.measure_calls(bench_resonite.find_by_name)[0] == 2
+    assert bench_resonite.find_by_name() != 0
+
+
+def test_main_runs_without_pyperf(monkeypatch, capsys):
+    monkeypatch.setattr(bench_resonite, "pyperf", None)
+    monkeypatch.setattr(bench_resonite, "DEPTH", 1)
+
+    bench_resonite.main()
+
+    assert "walk_subtree:" in capsys.readouterr().err
@@ -0,0 +1,497 @@
+import array
+import importlib.util
+import pathlib
+import struct
+
+import pytest
+
+import resonite
+import resonitenative
+from resonite import ChangeFeed, ChangeKind, CommandBuffer, Component, Slot, Value
+from resonite.arrays import array_length, read_array, read_array_into, write_array
+from resonite.deserialize import SimpleType, deserialize
+from resonite.serialize import serialize
+
+
+def test_fake_implements_every_api_function():
+    for name in resonitenative._API:
+        assert callable(getattr(resonitenative, name)), name
+
+
+def test_slot_navigation(world):
+    a = world.add_child("a", tag="first")
+    b = a.add_child("b", tag="second")
+
+    root = Slot.root_slot()
+    assert root.reference_id == world.reference_id
+    assert root.get_name() == "Root"
+    assert root.children_count() == 1
+    assert root.get_child(0).reference_id == a.reference_id
+    assert [s.reference_id for s in root.get_children()] == [a.reference_id]
+    assert Slot(b.reference_id).get_parent().reference_id == a.reference_id
+    assert root.get_parent() is None
+    assert root.find_child_by_name("B", ignore_case=True).reference_id == b.reference_id
+    assert root.find_child_by_name("b", max_depth=0) is None
+    assert root.find_child_by_tag("second").reference_id == b.reference_id
+
+
+def test_get_children_range(world):
+    children = [world.add_child(str(i)).reference_id for i in range(5)]
+    root = Slot(world.reference_id)
+
+    assert [s.reference_id for s in root.get_children_range(1, 3)] == children[1:4]
+    assert [s.reference_id for s in root.get_children_range(3, 10)] == children[3:]
+    assert root.get_children_range(5, 1) == []
+    with pytest.raises(ValueError, match="Failed precondition"):
+        root.get_children_range(-1, 1)
+
+
+def test_iter_children_pages(world):
+    children = [world.add_child(str(i)).reference_id for i in range(10)]
+    root = Slot(world.reference_id)
+    resonitenative.stats.reset()
+
+    assert [s.reference_id for s in root.iter_children(page_size=4)] == children
+    assert resonitenative.stats.calls_by_name["slot__get_children_range"] == 3
+
+
+def test_iter_children_stops_early(world):
+    for i in range(100):
+        world.add_child(str(i))
+    root = Slot(world.reference_id)
+    resonitenative.stats.reset()
+
+    for child in root.iter_children(page_size=8):
+        if child.get_name() == "2":
+            break
+
+    # Only one page of refids crossed the boundary, not all 100 children.
+    assert resonitenative.stats.calls_by_name["slot__get_children_range"] == 1
+
+
+def test_set_name(world):
+    Slot(world.reference_id).set_name("Renamed")
+
+    assert world.name == "Renamed"
+
+
+def test_object_root(world):
+    a = world.add_child("a")
+    b = a.add_child("b")
+    a.is_object_root = True
+
+    assert Slot(b.reference_id).get_object_root().reference_id == a.reference_id
+    assert Slot(world.reference_id).get_object_root(True) is None
+
+
+def test_components(world):
+    component = world.add_component("FrooxEngine.ValueField<int>", Value=5)
+    slot = Slot(world.reference_id)
+
+    components = slot.get_components()
+    assert [c.reference_id for c in components] == [component.reference_id]
+    assert components[0].typename == "FrooxEngine.ValueField<int>"
+    found = slot.get_component("FrooxEngine.ValueField<int>")
+    assert found.reference_id == component.reference_id
+    assert found.typename == "FrooxEngine.ValueField<int>"
+    found = slot.get_component(component_type_name="FrooxEngine.ValueField<int>")
+    assert found.reference_id == component.reference_id
+
+
+def test_values(world):
+    component = world.add_component(
+        "Test",
+        Int=1,
+        Float=1.5,
+        Double=resonitenative.FakeField("double", 2.5),
+    )
+
+    member_type, int_ref = resonitenative.component__get_member(
+        component.reference_id, "Int"
+    )
+    assert member_type == resonitenative.TYPE_VALUE_INT
+    resonitenative.value__set_int(int_ref, 7)
+    assert resonitenative.value__get_int(int_ref) == (7,)
+
+    _, float_ref = resonitenative.component__get_member(component.reference_id, "Float")
+    resonitenative.value__set_float(float_ref, 0.1)
+    assert resonitenative.value__get_float(float_ref)[0] == pytest.approx(0.1, 1e-6)
+
+    _, double_ref = resonitenative.component__get_member(
+        component.reference_id, "Double"
+    )
+    assert resonitenative.value__get_double(double_ref) == (2.5,)
+
+
+def test_errors_raise_value_error(world):
+    component = world.add_component("Test", Int=1)
+    _, int_ref = resonitenative.component__get_member(component.reference_id, "Int")
+
+    with pytest.raises(ValueError, match="Invalid reference ID"):
+        resonitenative.slot__get_name(12345)
+    with pytest.raises(ValueError, match="Invalid reference ID"):
+        resonitenative.value__get_float(int_ref)
+    with pytest.raises(ValueError, match="Failed precondition"):
+        resonitenative.component__get_member(component.reference_id, "Missing")
+
+
+def test_counts_calls_and_bytes(world):
+    world.add_child("child")
+    resonitenative.stats.reset()
+
+    Slot(world.reference_id).get_name()
+    Slot(world.reference_id).get_children()
+
+    stats = resonitenative.stats
+    assert stats.calls == 2
+    assert stats.calls_by_name["slot__get_name"] == 1
+    # Two refids in, then "Root\0" and a one-element buffer out.
+    assert stats.bytes_in == 16
+    assert stats.bytes_out == 5 + 8 + 8
+
+
+def test_change_feed(world):
+    component = world.add_component("Test", Int=1)
+    field = component.members["Int"]
+    feed = ChangeFeed(256)
+    feed.watch(Slot(world.reference_id))
+    feed.watch(Component(field.reference_id, "field"))
+
+    world.name = "New name"
+    child = world.add_child("child")
+    field.value = 42
+    changes = list(feed.drain())
+
+    assert [(c.kind, c.reference_id) for c in changes] == [
+        (ChangeKind.NAME_CHANGED, world.reference_id),
+        (ChangeKind.CHILD_ADDED, world.reference_id),
+        (ChangeKind.FIELD_CHANGED, field.reference_id),
+    ]
+    assert changes[0].value == "New name"
+    assert changes[1].value.reference_id == child.reference_id
+    assert changes[2].value == 42
+    assert list(feed.drain()) == []
+    feed.close()
+
+
+def test_change_feed_drops_when_full(world):
+    feed = ChangeFeed(16)
+    feed.watch(Slot(world.reference_id))
+
+    world.name = "too long to fit"
+
+    assert feed.dropped() == 1
+    assert list(feed.drain()) == []
+
+
+def test_change_feed_wraps_around(world):
+    feed = ChangeFeed(32)
+    feed.watch(Slot(world.reference_id))
+
+    for i in range(10):
+        world.name = f"name{i}"
+        (change,) = list(feed.drain())
+        assert change.value == f"name{i}"
+    assert struct.unpack_from("<I", resonitenative.memory, feed._addr + 4)[0] > 32
+
+
+def test_change_feed_wraps_around_counter_overflow(world):
+    feed = ChangeFeed(32)
+    feed.watch(Slot(world.reference_id))
+    struct.pack_into("<II", resonitenative.memory, feed._addr + 4, 2**32 - 8, 2**32 - 8)
+
+    for i in range(3):
+        world.name = f"name{i}"
+        (change,) = list(feed.drain())
+        assert change.value == f"name{i}"
+    # head wrapped past 2**32.
+    assert struct.unpack_from("<I", resonitenative.memory, feed._addr + 4)[0] < 128
+
+
+def test_change_feed_capacity_must_be_power_of_two(world):
+    with pytest.raises(ValueError, match="Failed precondition"):
+        ChangeFeed(48)
+
+
+@pytest.mark.parametrize(
+    "value, simple_type",
+    [
+        (None, None),
+        (True, None),
+        (-7, None),
+        (1 << 40, None),
+        (0.25, None),
+        ("héllo", None),
+        ((1.0, 2.0, 3.0), None),
+        ((1, 2), SimpleType.INT2),
+        ((0.5, 0.5, 0.5, 1.0), SimpleType.COLORX),
+    ],
+)
+def test_serialize_round_trips(value, simple_type):
+    assert deserialize(serialize(value, simple_type)) == value
+
+
+def test_serialize_references(world):
+    data = serialize(Slot(world.reference_id))
+
+    assert deserialize(data).reference_id == world.reference_id
+
+
+def test_command_buffer_applies_in_one_call(world):
+    component = world.add_component("Test", Int=1, Float=1.5, Name="a")
+    children = [world.add_child(str(i)) for i in range(3)]
+    resonitenative.stats.reset()
+
+    with CommandBuffer() as commands:
+        commands.set_value(component.members["Int"].reference_id, 7)
+        commands.set_value(component.members["Float"].reference_id, 2)
+        commands.set_value(component.members["Name"].reference_id, "b")
+        for child in children:
+            commands.set_name(Slot(child.reference_id), child.name + "!")
+
+    assert component.members["Int"].value == 7
+    assert component.members["Float"].value == 2.0
+    assert component.members["Name"].value == "b"
+    assert [child.name for child in children] == ["0!", "1!", "2!"]
+    assert resonitenative.stats.calls_by_name["commands__apply"] == 1
+
+
+def test_command_buffer_flushes_when_full(world):
+    component = world.add_component("Test", Int=1)
+    field_id = component.members["Int"].reference_id
+    resonitenative.stats.reset()
+
+    # Each command is a 12-byte header and an 8-byte int.
+    with CommandBuffer(capacity=40) as commands:
+        for i in range(5):
+            commands.set_value(field_id, i)
+
+    assert component.members["Int"].value == 4
+    assert resonitenative.stats.calls_by_name["commands__apply"] == 3
+
+
+def test_command_buffer_rejects_whole_submission(world):
+    component = world.add_component("Test", Int=1)
+    field_id = component.members["Int"].reference_id
+
+    with pytest.raises(ValueError, match="Failed precondition"):
+        with CommandBuffer() as commands:
+            world_id = world.reference_id
+            commands.set_name(world_id, "renamed")
+            commands.set_value(field_id, "not an int")
+
+    assert world.name == "Root"
+    assert component.members["Int"].value == 1
+
+
+def test_command_buffer_reports_partial_application(world):
+    class RejectingField(resonitenative.FakeField):
+        @property
+        def value(self):
+            return self._value
+
+        @value.setter
+        def value(self, value) -> None:
+            raise RuntimeError("rejected")
+
+    component = world.add_component("Test", Int=1, Bad=RejectingField("int", 2))
+
+    with pytest.raises(RuntimeError, match="Only 1 of 3 commands were applied"):
+        with CommandBuffer() as commands:
+            commands.set_value(component.members["Int"].reference_id, 5)
+            commands.set_value(component.members["Bad"].reference_id, 6)
+            commands.set_name(world.reference_id, "renamed")
+
+    assert component.members["Int"].value == 5
+    assert world.name == "Root"
+
+
+def test_command_buffer_discards_on_exception(world):
+    with pytest.raises(RuntimeError):
+        with CommandBuffer() as commands:
+            commands.set_name(world.reference_id, "renamed")
+            raise RuntimeError()
+
+    assert world.name == "Root"
+    assert "commands__apply" not in resonitenative.stats.calls_by_name
+
+
+def _points(n: int) -> list:
+    return [(float(i), i + 0.5, -float(i)) for i in range(n)]
+
+
+def test_read_array_is_one_call(world):
+    points = resonitenative.FakeArrayField("float3", _points(1000))
+    mesh = world.add_component("PointMesh", Points=points)
+    resonitenative.stats.reset()
+
+    data = read_array(mesh.members["Points"].reference_id, "float3")
+
+    assert isinstance(data, array.array) and data.typecode == "f"
+    assert len(data) == 3000
+    assert tuple(data[3:6]) == (1.0, 1.5, -1.0)
+    assert resonitenative.stats.calls_by_name["array__read_float3"] == 1
+    assert resonitenative.stats.bytes_out >= 12 * 1000
+
+
+def test_read_array_range_into_buffer(world):
+    points = resonitenative.FakeArrayField("float3", _points(10))
+    buffer = array.array("f", [0] * 12)
+
+    assert array_length(points.reference_id) == 10
+    assert read_array_into(points.reference_id, "float3", buffer, start=8) == 2
+    assert list(memoryview(buffer)[:6]) == [8.0, 8.5, -8.0, 9.0, 9.5, -9.0]
+    assert list(read_array(points.reference_id, "float3", 2, 1)) == [2.0, 2.5, -2.0]
+
+
+def test_write_array_overwrites_and_extends(world):
+    ints = resonitenative.FakeArrayField("int", [1, 2, 3])
+
+    write_array(ints.reference_id, "int", array.array("i", [20, 30, 40]), start=1)
+    assert ints.values == [1, 20, 30, 40]
+
+    colors = resonitenative.FakeArrayField("color")
+    write_array(colors.reference_id, "color", [1, 0, 0, 1, 0, 1, 0, 0.5])
+    assert colors.values == [(1.0, 0.0, 0.0, 1.0), (0.0, 1.0, 0.0, 0.5)]
+
+
+def test_array_of_a_field_is_its_value(world):
+    component = world.add_component("Test", Float=1.5)
+    field_id = component.members["Float"].reference_id
+
+    assert array_length(field_id) == 1
+    assert list(read_array(field_id, "float")) == [1.5]
+    write_array(field_id, "float", [2.5])
+    assert component.members["Float"].value == 2.5
+    with pytest.raises(ValueError, match="Failed precondition"):
+        write_array(field_id, "float", [1, 2])
+
+
+def test_array_errors(world):
+    points = resonitenative.FakeArrayField("float3", _points(2))
+
+    with pytest.raises(ValueError, match="Invalid reference ID"):
+        read_array(points.reference_id, "float")
+    with pytest.raises(ValueError, match="Invalid reference ID"):
+        array_length(world.reference_id)
+    with pytest.raises(ValueError, match="Failed precondition"):
+        write_array(points.reference_id, "float3", [0, 0, 0], start=3)
+    with pytest.raises(ValueError, match="whole float3s"):
+        write_array(points.reference_id, "float3", [0, 0])
+    with pytest.raises(ValueError, match="Unsupported"):
+        read_array(points.reference_id, "colorX")
+
+
+def test_generated_wrappers_are_up_to_date(monkeypatch, tmp_path):
+    api_dir = pathlib.Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location(
+        "mp_generate_api",
+        api_dir / "micropython" / "usercmodule" / "resonite" / "generate_api.py",
+    )
+    generate_api = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(generate_api)
+    monkeypatch.chdir(api_dir)
+    monkeypatch.setattr(generate_api, "wrappers_path", lambda: tmp_path / "api.py")
+
+    generate_api.Main().generate_wrappers()
+
+    checked_in = api_dir / "micropython" / "fs" / "resonite" / "api.py"
+    assert (tmp_path / "api.py").read_text() == checked_in.read_text()
+
+
+def test_immutable_results_are_cached(world):
+    component = world.add_component("Test", Int=1)
+    resonitenative.stats.reset()
+
+    for _ in range(3):
+        assert Slot.root_slot().reference_id == world.reference_id
+        assert Component(component.reference_id).typename == "Test"
+        Component(component.reference_id).get_member("Int")
+
+    assert resonitenative.stats.calls == 3
+
+
+def test_get_components_fetches_type_names_in_bulk(world):
+    for i in range(5):
+        world.add_component(f"Test{i}", Int=i)
+    resonitenative.stats.reset()
+
+    components = Slot(world.reference_id).get_components()
+
+    assert [c.typename for c in components] == [f"Test{i}" for i in range(5)]
+    assert [c.get_type_name() for c in components] == [f"Test{i}" for i in range(5)]
+    assert resonitenative.stats.calls == 1
+
+
+def test_cache_evicts_one_entry_at_limit(world):
+    components = [world.add_component(f"Test{i}", Int=i) for i in range(3)]
+    resonite.set_cache_limit(2)
+    try:
+        resonitenative.stats.reset()
+        for component in components:
+            Component(component.reference_id)
+        # Only the oldest entry was evicted, so the newest two are still cached.
+        Component(components[1].reference_id)
+        Component(components[2].reference_id)
+        assert resonitenative.stats.calls == 3
+
+        Component(components[0].reference_id)
+        assert resonitenative.stats.calls == 4
+    finally:
+        resonite.set_cache_limit(4096)
+
+
+def test_make_new_of_missing_is_none(world):
+    slot = Slot(world.reference_id)
+
+    assert slot.get_component("Missing") is None
+    assert slot.get_active_user() is None
+    assert slot.get_active_user_root() is None
+
+
+def test_batchable_calls_queue_into_active_command_buffer(world):
+    child = Slot(world.add_child("child").reference_id)
+    resonitenative.stats.reset()
+
+    with CommandBuffer():
+        Slot(world.reference_id).set_name("new root")
+        child.set_name("new child")
+        assert world.name == "Root"
+
+    assert world.name == "new root"
+    assert child.get_name() == "new child"
+    assert "slot__set_name" not in resonitenative.stats.calls_by_name
+    assert resonitenative.stats.calls_by_name["commands__apply"] == 1
+
+    child.set_name("direct")
+    assert resonitenative.stats.calls_by_name["slot__set_name"] == 1
+
+
+def test_value_wrapper(world):
+    component = world.add_component("Test", Int=1, Float=1.5)
+    int_value = Value(Component(component.reference_id).get_member("Int")[1])
+    float_value = Value(Component(component.reference_id).get_member("Float")[1])
+
+    int_value.set_int(7)
+    float_value.set_float(0.25)
+
+    assert int_value.get_int() == 7
+    assert float_value.get_float() == 0.25
+
+
+def test_value_setters_queue_into_active_command_buffer(world):
+    component = world.add_component("Test", Int=1, Float=1.5)
+    int_value = Value(Component(component.reference_id).get_member("Int")[1])
+    float_value = Value(Component(component.reference_id).get_member("Float")[1])
+    resonitenative.stats.reset()
+
+    with CommandBuffer():
+        int_value.set_int(7)
+        float_value.set_float(0.25)
+        assert int_value.get_int() == 1
+
+    assert int_value.get_int() == 7
+    assert float_value.get_float() == 0.25
+    assert "value__set_int" not in resonitenative.stats.calls_by_name
+    assert "value__set_float" not in resonitenative.stats.calls_by_name
+    assert resonitenative.stats.calls_by_name["commands__apply"] == 1
@@ -0,0 +1,15 @@
+"""A CPython stand-in for MicroPython's uctypes module.
+
+Addresses refer to the fake WASM memory in resonitenative. Only what the resonite
+package uses is implemented.
+"""
+
+import resonitenative
+
+
+def bytearray_at(addr: int, size: int) -> memoryview:
+    return memoryview(resonitenative.memory)[addr : addr + size]
+
+
+def addressof(obj) -> int:
+    return resonitenative.address_of(obj)
@@ -67,6 +67,114 @@ def output_dir() -> pathlib.Path:
     return pathlib.Path(__file__).parent.resolve()
 
 
+def wrappers_path() -> pathlib.Path:
+    """Gets the path of the generated wrapper module in the resonite package."""
+    return output_dir().parents[1] / "fs" / "resonite" / "api.py"
+
+
+WRAPPERS_PREAMBLE = '''"""Base classes for the resonite package's wrapper classes.
+
+Autogenerated from resonite_api.json by generate_api.py. DO NOT EDIT.
+
+Wrapper classes with host functions (Slot, Component, Value) subclass the class here of
+the same name plus Api, which has a method for each host function on that class. Results
+of functions annotated immutable_result are cached, and calls to functions annotated
+batchable are queued into the active CommandBuffer, if there is one. Some methods call a
+bulk host function that also returns results of a cached function for each element, and
+store those in the cache, so that using the elements costs no further calls.
+"""
+
+import resonitenative
+
+# Results of immutable_result functions, keyed by function and arguments.
+_cache = {}
+_cache_limit = 4096
+
+
+def _store(key, rets) -> None:
+    if key not in _cache and len(_cache) >= _cache_limit:
+        # Evict one entry: the oldest, where dicts keep insertion order.
+        del _cache[next(iter(_cache))]
+    _cache[key] = rets
+
+
+def _call_cached(func, *args) -> tuple:
+    key = (func, args)
+    rets = _cache.get(key)
+    if rets is None:
+        rets = func(*args)
+        _store(key, rets)
+    return rets
+
+
+def _prefetch(func, reference_ids, results) -> None:
+    for reference_id, result in zip(reference_ids, results):
+        _store((func, (reference_id,)), (result,))
+
+
+def clear_cache() -> None:
+    """Forgets cached results, for when reference IDs are reused by a new world."""
+    _cache.clear()
+
+
+def set_cache_limit(limit: int) -> None:
+    """Sets how many results are cached before the oldest are evicted."""
+    global _cache_limit
+    _cache_limit = limit
+    while len(_cache) > limit:
+        del _cache[next(iter(_cache))]
+'''
+
+# The wrapper class for each function name prefix.
+WRAPPER_CLASSES: dict[str, str] = {
+    "slot": "Slot",
+    "component": "Component",
+    "user": "User",
+    "userroot": "UserRoot",
+    "value": "Value",
+}
+
+# Wrapper classes for reference types not named after their function name prefix.
+REF_TYPE_CLASSES: dict[str, str] = {
+    "ivalue": "Value",
+}
+
+# Method names that don't follow from the function name.
+METHOD_NAMES: dict[str, str] = {
+    "slot__get_num_children": "children_count",
+}
+
+# Methods that call a bulk host function instead of their own, by function name. The bulk
+# function takes the same arguments and returns the same first result, plus the results
+# of a cached one-argument function for each element of the first result, separated by
+# newlines. Those are stored in the cache.
+BULK_CALLS: dict[str, tuple[str, str]] = {
+    "slot__get_components": (
+        "slot__get_components_with_type_names",
+        "component__get_type_name",
+    ),
+}
+
+# Method parameter names that don't follow from the host function's parameter names,
+# by function name and snake case parameter name.
+PARAM_NAMES: dict[str, dict[str, str]] = {
+    "slot__get_component": {"type_name": "component_type_name"},
+}
+
+# Default values for method parameters, by function name and parameter name.
+PARAM_DEFAULTS: dict[str, dict[str, str]] = {
+    "slot__get_object_root": {"only_explicit": "False"},
+    "slot__find_child_by_name": {
+        "match_substring": "True",
+        "ignore_case": "False",
+        "max_depth": "-1",
+    },
+    "slot__find_child_by_tag": {"max_depth": "-1"},
+}
+
+LINE_LIMIT = 88
+
+
 @enum.unique
 class ValueType(enum.IntEnum):
     I32 = 0x7F
@@ -83,7 +191,8 @@ class GenericType:
     type_params: list["GenericType"]
 
     def __init__(self, base_type: str, type_params: list["GenericType"] | None = None):
-        self.base_type = base_type
+        # Nested C# types come through as Outer+Inner, e.g. ResoniteEnv+ResoniteType.
+        self.base_type = base_type.rsplit("+", 1)[-1]
         self.type_params = type_params if type_params is not None else []
 
     def is_output(self) -> bool:
@@ -416,9 +525,197 @@ class Main:
 
             f.write(MODULE_POSTAMBLE)
 
+    @staticmethod
+    def snake_case(name: str) -> str:
+        return "".join(f"_{c.lower()}" if c.isupper() else c for c in name)
+
+    @staticmethod
+    def py_type(cc_type: GenericType) -> str:
+        """Gets the Python type hint for an argument of the given type."""
+        if cc_type.base_type in ["int", "uint", "long", "ulong", "WasmRefID"]:
+            return "int"
+        if cc_type.base_type in ["float", "double"]:
+            return "float"
+        if cc_type.base_type == "bool":
+            return "bool"
+        if cc_type.base_type == "NullTerminatedString":
+            return "str"
+        raise ValueError(f"Unknown type: {cc_type}")
+
+    @staticmethod
+    def wrapped_class(cc_type: GenericType) -> str | None:
+        """Gets the wrapper class for a WasmRefID type, or None if it has none."""
+        if cc_type.base_type != "WasmRefID" or not cc_type.type_params:
+            return None
+        base_type = cc_type.type_params[0].base_type.lower()
+        return WRAPPER_CLASSES.get(base_type, REF_TYPE_CLASSES.get(base_type))
+
+    @staticmethod
+    def py_result(cc_type: GenericType, val: str) -> tuple[str, str]:
+        """Gets the Python expression and type hint for a result of the given type."""
+        cls = Main.wrapped_class(cc_type)
+        if cls is not None:
+            return f"{cls}.make_new({val})", f"{cls} | None"
+        if cc_type.base_type == "Buff":
+            cls = Main.wrapped_class(cc_type.type_params[0])
+            if cls is not None:
+                return f"[{cls}(ret) for ret in {val}]", f"list[{cls}]"
+            return val, "list"
+        if cc_type.base_type == "NullTerminatedString":
+            return val, "str | None"
+        if cc_type.base_type == "ResoniteType":
+            return val, "int"
+        return val, Main.py_type(cc_type)
+
+    @staticmethod
+    def write_call(f, indent: str, prefix: str, func: str, args: list[str]) -> None:
+        """Writes a call, wrapping its arguments the way black would."""
+        line = f"{indent}{prefix}{func}({', '.join(args)})"
+        if len(line) <= LINE_LIMIT:
+            f.write(f"{line}\n")
+            return
+        f.write(f"{indent}{prefix}{func}(\n")
+        joined = f"{indent}    {', '.join(args)}"
+        if len(joined) <= LINE_LIMIT:
+            f.write(f"{joined}\n")
+        else:
+            for arg in args:
+                f.write(f"{indent}    {arg},\n")
+        f.write(f"{indent})\n")
+
+    def write_wrapper_method(self, f, cls: str, item: dict) -> set[str]:
+        """Writes the method for a host function, returning the names it imports."""
+        name = item["Name"]
+        method = METHOD_NAMES.get(name, name.split("__", 1)[1])
+        annotations = item.get("Annotations", [])
+        params = item["Parameters"]
+        in_params = [p for p in params if not p["GenericType"].is_output()]
+        out_params = [p for p in params if p["GenericType"].is_output()]
+        imports: set[str] = set()
+
+        is_static = not in_params or self.wrapped_class(
+            in_params[0]["GenericType"]
+        ) != cls
+        if not is_static:
+            in_params = in_params[1:]
+        names = PARAM_NAMES.get(name, {})
+        defaults = PARAM_DEFAULTS.get(name, {})
+
+        sig_params = [] if is_static else ["self"]
+        call_args = [] if is_static else ["self.reference_id"]
+        for p in in_params:
+            arg = self.snake_case(p["Name"])
+            arg = names.get(arg, arg)
+            hint = f"{arg}: {self.py_type(p['GenericType'])}"
+            if arg in defaults:
+                hint += f" = {defaults[arg]}"
+            sig_params.append(hint)
+            call_args.append(arg)
+
+        results = []
+        for i, p in enumerate(out_params):
+            val = "rets[0]" if len(out_params) == 1 else f"rets[{i}]"
+            results.append(self.py_result(p["GenericType"].type_params[0], val))
+        for p in out_params:
+            generic_type = p["GenericType"].type_params[0]
+            if generic_type.base_type == "Buff":
+                generic_type = generic_type.type_params[0]
+            if self.wrapped_class(generic_type) is not None:
+                imports.add(self.wrapped_class(generic_type))
+        if not results:
+            ret_hint = "None"
+        elif len(results) == 1:
+            ret_hint = results[0][1]
+            # Unions, and classes defined later, only work as strings.
+            if "|" in ret_hint or any(c in ret_hint for c in WRAPPER_CLASSES.values()):
+                ret_hint = f'"{ret_hint}"'
+        else:
+            ret_hint = "tuple"
+
+        f.write("\n")
+        if is_static:
+            f.write("    @staticmethod\n")
+        def_line = f"    def {method}({', '.join(sig_params)}) -> {ret_hint}:"
+        if len(def_line) <= LINE_LIMIT:
+            f.write(f"{def_line}\n")
+        else:
+            f.write(f"    def {method}(\n")
+            for sig_param in sig_params:
+                f.write(f"        {sig_param},\n")
+            f.write(f"    ) -> {ret_hint}:\n")
+
+        if "batchable" in annotations:
+            if is_static or out_params:
+                raise ValueError(f"{name} can't be batched")
+            imports.add("active_command_buffer")
+            queue_args = ", ".join(["self"] + call_args[1:])
+            f.write("        commands = active_command_buffer()\n")
+            f.write("        if commands is not None:\n")
+            f.write(f"            commands.{method}({queue_args})\n")
+            f.write("            return\n")
+
+        func = f"resonitenative.{name}"
+        if "immutable_result" in annotations:
+            call_args = [func] + call_args
+            func = "_call_cached"
+        prefix = "rets = " if out_params else ""
+        if name in BULK_CALLS:
+            bulk_func, cached_func = BULK_CALLS[name]
+            func = f"resonitenative.{bulk_func}"
+            self.write_call(f, "        ", prefix, func, call_args)
+            self.write_call(
+                f,
+                "        ",
+                "",
+                "_prefetch",
+                [f"resonitenative.{cached_func}", "rets[0]", 'rets[1].split("\\n")'],
+            )
+        else:
+            self.write_call(f, "        ", prefix, func, call_args)
+
+        if len(results) == 1:
+            f.write(f"        return {results[0][0]}\n")
+        elif results:
+            f.write(f"        return {', '.join(r[0] for r in results)}\n")
+        return imports
+
+    def generate_wrappers(self) -> None:
+        """Generates the api.py module of the resonite package."""
+
+        data = self.get_api_data()
+
+        with open(wrappers_path(), "w", encoding="UTF8") as f:
+            f.write(WRAPPERS_PREAMBLE)
+            imports: set[str] = set()
+            bulk_funcs = {bulk_func for bulk_func, _ in BULK_CALLS.values()}
+            for prefix, cls in WRAPPER_CLASSES.items():
+                # Bulk functions are only called by the methods they stand in for.
+                items = [
+                    d
+                    for d in data
+                    if d["Name"].split("__", 1)[0] == prefix
+                    and d["Name"] not in bulk_funcs
+                ]
+                # Classes without host functions don't get a base class.
+                if not items:
+                    continue
+                f.write(f"\n\nclass {cls}Api:\n")
+                f.write("    reference_id: int\n")
+                for item in items:
+                    imports |= self.write_wrapper_method(f, cls, item)
+
+            # These are imported last, because their modules import this one.
+            f.write("\n\n")
+            if "active_command_buffer" in imports:
+                f.write("from resonite.commands import active_command_buffer\n")
+            for prefix, cls in WRAPPER_CLASSES.items():
+                if cls in imports:
+                    f.write(f"from resonite.{prefix} import {cls}\n")
+
     def main(self) -> int:
         """Generates all the shim files for the Python API."""
         self.generate_header()
         self.generate_impl()
         self.generate_module()
+        self.generate_wrappers()
         return 0
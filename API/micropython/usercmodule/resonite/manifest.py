@@ -0,0 +1,5 @@
+# Freezes the resonite package into the firmware, so importing it needs neither the slot
+# filesystem nor the compiler. Build with:
+#
+#   make USER_C_MODULES=../../user_modules FROZEN_MANIFEST=<path to this file>
+package("resonite", base_path="../../fs")
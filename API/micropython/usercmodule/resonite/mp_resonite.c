@@ -19,10 +19,12 @@ DEF_FUN(2, slot__set_name);
 DEF_FUN(1, slot__get_num_children);
 DEF_FUN(2, slot__get_child);
 DEF_FUN(1, slot__get_children);
+DEF_FUN(3, slot__get_children_range);
 DEF_FUNN(5, slot__find_child_by_name);
 DEF_FUN(3, slot__find_child_by_tag);
 DEF_FUN(2, slot__get_component);
 DEF_FUN(1, slot__get_components);
+DEF_FUN(1, slot__get_components_with_type_names);
 DEF_FUN(1, component__get_type_name);
 DEF_FUN(2, component__get_member);
 DEF_FUN(1, value__get_int);
@@ -31,6 +33,30 @@ DEF_FUN(1, value__get_double);
 DEF_FUN(2, value__set_int);
 DEF_FUN(2, value__set_float);
 DEF_FUN(2, value__set_double);
+DEF_FUN(1, changes__create_feed);
+DEF_FUN(1, changes__destroy_feed);
+DEF_FUN(2, changes__watch);
+DEF_FUN(2, changes__unwatch);
+DEF_FUN(1, commands__create_buffer);
+DEF_FUN(1, commands__destroy_buffer);
+DEF_FUN(2, commands__apply);
+DEF_FUN(1, array__get_length);
+DEF_FUNN(4, array__read_int);
+DEF_FUNN(4, array__read_float);
+DEF_FUNN(4, array__read_double);
+DEF_FUNN(4, array__read_float2);
+DEF_FUNN(4, array__read_float3);
+DEF_FUNN(4, array__read_float4);
+DEF_FUNN(4, array__read_floatQ);
+DEF_FUNN(4, array__read_color);
+DEF_FUNN(4, array__write_int);
+DEF_FUNN(4, array__write_float);
+DEF_FUNN(4, array__write_double);
+DEF_FUNN(4, array__write_float2);
+DEF_FUNN(4, array__write_float3);
+DEF_FUNN(4, array__write_float4);
+DEF_FUNN(4, array__write_floatQ);
+DEF_FUNN(4, array__write_color);
 STATIC const mp_rom_map_elem_t resonitenative_module_globals_table[] = {
     { MP_ROM_QSTR(MP_QSTR___name__), MP_ROM_QSTR(MODULE_NAME) },
     DEF_ENTRY(slot__root_slot),
@@ -43,10 +69,12 @@ STATIC const mp_rom_map_elem_t resonitenative_module_globals_table[] = {
     DEF_ENTRY(slot__get_num_children),
     DEF_ENTRY(slot__get_child),
     DEF_ENTRY(slot__get_children),
+    DEF_ENTRY(slot__get_children_range),
     DEF_ENTRY(slot__find_child_by_name),
     DEF_ENTRY(slot__find_child_by_tag),
     DEF_ENTRY(slot__get_component),
     DEF_ENTRY(slot__get_components),
+    DEF_ENTRY(slot__get_components_with_type_names),
     DEF_ENTRY(component__get_type_name),
     DEF_ENTRY(component__get_member),
     DEF_ENTRY(value__get_int),
@@ -55,6 +83,30 @@ STATIC const mp_rom_map_elem_t resonitenative_module_globals_table[] = {
     DEF_ENTRY(value__set_int),
     DEF_ENTRY(value__set_float),
     DEF_ENTRY(value__set_double),
+    DEF_ENTRY(changes__create_feed),
+    DEF_ENTRY(changes__destroy_feed),
+    DEF_ENTRY(changes__watch),
+    DEF_ENTRY(changes__unwatch),
+    DEF_ENTRY(commands__create_buffer),
+    DEF_ENTRY(commands__destroy_buffer),
+    DEF_ENTRY(commands__apply),
+    DEF_ENTRY(array__get_length),
+    DEF_ENTRY(array__read_int),
+    DEF_ENTRY(array__read_float),
+    DEF_ENTRY(array__read_double),
+    DEF_ENTRY(array__read_float2),
+    DEF_ENTRY(array__read_float3),
+    DEF_ENTRY(array__read_float4),
+    DEF_ENTRY(array__read_floatQ),
+    DEF_ENTRY(array__read_color),
+    DEF_ENTRY(array__write_int),
+    DEF_ENTRY(array__write_float),
+    DEF_ENTRY(array__write_double),
+    DEF_ENTRY(array__write_float2),
+    DEF_ENTRY(array__write_float3),
+    DEF_ENTRY(array__write_float4),
+    DEF_ENTRY(array__write_floatQ),
+    DEF_ENTRY(array__write_color),
 };
 
 STATIC MP_DEFINE_CONST_DICT(resonitenative_module_globals, resonitenative_module_globals_table);
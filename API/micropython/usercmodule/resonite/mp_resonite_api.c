@@ -178,6 +178,30 @@ mp_obj_t resonite__slot__get_children(mp_obj_t slot) {
   return mp_obj_new_tuple(1, _outs);
 }
 
+mp_obj_t resonite__slot__get_children_range(mp_obj_t slot, mp_obj_t start, mp_obj_t count) {
+  resonite_buff_t outChildren;
+
+  resonite_error_t _err = slot__get_children_range(
+    mp_obj_int_get_uint64_checked(slot), 
+    (int32_t)mp_obj_get_int(start), 
+    (int32_t)mp_obj_get_int(count), 
+    &outChildren);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t outChildren__list = mp_obj_new_list(0, NULL);
+  for (size_t i = 0; i < outChildren.len; i++) {
+    mp_obj_list_append(outChildren__list,
+      mp_obj_new_int_from_ll(((resonite_refid_t*)outChildren.ptr)[i]));
+  }
+  mp_obj_t _outs[1] = {
+    outChildren__list};
+
+  free(outChildren.ptr);
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
 mp_obj_t resonite__slot__find_child_by_name(size_t n_args, const mp_obj_t *args) {
   resonite_refid_t outChild;
 
@@ -255,6 +279,31 @@ mp_obj_t resonite__slot__get_components(mp_obj_t slot) {
   return mp_obj_new_tuple(1, _outs);
 }
 
+mp_obj_t resonite__slot__get_components_with_type_names(mp_obj_t slot) {
+  resonite_buff_t outComponents;
+  char * outTypeNames;
+
+  resonite_error_t _err = slot__get_components_with_type_names(
+    mp_obj_int_get_uint64_checked(slot), 
+    &outComponents, 
+    &outTypeNames);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t outComponents__list = mp_obj_new_list(0, NULL);
+  for (size_t i = 0; i < outComponents.len; i++) {
+    mp_obj_list_append(outComponents__list,
+      mp_obj_new_int_from_ll(((resonite_refid_t*)outComponents.ptr)[i]));
+  }
+  mp_obj_t _outs[2] = {
+    outComponents__list, 
+    mp_obj_new_null_terminated_str(outTypeNames)};
+
+  free(outComponents.ptr);
+
+  return mp_obj_new_tuple(2, _outs);
+}
+
 mp_obj_t resonite__component__get_type_name(mp_obj_t component) {
   char * outTypeName;
 
@@ -381,3 +430,402 @@ mp_obj_t resonite__value__set_double(mp_obj_t refId, mp_obj_t value) {
   return mp_obj_new_tuple(0, _outs);
 }
 
+mp_obj_t resonite__changes__create_feed(mp_obj_t capacity) {
+  int32_t outFeed;
+
+  resonite_error_t _err = changes__create_feed(
+    (int32_t)mp_obj_get_int(capacity), 
+    &outFeed);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outFeed)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__changes__destroy_feed(mp_obj_t feed) {
+
+  resonite_error_t _err = changes__destroy_feed(
+    (int32_t)mp_obj_get_int(feed));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__changes__watch(mp_obj_t feed, mp_obj_t refId) {
+
+  resonite_error_t _err = changes__watch(
+    (int32_t)mp_obj_get_int(feed), 
+    mp_obj_int_get_uint64_checked(refId));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__changes__unwatch(mp_obj_t feed, mp_obj_t refId) {
+
+  resonite_error_t _err = changes__unwatch(
+    (int32_t)mp_obj_get_int(feed), 
+    mp_obj_int_get_uint64_checked(refId));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__commands__create_buffer(mp_obj_t capacity) {
+  int32_t outBuffer;
+
+  resonite_error_t _err = commands__create_buffer(
+    (int32_t)mp_obj_get_int(capacity), 
+    &outBuffer);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outBuffer)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__commands__destroy_buffer(mp_obj_t buffer) {
+
+  resonite_error_t _err = commands__destroy_buffer(
+    (int32_t)mp_obj_get_int(buffer));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__commands__apply(mp_obj_t buffer, mp_obj_t length) {
+  int32_t outApplied;
+
+  resonite_error_t _err = commands__apply(
+    (int32_t)mp_obj_get_int(buffer), 
+    (int32_t)mp_obj_get_int(length), 
+    &outApplied);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outApplied)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__get_length(mp_obj_t refId) {
+  int32_t outLength;
+
+  resonite_error_t _err = array__get_length(
+    mp_obj_int_get_uint64_checked(refId), 
+    &outLength);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outLength)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_int(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_int(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_float(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_float(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_double(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_double(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_float2(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_float2(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_float3(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_float3(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_float4(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_float4(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_floatQ(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_floatQ(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__read_color(size_t n_args, const mp_obj_t *args) {
+  int32_t outCount;
+
+  resonite_error_t _err = array__read_color(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]), 
+    &outCount);
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[1] = {
+    mp_obj_new_int_from_ll(outCount)};
+
+
+  return mp_obj_new_tuple(1, _outs);
+}
+
+mp_obj_t resonite__array__write_int(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_int(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__array__write_float(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_float(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__array__write_double(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_double(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__array__write_float2(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_float2(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__array__write_float3(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_float3(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__array__write_float4(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_float4(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__array__write_floatQ(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_floatQ(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
+mp_obj_t resonite__array__write_color(size_t n_args, const mp_obj_t *args) {
+
+  resonite_error_t _err = array__write_color(
+    mp_obj_int_get_uint64_checked(args[0]), 
+    (int32_t)mp_obj_get_int(args[1]), 
+    (int32_t)mp_obj_get_int(args[2]), 
+    (int32_t)mp_obj_get_int(args[3]));
+
+  mp_resonite_check_error(_err);
+
+  mp_obj_t _outs[0] = {};
+
+
+  return mp_obj_new_tuple(0, _outs);
+}
+
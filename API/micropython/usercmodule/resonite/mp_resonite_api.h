@@ -18,10 +18,12 @@ extern mp_obj_t resonite__slot__set_name(mp_obj_t slot, mp_obj_t name);
 extern mp_obj_t resonite__slot__get_num_children(mp_obj_t slot);
 extern mp_obj_t resonite__slot__get_child(mp_obj_t slot, mp_obj_t index);
 extern mp_obj_t resonite__slot__get_children(mp_obj_t slot);
+extern mp_obj_t resonite__slot__get_children_range(mp_obj_t slot, mp_obj_t start, mp_obj_t count);
 extern mp_obj_t resonite__slot__find_child_by_name(size_t n_args, const mp_obj_t *args);
 extern mp_obj_t resonite__slot__find_child_by_tag(mp_obj_t slot, mp_obj_t tag, mp_obj_t max_depth);
 extern mp_obj_t resonite__slot__get_component(mp_obj_t slot, mp_obj_t typeName);
 extern mp_obj_t resonite__slot__get_components(mp_obj_t slot);
+extern mp_obj_t resonite__slot__get_components_with_type_names(mp_obj_t slot);
 extern mp_obj_t resonite__component__get_type_name(mp_obj_t component);
 extern mp_obj_t resonite__component__get_member(mp_obj_t component, mp_obj_t name);
 extern mp_obj_t resonite__value__get_int(mp_obj_t refId);
@@ -30,5 +32,29 @@ extern mp_obj_t resonite__value__get_double(mp_obj_t refId);
 extern mp_obj_t resonite__value__set_int(mp_obj_t refId, mp_obj_t value);
 extern mp_obj_t resonite__value__set_float(mp_obj_t refId, mp_obj_t value);
 extern mp_obj_t resonite__value__set_double(mp_obj_t refId, mp_obj_t value);
+extern mp_obj_t resonite__changes__create_feed(mp_obj_t capacity);
+extern mp_obj_t resonite__changes__destroy_feed(mp_obj_t feed);
+extern mp_obj_t resonite__changes__watch(mp_obj_t feed, mp_obj_t refId);
+extern mp_obj_t resonite__changes__unwatch(mp_obj_t feed, mp_obj_t refId);
+extern mp_obj_t resonite__commands__create_buffer(mp_obj_t capacity);
+extern mp_obj_t resonite__commands__destroy_buffer(mp_obj_t buffer);
+extern mp_obj_t resonite__commands__apply(mp_obj_t buffer, mp_obj_t length);
+extern mp_obj_t resonite__array__get_length(mp_obj_t refId);
+extern mp_obj_t resonite__array__read_int(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__read_float(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__read_double(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__read_float2(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__read_float3(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__read_float4(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__read_floatQ(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__read_color(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_int(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_float(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_double(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_float2(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_float3(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_float4(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_floatQ(size_t n_args, const mp_obj_t *args);
+extern mp_obj_t resonite__array__write_color(size_t n_args, const mp_obj_t *args);
 
 #endif // __DERGWASM_MICROPYTHON_USERCMODULE_RESONITE_RESONITE_API_H__
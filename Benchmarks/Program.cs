@@ -1,5 +1,7 @@
 using System;
 using System.Collections.Generic;
+using System.IO;
+using System.Linq;
 using BenchmarkDotNet.Attributes;
 using BenchmarkDotNet.Jobs;
 using BenchmarkDotNet.Running;
@@ -476,6 +478,36 @@ namespace DergwasmTests
         }
     }
 
+    // Compares reading the firmware module with the code section decoded serially against
+    // decoding the function bodies on the thread pool. Only parsing is measured; the module
+    // is not instantiated.
+    [SimpleJob(RuntimeMoniker.Net472, baseline: true)]
+    [MemoryDiagnoser]
+    public class ModuleReadBenchmark
+    {
+        byte[] firmware;
+
+        [GlobalSetup]
+        public void Setup()
+        {
+            firmware = File.ReadAllBytes("firmware.wasm");
+        }
+
+        Module Read(bool parallel)
+        {
+            using (BinaryReader reader = new BinaryReader(new MemoryStream(firmware, false)))
+            {
+                return Module.Read("firmware", reader, parallel);
+            }
+        }
+
+        [Benchmark(Baseline = true)]
+        public Module ReadSerial() => Read(false);
+
+        [Benchmark]
+        public Module ReadParallel() => Read(true);
+    }
+
     // BenchmarkDotNet v0.13.10, Windows 10 (10.0.19045.3930/22H2/2022Update)
     // Intel Core i7-7660U CPU 2.50GHz(Kaby Lake), 1 CPU, 4 logical and 2 physical cores
     //   [Host]               : .NET Framework 4.8.1 (4.8.9195.0), X64 RyuJIT VectorSize=256 [AttachedDebugger]
@@ -582,6 +614,81 @@ namespace DergwasmTests
         }
     }
 
+    // Measures Python raise/catch throughput. Every raise is a longjmp (MicroPython's nlr), so
+    // this compares unwinding with a .NET exception (the old way) against unwinding by marking
+    // the machine and letting each frame's run loop return.
+    [SimpleJob(RuntimeMoniker.Net472, baseline: true)]
+    [MemoryDiagnoser]
+    public class MicropythonRaiseCatchBenchmark
+    {
+        DergwasmLoadModule.Program program;
+        Frame frame;
+        int source;
+
+        [Params(100)]
+        public int N;
+
+        [GlobalSetup]
+        public void Setup()
+        {
+            program = new DergwasmLoadModule.Program("firmware.wasm");
+            program.InitMicropython(64 * 1024);
+            frame = program.emscriptenEnv.EmptyFrame();
+            Buff<byte> code = program.emscriptenEnv.AllocateUTF8StringInMem(
+                frame,
+                $"for i in range({N}):\n"
+                    + "    try:\n"
+                    + "        raise ValueError\n"
+                    + "    except ValueError:\n"
+                    + "        pass\n"
+            );
+            source = code.Ptr.Addr;
+        }
+
+        void RaiseCatch(bool throwExceptions)
+        {
+            program.emscriptenEnv.ThrowLongjmpExceptions = throwExceptions;
+            program.machine.CallExportedFunc("mp_js_do_str", frame, source);
+        }
+
+        [Benchmark(Baseline = true)]
+        public void RaiseCatchWithExceptions() => RaiseCatch(true);
+
+        [Benchmark]
+        public void RaiseCatchWithoutExceptions() => RaiseCatch(false);
+    }
+
+    // Replays a host call trace recorded in a live world (see HostCallTrace) against the
+    // firmware, reproducing the recorded script's execution without Resonite. Record a trace
+    // by setting the mod's host_call_trace config key, and point DERGWASM_TRACE at it.
+    [SimpleJob(RuntimeMoniker.Net472, baseline: true)]
+    [MemoryDiagnoser]
+    public class HostCallReplayBenchmark
+    {
+        byte[] trace;
+        DergwasmLoadModule.Program program;
+
+        [GlobalSetup]
+        public void Setup()
+        {
+            string path = Environment.GetEnvironmentVariable("DERGWASM_TRACE") ?? "trace.dwht";
+            trace = File.ReadAllBytes(path);
+        }
+
+        // Loading the firmware isn't part of the measurement.
+        [IterationSetup]
+        public void LoadFirmware()
+        {
+            program = new DergwasmLoadModule.Program(
+                "firmware.wasm",
+                new MemoryStream(trace, false)
+            );
+        }
+
+        [Benchmark]
+        public void Replay() => program.Replay();
+    }
+
     // BenchmarkDotNet v0.13.10, Windows 10 (10.0.19045.3930/22H2/2022Update)
     // Intel Core i7-7660U CPU 2.50GHz(Kaby Lake), 1 CPU, 4 logical and 2 physical cores
     //   [Host]               : .NET Framework 4.8.1 (4.8.9195.0), X64 RyuJIT VectorSize=256 [AttachedDebugger]
@@ -689,6 +796,11 @@ namespace DergwasmTests
     {
         public static void Main(string[] args)
         {
+            if (args.Length > 0 && args[0] == "--workloads")
+            {
+                Environment.ExitCode = WorkloadSuite.Run(args.Skip(1).ToArray());
+                return;
+            }
             BenchmarkSwitcher.FromAssembly(typeof(Program).Assembly).Run(args);
         }
     }
@@ -0,0 +1,456 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Text.Json;
+using Dergwasm;
+using Dergwasm.Runtime;
+using Dergwasm.Wasm;
+using DergwasmTests.testing;
+
+namespace DergwasmTests
+{
+    // A Python program run against the MicroPython firmware by the workload suite.
+    //
+    // Before the source runs, N is set to Iterations, and INT_FIELD to the reference ID of an
+    // int field that the program may read and write through resonitenative.
+    public class Workload
+    {
+        public string Name;
+        public int Iterations;
+        public string Source;
+
+        public Workload(string name, int iterations, string source)
+        {
+            Name = name;
+            Iterations = iterations;
+            Source = source;
+        }
+    }
+
+    // The measurements of one workload. Rates are per second of wall time.
+    public class WorkloadResult
+    {
+        public string Name { get; set; }
+        public double Seconds { get; set; }
+        public long Instructions { get; set; }
+        public long HostCalls { get; set; }
+        public long AllocatedBytes { get; set; }
+        public double InstructionsPerSecond { get; set; }
+        public double HostCallsPerSecond { get; set; }
+    }
+
+    // The results of a run of the workload suite. This is also the format of the baseline.
+    public class WorkloadReport
+    {
+        public double ModuleLoadSeconds { get; set; }
+        public List<WorkloadResult> Workloads { get; set; } = new List<WorkloadResult>();
+    }
+
+    // Runs representative MicroPython workloads on the firmware in a FakeWorld, and compares
+    // their instruction rate, host call rate, allocations, and the module load time against a
+    // baseline. Unlike the BenchmarkDotNet benchmarks, this measures whole programs, so that
+    // every performance change has a number to move.
+    //
+    //   Benchmarks --workloads [--baseline PATH] [--threshold FRACTION] [--repetitions N]
+    //                          [--update-baseline]
+    //
+    // The baseline defaults to the copy of workloads_baseline.json next to the executable. A
+    // metric regresses if it's worse than the baseline by more than the threshold (default
+    // 0.1, that is, 10%), in which case the exit code is 1. To update the checked-in baseline,
+    // run on the reference machine with --update-baseline and --baseline pointing at
+    // Benchmarks/workloads_baseline.json.
+    //
+    // Each workload runs once to warm up, then the fastest of the repetitions is reported.
+    // There are no slots in a FakeWorld, so the filesystem is an in-memory tree holding the
+    // modules in BenchModules under /lib. The import workload drops each module from
+    // sys.modules after importing it, so every import finds, reads, and compiles its source.
+    //
+    // Metrics missing from the baseline, such as those of a new workload, are reported as
+    // having no baseline and don't fail the comparison.
+    public static class WorkloadSuite
+    {
+        public static readonly List<Workload> Workloads = new List<Workload>
+        {
+            new Workload(
+                "pystone",
+                2000,
+                @"
+class Record:
+    def __init__(self, ptr=None, discr=0, enum=0, int_comp=0, str_comp=''):
+        self.ptr = ptr
+        self.discr = discr
+        self.enum = enum
+        self.int_comp = int_comp
+        self.str_comp = str_comp
+
+    def copy(self):
+        return Record(self.ptr, self.discr, self.enum, self.int_comp, self.str_comp)
+
+def proc7(a, b):
+    return a + b + 2
+
+def proc8(array1, array2, a, b):
+    loc = a + 5
+    array1[loc] = b
+    array1[loc + 1] = array1[loc]
+    array2[loc][loc] += 1
+    return loc
+
+def func1(c1, c2):
+    return 0 if c1 != c2 else 1
+
+def run():
+    array1 = [0] * 51
+    array2 = [[0] * 51 for _ in range(51)]
+    glob = Record(None, 0, 2, 40, 'DHRYSTONE PROGRAM, SOME STRING')
+    for i in range(N):
+        rec = glob.copy()
+        rec.int_comp = proc7(rec.int_comp, i % 10)
+        loc = proc8(array1, array2, i % 10, rec.int_comp)
+        if func1('A', 'B') == 0:
+            rec.enum = (rec.enum + 1) % 5
+        s = ""DHRYSTONE PROGRAM, 2'ND STRING"" if i & 1 else rec.str_comp
+        glob.discr = loc + len(s)
+
+run()
+"
+            ),
+            new Workload(
+                "dict_str",
+                1000,
+                @"
+def run():
+    d = {}
+    for i in range(N):
+        d['key%d' % i] = str(i) * 3
+    total = 0
+    for k, v in d.items():
+        if k.startswith('key1'):
+            total += len(v.upper())
+    words = ' '.join(d.keys()).split(' ')
+    d2 = {w: i for i, w in enumerate(words) if '7' in w}
+    return total + len(d2)
+
+run()
+"
+            ),
+            new Workload(
+                "exceptions",
+                500,
+                @"
+class BenchError(Exception):
+    pass
+
+def fail(i):
+    if i & 1:
+        raise BenchError(i)
+    raise KeyError(i)
+
+def run():
+    caught = 0
+    for i in range(N):
+        try:
+            try:
+                fail(i)
+            finally:
+                caught += 1
+        except BenchError:
+            caught += 1
+        except KeyError as e:
+            caught += len(e.args)
+    return caught
+
+run()
+"
+            ),
+            new Workload(
+                "vfs_import",
+                100,
+                @"
+import sys
+
+def run():
+    for i in range(N):
+        name = 'bench_module_%d' % (i % BENCH_MODULES)
+        __import__(name)
+        del sys.modules[name]
+
+run()
+"
+            ),
+            new Workload(
+                "resonite_api",
+                500,
+                @"
+import resonitenative
+
+def run():
+    total = 0
+    for i in range(N):
+        resonitenative.value__set_int(INT_FIELD, i)
+        total += resonitenative.value__get_int(INT_FIELD)[0]
+        resonitenative.slot__root_slot()
+    return total
+
+run()
+"
+            ),
+        };
+
+        // The number of modules the import workload cycles through.
+        const int BenchModules = 10;
+
+        static FakeWorld world;
+        static TestComponent testComponent;
+        static StringBuilder output = new StringBuilder();
+
+        public static int Run(string[] args)
+        {
+            string baselinePath = Path.Combine(
+                AppDomain.CurrentDomain.BaseDirectory,
+                "workloads_baseline.json"
+            );
+            double threshold = 0.1;
+            int repetitions = 5;
+            bool updateBaseline = false;
+            for (int i = 0; i < args.Length; i++)
+            {
+                switch (args[i])
+                {
+                    case "--baseline":
+                        baselinePath = args[++i];
+                        break;
+                    case "--threshold":
+                        threshold = double.Parse(args[++i]);
+                        break;
+                    case "--repetitions":
+                        repetitions = int.Parse(args[++i]);
+                        break;
+                    case "--update-baseline":
+                        updateBaseline = true;
+                        break;
+                    default:
+                        Console.WriteLine($"Unknown workload suite argument: {args[i]}");
+                        return 2;
+                }
+            }
+
+            WorkloadReport report = new WorkloadReport { ModuleLoadSeconds = Load() };
+            foreach (Workload workload in Workloads)
+            {
+                report.Workloads.Add(Measure(workload, repetitions));
+            }
+
+            JsonSerializerOptions options = new JsonSerializerOptions { WriteIndented = true };
+            if (updateBaseline)
+            {
+                File.WriteAllText(baselinePath, JsonSerializer.Serialize(report, options));
+                Console.WriteLine($"Wrote baseline to {baselinePath}");
+                return 0;
+            }
+
+            WorkloadReport baseline = File.Exists(baselinePath)
+                ? JsonSerializer.Deserialize<WorkloadReport>(File.ReadAllText(baselinePath))
+                : new WorkloadReport();
+            return Compare(report, baseline, threshold) ? 1 : 0;
+        }
+
+        // Loads the firmware the way the mod does, returning how long it took.
+        static double Load()
+        {
+            ResonitePatches.Apply();
+            AppDomain.MonitoringIsEnabled = true;
+            world = new FakeWorld();
+            world.AddAssetFile(new Uri("file:///firmware.wasm"), "firmware.wasm");
+
+            Stopwatch stopwatch = Stopwatch.StartNew();
+            DergwasmMachine.InitStage0(
+                world,
+                new FakeDergwasmSlots { FilesystemRoot = Filesystem() }
+            );
+            stopwatch.Stop();
+            if (!DergwasmMachine.initialized)
+            {
+                throw new Exception("The firmware failed to load");
+            }
+            DergwasmMachine.emscriptenEnv.outputWriter = s => output.Append(s);
+
+            testComponent = new TestComponent(world);
+            testComponent.Initialize();
+            return stopwatch.Elapsed.TotalSeconds;
+        }
+
+        // Builds the filesystem that the firmware sees: /lib holding the modules that the
+        // import workload imports.
+        static FakeFileNode Filesystem()
+        {
+            FakeFileNode root = new FakeFileNode();
+            FakeFileNode lib = root.AddDirectory("lib");
+            for (int i = 0; i < BenchModules; i++)
+            {
+                lib.AddFile(
+                    $"bench_module_{i}.py",
+                    $"VALUE = {i}\n"
+                        + "\n"
+                        + "class Point:\n"
+                        + "    def __init__(self, x, y):\n"
+                        + "        self.x = x\n"
+                        + "        self.y = y\n"
+                        + "\n"
+                        + "    def scaled(self, k):\n"
+                        + "        return Point(self.x * k, self.y * k)\n"
+                        + "\n"
+                        + "def origin():\n"
+                        + "    return Point(VALUE, VALUE)\n"
+                );
+            }
+            return root;
+        }
+
+        // Runs the Python source, throwing if it raised an exception.
+        static void RunPython(string source)
+        {
+            Frame frame = DergwasmMachine.emscriptenEnv.EmptyFrame();
+            Buff<byte> code = DergwasmMachine.emscriptenEnv.AllocateUTF8StringInMem(
+                frame,
+                source
+            );
+            output.Clear();
+            int result;
+            try
+            {
+                result = DergwasmMachine.emscriptenEnv.mp_js_do_str(frame, code.Ptr.Addr);
+            }
+            finally
+            {
+                DergwasmMachine.emscriptenEnv.Free(frame, code.Ptr);
+            }
+            if (result != 0 || output.ToString().Contains("Traceback"))
+            {
+                throw new Exception($"Workload failed with exit code {result}:\n{output}");
+            }
+        }
+
+        static long AllocatedBytes()
+        {
+            // The total is only brought up to date by a collection.
+            GC.Collect();
+            return AppDomain.CurrentDomain.MonitoringTotalAllocatedMemorySize;
+        }
+
+        static WorkloadResult Measure(Workload workload, int repetitions)
+        {
+            string source =
+                $"N = {workload.Iterations}\n"
+                + $"BENCH_MODULES = {BenchModules}\n"
+                + $"INT_FIELD = {(ulong)testComponent.IntField.ReferenceID}\n"
+                + workload.Source;
+            Machine machine = DergwasmMachine.machine;
+
+            RunPython(source);
+            WorkloadResult best = null;
+            for (int i = 0; i < repetitions; i++)
+            {
+                long allocated = AllocatedBytes();
+                long instructions = machine.InstructionCount;
+                long hostCalls = machine.HostCallCount;
+                Stopwatch stopwatch = Stopwatch.StartNew();
+                RunPython(source);
+                stopwatch.Stop();
+
+                double seconds = stopwatch.Elapsed.TotalSeconds;
+                WorkloadResult result = new WorkloadResult
+                {
+                    Name = workload.Name,
+                    Seconds = seconds,
+                    Instructions = machine.InstructionCount - instructions,
+                    HostCalls = machine.HostCallCount - hostCalls,
+                    AllocatedBytes = AllocatedBytes() - allocated,
+                };
+                result.InstructionsPerSecond = result.Instructions / seconds;
+                result.HostCallsPerSecond = result.HostCalls / seconds;
+                if (best == null || result.Seconds < best.Seconds)
+                {
+                    best = result;
+                }
+            }
+            return best;
+        }
+
+        // Prints the report next to the baseline, returning true if anything regressed.
+        static bool Compare(WorkloadReport report, WorkloadReport baseline, double threshold)
+        {
+            bool regressed = false;
+
+            void Check(
+                string name,
+                string metric,
+                double value,
+                double baseValue,
+                bool higherIsBetter
+            )
+            {
+                if (baseValue <= 0)
+                {
+                    Console.WriteLine($"  {name,-14} {metric,-24} {value,16:N0}  (no baseline)");
+                    return;
+                }
+                double change = (value - baseValue) / baseValue;
+                bool worse = higherIsBetter ? change < -threshold : change > threshold;
+                regressed |= worse;
+                Console.WriteLine(
+                    $"  {name,-14} {metric,-24} {value,16:N0}  {change,8:+0.0%;-0.0%}"
+                        + (worse ? "  REGRESSION" : "")
+                );
+            }
+
+            Console.WriteLine($"Workloads (threshold {threshold:P0}):");
+            Check(
+                "load",
+                "ModuleLoadMilliseconds",
+                report.ModuleLoadSeconds * 1000,
+                baseline.ModuleLoadSeconds * 1000,
+                false
+            );
+            foreach (WorkloadResult result in report.Workloads)
+            {
+                WorkloadResult baseResult =
+                    baseline.Workloads.FirstOrDefault(r => r.Name == result.Name)
+                    ?? new WorkloadResult();
+                Check(
+                    result.Name,
+                    "InstructionsPerSecond",
+                    result.InstructionsPerSecond,
+                    baseResult.InstructionsPerSecond,
+                    true
+                );
+                Check(
+                    result.Name,
+                    "HostCallsPerSecond",
+                    result.HostCallsPerSecond,
+                    baseResult.HostCallsPerSecond,
+                    true
+                );
+                Check(
+                    result.Name,
+                    "Instructions",
+                    result.Instructions,
+                    baseResult.Instructions,
+                    false
+                );
+                Check(
+                    result.Name,
+                    "AllocatedBytes",
+                    result.AllocatedBytes,
+                    baseResult.AllocatedBytes,
+                    false
+                );
+            }
+            Console.WriteLine(regressed ? "Regressions found." : "No regressions.");
+            return regressed;
+        }
+    }
+}
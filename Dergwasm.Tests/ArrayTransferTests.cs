@@ -0,0 +1,155 @@
+﻿using Dergwasm;
+using Dergwasm.Environments;
+using Dergwasm.Resonite;
+using Dergwasm.Runtime;
+using Dergwasm.Wasm;
+using DergwasmTests.testing;
+using FrooxEngine;
+using Xunit;
+
+namespace DergwasmTests
+{
+    public class ArrayTransferTests
+    {
+        FakeWorld world;
+        TestEmscriptenEnv emscriptenEnv;
+        ResoniteEnv env;
+        Machine machine;
+        Frame frame;
+        TestComponent testComponent;
+
+        public ArrayTransferTests()
+        {
+            ResonitePatches.Apply();
+            world = new FakeWorld();
+            emscriptenEnv = new TestEmscriptenEnv();
+            machine = emscriptenEnv.machine;
+            env = new ResoniteEnv(machine, world, emscriptenEnv);
+            SimpleSerialization.Initialize(env);
+            frame = emscriptenEnv.EmptyFrame(null);
+
+            testComponent = new TestComponent(world);
+            testComponent.Initialize();
+        }
+
+        WasmRefID<IWorldElement> FloatFieldRef =>
+            new WasmRefID<IWorldElement>(testComponent.FloatField.ReferenceID);
+
+        [Fact]
+        public void GetLengthOfFieldIsOne()
+        {
+            Output<int> outLength = new Output<int>(emscriptenEnv.Malloc(null, 4));
+
+            Assert.Equal(
+                ResoniteError.Success,
+                env.array__get_length(frame, FloatFieldRef, outLength)
+            );
+            Assert.Equal(1, machine.HeapGet(outLength));
+        }
+
+        [Fact]
+        public void GetLengthFailsOnNonexistentRefID()
+        {
+            Assert.Equal(
+                ResoniteError.InvalidRefId,
+                env.array__get_length(
+                    frame,
+                    new WasmRefID<IWorldElement>(0xFFFFFFFFFFFFFFFFUL),
+                    new Output<int>(emscriptenEnv.Malloc(null, 4))
+                )
+            );
+        }
+
+        [Fact]
+        public void ReadFieldTest()
+        {
+            testComponent.FloatField.Value = 1.5f;
+            int buffer = emscriptenEnv.Malloc(null, 16);
+            Output<int> outCount = new Output<int>(emscriptenEnv.Malloc(null, 4));
+
+            Assert.Equal(
+                ResoniteError.Success,
+                env.array__read<float>(frame, FloatFieldRef, 0, buffer, 4, outCount)
+            );
+            Assert.Equal(1, machine.HeapGet(outCount));
+            Assert.Equal(1.5f, machine.HeapGet(new Ptr<float>(buffer)));
+        }
+
+        [Fact]
+        public void ReadAtEndCopiesNothing()
+        {
+            Output<int> outCount = new Output<int>(emscriptenEnv.Malloc(null, 4));
+            machine.HeapSet(outCount, -1);
+
+            Assert.Equal(
+                ResoniteError.Success,
+                env.array__read<float>(frame, FloatFieldRef, 1, 0, 4, outCount)
+            );
+            Assert.Equal(0, machine.HeapGet(outCount));
+        }
+
+        [Fact]
+        public void ReadFailsOnWrongType()
+        {
+            Assert.Equal(
+                ResoniteError.InvalidRefId,
+                env.array__read<int>(
+                    frame,
+                    FloatFieldRef,
+                    0,
+                    emscriptenEnv.Malloc(null, 4),
+                    1,
+                    new Output<int>(emscriptenEnv.Malloc(null, 4))
+                )
+            );
+        }
+
+        [Fact]
+        public void ReadFailsOnBufferOutsideMemory()
+        {
+            // Reserve capacity past the end of the heap, which must not be reachable.
+            machine.memories[0] = new Memory(new Limits(1, 2), 1);
+            Assert.True(machine.Heap.Length > machine.HeapSize);
+
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.array__read<double>(
+                    frame,
+                    new WasmRefID<IWorldElement>(testComponent.DoubleField.ReferenceID),
+                    0,
+                    machine.HeapSize - 4,
+                    1,
+                    new Output<int>(emscriptenEnv.Malloc(null, 4))
+                )
+            );
+        }
+
+        [Fact]
+        public void WriteFieldTest()
+        {
+            int buffer = emscriptenEnv.Malloc(null, 4);
+            machine.HeapSet(new Ptr<float>(buffer), 2.5f);
+
+            Assert.Equal(
+                ResoniteError.Success,
+                env.array__write<float>(frame, FloatFieldRef, 0, buffer, 1)
+            );
+            Assert.Equal(2.5f, testComponent.FloatField.Value);
+        }
+
+        [Fact]
+        public void WriteFieldFailsPastFirstElement()
+        {
+            testComponent.FloatField.Value = 1;
+            int buffer = emscriptenEnv.Malloc(null, 8);
+            machine.HeapSet(new Ptr<float>(buffer), 2);
+            machine.HeapSet(new Ptr<float>(buffer + 4), 3);
+
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.array__write<float>(frame, FloatFieldRef, 0, buffer, 2)
+            );
+            Assert.Equal(1, testComponent.FloatField.Value);
+        }
+    }
+}
@@ -0,0 +1,55 @@
+using Dergwasm.Environments;
+using Xunit;
+
+namespace DergwasmTests
+{
+    public class BytecodeCacheTests
+    {
+        [Fact]
+        public void TestPathsMapBetweenSourceAndBytecode()
+        {
+            Assert.Equal("/lib/foo.mpy", BytecodeCache.BytecodePathFor("/lib/foo.py"));
+            Assert.Equal("/lib/foo.py", BytecodeCache.SourcePathFor("/lib/foo.mpy"));
+            Assert.Null(BytecodeCache.BytecodePathFor("/lib/foo.txt"));
+            Assert.Null(BytecodeCache.SourcePathFor("/lib/foo.py"));
+        }
+
+        [Fact]
+        public void TestDecodesEntryWrittenByBuildScript()
+        {
+            // Output of build_bytecode_cache.encode(b"x = 1\n", b"\x4d\x06").
+            string cached =
+                "dergwasm-mpy:9e26bf369911c45c243c684147b23fc9e1dcfcf257d299a1c632016a6fcd33f4:TQY=";
+
+            Assert.True(BytecodeCache.TryDecode(cached, "x = 1\n", out byte[] bytecode));
+            Assert.Equal(new byte[] { 0x4d, 0x06 }, bytecode);
+        }
+
+        [Fact]
+        public void TestRoundTrips()
+        {
+            byte[] original = new byte[] { 1, 2, 3, 255 };
+            string cached = BytecodeCache.Encode("print('hi')", original);
+
+            Assert.True(BytecodeCache.TryDecode(cached, "print('hi')", out byte[] bytecode));
+            Assert.Equal(original, bytecode);
+        }
+
+        [Fact]
+        public void TestStaleEntryIsRejected()
+        {
+            string cached = BytecodeCache.Encode("print('hi')", new byte[] { 1, 2, 3 });
+
+            Assert.False(BytecodeCache.TryDecode(cached, "print('bye')", out byte[] bytecode));
+            Assert.Null(bytecode);
+        }
+
+        [Fact]
+        public void TestMalformedEntryIsRejected()
+        {
+            Assert.False(BytecodeCache.TryDecode("M\u0006garbage", "", out _));
+            Assert.False(BytecodeCache.TryDecode("dergwasm-mpy:nohash", "", out _));
+            Assert.False(BytecodeCache.TryDecode(null, "", out _));
+        }
+    }
+}
@@ -0,0 +1,200 @@
+using Dergwasm;
+using Dergwasm.Environments;
+using Dergwasm.Resonite;
+using Dergwasm.Runtime;
+using Dergwasm.Wasm;
+using DergwasmTests.testing;
+using Elements.Core;
+using FrooxEngine;
+using Xunit;
+
+namespace DergwasmTests
+{
+    public class ChangeFeedTests
+    {
+        FakeWorld world;
+        TestEmscriptenEnv emscriptenEnv;
+        ResoniteEnv env;
+        Machine machine;
+        Frame frame;
+        TestComponent testComponent;
+
+        public ChangeFeedTests()
+        {
+            ResonitePatches.Apply();
+            world = new FakeWorld();
+            emscriptenEnv = new TestEmscriptenEnv();
+            machine = emscriptenEnv.machine;
+            env = new ResoniteEnv(machine, world, emscriptenEnv);
+            SimpleSerialization.Initialize(env);
+            frame = emscriptenEnv.EmptyFrame(null);
+
+            testComponent = new TestComponent(world);
+            testComponent.Initialize();
+        }
+
+        uint Head(ChangeFeed feed) => machine.HeapGet(new Ptr<uint>(feed.Addr + 4));
+
+        uint Dropped(ChangeFeed feed) => machine.HeapGet(new Ptr<uint>(feed.Addr + 12));
+
+        void SetHead(ChangeFeed feed, uint head) =>
+            machine.HeapSet(new Ptr<uint>(feed.Addr + 4), head);
+
+        void SetTail(ChangeFeed feed, uint tail) =>
+            machine.HeapSet(new Ptr<uint>(feed.Addr + 8), tail);
+
+        int DataByte(ChangeFeed feed, int pos) =>
+            machine.Heap[feed.Addr + ChangeFeed.HeaderSize + pos];
+
+        int CreateFeed(int capacity)
+        {
+            Output<int> outFeed = new Output<int>(emscriptenEnv.Malloc(null, 4));
+            Assert.Equal(ResoniteError.Success, env.changes__create_feed(frame, capacity, outFeed));
+            return machine.HeapGet(outFeed);
+        }
+
+        [Fact]
+        public void CreateFeedInitializesHeader()
+        {
+            int addr = CreateFeed(64);
+
+            Assert.NotEqual(0, addr);
+            Assert.Equal(64u, machine.HeapGet(new Ptr<uint>(addr)));
+            Assert.Equal(0u, machine.HeapGet(new Ptr<uint>(addr + 4)));
+            Assert.Equal(0u, machine.HeapGet(new Ptr<uint>(addr + 8)));
+            Assert.Equal(0u, machine.HeapGet(new Ptr<uint>(addr + 12)));
+        }
+
+        [Fact]
+        public void CreateFeedFailsOnTinyCapacity()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.changes__create_feed(frame, 4, new Output<int>(emscriptenEnv.Malloc(null, 4)))
+            );
+        }
+
+        [Fact]
+        public void CreateFeedFailsOnCapacityNotPowerOfTwo()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.changes__create_feed(frame, 48, new Output<int>(emscriptenEnv.Malloc(null, 4)))
+            );
+        }
+
+        [Fact]
+        public void WatchFailsOnUnknownFeed()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.changes__watch(frame, 1234, testComponent.IntField.GetWasmRef<IWorldElement>())
+            );
+        }
+
+        [Fact]
+        public void WatchAndUnwatchFieldSucceeds()
+        {
+            int feed = CreateFeed(64);
+
+            Assert.Equal(
+                ResoniteError.Success,
+                env.changes__watch(frame, feed, testComponent.IntField.GetWasmRef<IWorldElement>())
+            );
+            Assert.Equal(
+                ResoniteError.Success,
+                env.changes__unwatch(
+                    frame,
+                    feed,
+                    testComponent.IntField.GetWasmRef<IWorldElement>()
+                )
+            );
+        }
+
+        [Fact]
+        public void AppendWritesRecord()
+        {
+            ChangeFeed feed = new ChangeFeed(machine, 100, 64);
+
+            feed.Append(new RefID(0x1234), ChangeKind.FieldChanged, 7);
+
+            // 16 byte record header, plus 8 bytes of payload.
+            Assert.Equal(24u, Head(feed));
+            int data = feed.Addr + ChangeFeed.HeaderSize;
+            Assert.Equal(8, machine.HeapGet(new Ptr<int>(data)));
+            Assert.Equal((int)ChangeKind.FieldChanged, machine.HeapGet(new Ptr<int>(data + 4)));
+            Assert.Equal(0x1234UL, machine.HeapGet(new Ptr<ulong>(data + 8)));
+            Assert.Equal(
+                SimpleSerialization.SimpleType.Int,
+                machine.HeapGet(new Ptr<int>(data + 16))
+            );
+            Assert.Equal(7, machine.HeapGet(new Ptr<int>(data + 20)));
+        }
+
+        [Fact]
+        public void AppendDropsRecordWhenFull()
+        {
+            ChangeFeed feed = new ChangeFeed(machine, 100, 32);
+
+            feed.Append(new RefID(1), ChangeKind.FieldChanged, 7);
+            feed.Append(new RefID(1), ChangeKind.FieldChanged, 8);
+
+            Assert.Equal(24u, Head(feed));
+            Assert.Equal(1u, Dropped(feed));
+        }
+
+        [Fact]
+        public void AppendWrapsAroundEndOfBuffer()
+        {
+            ChangeFeed feed = new ChangeFeed(machine, 100, 32);
+
+            feed.Append(new RefID(1), ChangeKind.FieldChanged, 7);
+            SetTail(feed, 24);
+            feed.Append(new RefID(2), ChangeKind.FieldChanged, 8);
+
+            Assert.Equal(48u, Head(feed));
+            Assert.Equal(0u, Dropped(feed));
+            // The second record starts at 24 and wraps, so its refid starts at byte 0.
+            Assert.Equal(8, DataByte(feed, 24));
+            Assert.Equal((int)ChangeKind.FieldChanged, DataByte(feed, 28));
+            Assert.Equal(2, DataByte(feed, 0));
+            Assert.Equal(8, DataByte(feed, 12));
+        }
+
+        [Fact]
+        public void AppendWrapsAroundCounterOverflow()
+        {
+            ChangeFeed feed = new ChangeFeed(machine, 100, 32);
+            SetHead(feed, uint.MaxValue - 7);
+            SetTail(feed, uint.MaxValue - 7);
+
+            feed.Append(new RefID(1), ChangeKind.FieldChanged, 7);
+            SetTail(feed, 16);
+            feed.Append(new RefID(2), ChangeKind.FieldChanged, 8);
+
+            // The first record starts at 2^32 - 8, which is 24 in the data area. The second
+            // starts at 2^32 + 16, which is 16, right after it.
+            Assert.Equal(40u, Head(feed));
+            Assert.Equal(0u, Dropped(feed));
+            Assert.Equal(1, DataByte(feed, 0));
+            Assert.Equal(8, DataByte(feed, 16));
+            Assert.Equal(2, DataByte(feed, 24));
+        }
+
+        [Fact]
+        public void DisposeStopsFeeds()
+        {
+            int addr = CreateFeed(64);
+            env.changes__watch(frame, addr, testComponent.IntField.GetWasmRef<IWorldElement>());
+
+            env.Dispose();
+            testComponent.IntField.Value = 5;
+
+            Assert.Equal(0u, machine.HeapGet(new Ptr<uint>(addr + 4)));
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.changes__destroy_feed(frame, addr)
+            );
+        }
+    }
+}
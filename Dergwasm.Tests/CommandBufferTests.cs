@@ -0,0 +1,275 @@
+﻿using System;
+using System.Collections.Generic;
+using Dergwasm;
+using Dergwasm.Environments;
+using Dergwasm.Resonite;
+using Dergwasm.Runtime;
+using Dergwasm.Wasm;
+using DergwasmTests.testing;
+using Elements.Core;
+using FrooxEngine;
+using Xunit;
+
+namespace DergwasmTests
+{
+    public class CommandBufferTests
+    {
+        FakeWorld world;
+        TestEmscriptenEnv emscriptenEnv;
+        ResoniteEnv env;
+        Machine machine;
+        Frame frame;
+        TestComponent testComponent;
+
+        public CommandBufferTests()
+        {
+            ResonitePatches.Apply();
+            world = new FakeWorld();
+            emscriptenEnv = new TestEmscriptenEnv();
+            machine = emscriptenEnv.machine;
+            env = new ResoniteEnv(machine, world, emscriptenEnv);
+            SimpleSerialization.Initialize(env);
+            frame = emscriptenEnv.EmptyFrame(null);
+
+            testComponent = new TestComponent(world);
+            testComponent.Initialize();
+        }
+
+        static byte[] Command(CommandOp op, RefID refID, object value)
+        {
+            List<byte> command = new List<byte>();
+            command.AddRange(BitConverter.GetBytes((int)op));
+            command.AddRange(BitConverter.GetBytes((ulong)refID));
+            command.AddRange(SimpleSerialization.SerializeInline(value));
+            return command.ToArray();
+        }
+
+        int CreateBuffer(int capacity)
+        {
+            Output<int> outBuffer = new Output<int>(emscriptenEnv.Malloc(null, 4));
+            Assert.Equal(
+                ResoniteError.Success,
+                env.commands__create_buffer(frame, capacity, outBuffer)
+            );
+            return machine.HeapGet(outBuffer);
+        }
+
+        // Writes the commands into a new buffer, applies them, and returns the error.
+        ResoniteError Apply(out int applied, params byte[][] commands)
+        {
+            int buffer = CreateBuffer(256);
+            int length = 0;
+            foreach (byte[] command in commands)
+            {
+                Array.Copy(command, 0, machine.Heap, buffer + length, command.Length);
+                length += command.Length;
+            }
+            Output<int> outApplied = new Output<int>(emscriptenEnv.Malloc(null, 4));
+            ResoniteError err = env.commands__apply(frame, buffer, length, outApplied);
+            applied = machine.HeapGet(outApplied);
+            return err;
+        }
+
+        [Fact]
+        public void ApplySetsValues()
+        {
+            Assert.Equal(
+                ResoniteError.Success,
+                Apply(
+                    out int applied,
+                    Command(CommandOp.SetValue, testComponent.IntField.ReferenceID, 12),
+                    Command(CommandOp.SetValue, testComponent.FloatField.ReferenceID, 0.5),
+                    Command(CommandOp.SetValue, testComponent.DoubleField.ReferenceID, 3)
+                )
+            );
+
+            Assert.Equal(3, applied);
+            Assert.Equal(12, testComponent.IntField.Value);
+            Assert.Equal(0.5f, testComponent.FloatField.Value);
+            Assert.Equal(3.0, testComponent.DoubleField.Value);
+        }
+
+        [Fact]
+        public void ApplyEmptyBufferDoesNothing()
+        {
+            Assert.Equal(ResoniteError.Success, Apply(out int applied));
+            Assert.Equal(0, applied);
+        }
+
+        [Fact]
+        public void ApplyIsAllOrNothing()
+        {
+            Assert.Equal(
+                ResoniteError.InvalidRefId,
+                Apply(
+                    out _,
+                    Command(CommandOp.SetValue, testComponent.IntField.ReferenceID, 12),
+                    Command(CommandOp.SetValue, new RefID(0xFFFFFFFFUL), 13)
+                )
+            );
+
+            Assert.Equal(0, testComponent.IntField.Value);
+        }
+
+        [Fact]
+        public void ApplyFailsOnWrongValueType()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                Apply(
+                    out _,
+                    Command(CommandOp.SetValue, testComponent.IntField.ReferenceID, "12")
+                )
+            );
+        }
+
+        [Fact]
+        public void ApplyFailsOnOverflow()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                Apply(
+                    out _,
+                    Command(CommandOp.SetValue, testComponent.IntField.ReferenceID, 1L << 40)
+                )
+            );
+        }
+
+        [Fact]
+        public void ApplyFailsOnFloatOverflow()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                Apply(
+                    out int applied,
+                    Command(CommandOp.SetValue, testComponent.IntField.ReferenceID, 12),
+                    Command(CommandOp.SetValue, testComponent.FloatField.ReferenceID, 1e300)
+                )
+            );
+
+            Assert.Equal(0, applied);
+            Assert.Equal(0, testComponent.IntField.Value);
+            Assert.Equal(0f, testComponent.FloatField.Value);
+        }
+
+        [Fact]
+        public void ApplyAllowsInfiniteFloat()
+        {
+            Assert.Equal(
+                ResoniteError.Success,
+                Apply(
+                    out _,
+                    Command(
+                        CommandOp.SetValue,
+                        testComponent.FloatField.ReferenceID,
+                        double.PositiveInfinity
+                    )
+                )
+            );
+
+            Assert.Equal(float.PositiveInfinity, testComponent.FloatField.Value);
+        }
+
+        [Fact]
+        public void ApplyFailsOnSetNameOfField()
+        {
+            Assert.Equal(
+                ResoniteError.InvalidRefId,
+                Apply(
+                    out _,
+                    Command(CommandOp.SetName, testComponent.IntField.ReferenceID, "name")
+                )
+            );
+        }
+
+        [Fact]
+        public void ApplyFailsOnUnknownOp()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                Apply(out _, Command((CommandOp)99, testComponent.IntField.ReferenceID, 1))
+            );
+        }
+
+        [Fact]
+        public void ApplyFailsOnTruncatedCommand()
+        {
+            byte[] command = Command(
+                CommandOp.SetValue,
+                testComponent.IntField.ReferenceID,
+                12
+            );
+
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                Apply(out _, command, new byte[] { 1, 0, 0, 0 })
+            );
+            Assert.Equal(0, testComponent.IntField.Value);
+        }
+
+        [Fact]
+        public void ApplyFailsOnUnknownBuffer()
+        {
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.commands__apply(frame, 1234, 0, new Output<int>(emscriptenEnv.Malloc(null, 4)))
+            );
+        }
+
+        [Fact]
+        public void ApplyFailsOnLengthPastCapacity()
+        {
+            int buffer = CreateBuffer(32);
+
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.commands__apply(
+                    frame,
+                    buffer,
+                    33,
+                    new Output<int>(emscriptenEnv.Malloc(null, 4))
+                )
+            );
+        }
+
+        [Fact]
+        public void ApplyStopsAtCommandThatFails()
+        {
+            int ran = 0;
+            List<Action> commands = new List<Action>
+            {
+                () => ran++,
+                () => throw new InvalidOperationException("rejected"),
+                () => ran++,
+            };
+
+            Assert.Equal(1, CommandBuffer.ApplyDecoded(commands));
+            Assert.Equal(1, ran);
+        }
+
+        [Fact]
+        public void DecodeFailsOnBufferPastHeapSize()
+        {
+            // Reserve capacity past the end of the heap, which must not be reachable.
+            machine.memories[0] = new Memory(new Limits(1, 2), 1);
+            Assert.True(machine.Heap.Length > machine.HeapSize);
+
+            ResoniteException e = Assert.Throws<ResoniteException>(
+                () => CommandBuffer.Decode(machine, env, world, machine.HeapSize - 4, 16)
+            );
+            Assert.Equal(ResoniteError.FailedPrecondition, e.Error);
+        }
+
+        [Fact]
+        public void DestroyBufferTwiceFails()
+        {
+            int buffer = CreateBuffer(32);
+
+            Assert.Equal(ResoniteError.Success, env.commands__destroy_buffer(frame, buffer));
+            Assert.Equal(
+                ResoniteError.FailedPrecondition,
+                env.commands__destroy_buffer(frame, buffer)
+            );
+        }
+    }
+}
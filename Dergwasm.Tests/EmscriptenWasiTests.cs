@@ -1,6 +1,9 @@
-﻿using System.Text;
+﻿using System;
+using System.Collections.Generic;
+using System.Text;
 using Dergwasm.Wasm;
 using Dergwasm.Environments;
+using Dergwasm.Runtime;
 using DergwasmTests.testing;
 using Xunit;
 
@@ -134,10 +137,13 @@ namespace DergwasmTests
         [Fact]
         public void ReadToHeapEfault()
         {
+            // Reserve capacity past the end of the heap, which must not be reachable.
+            machine.memories[0] = new Memory(new Limits(1, 2), 1);
+            Assert.True(machine.Heap.Length > machine.HeapSize);
             Stream stream = wasi.CreateStream("test.txt", Encoding.UTF8.GetBytes("0123456789"));
 
-            Assert.Equal(-Errno.EFAULT, wasi.Read(stream.fd, machine.Heap.Length, 1));
-            Assert.Equal(0, wasi.Read(stream.fd, machine.Heap.Length, 0));
+            Assert.Equal(-Errno.EFAULT, wasi.Read(stream.fd, machine.HeapSize, 1));
+            Assert.Equal(0, wasi.Read(stream.fd, machine.HeapSize, 0));
         }
 
         [Fact]
@@ -289,10 +295,13 @@ namespace DergwasmTests
         [Fact]
         public void WriteFromHeapEfault()
         {
+            // Reserve capacity past the end of the heap, which must not be reachable.
+            machine.memories[0] = new Memory(new Limits(1, 2), 1);
+            Assert.True(machine.Heap.Length > machine.HeapSize);
             Stream stream = wasi.CreateStream("test.txt", Encoding.UTF8.GetBytes("0123456789"));
 
-            Assert.Equal(-Errno.EFAULT, wasi.Write(stream.fd, machine.Heap.Length, 1));
-            Assert.Equal(0, wasi.Write(stream.fd, machine.Heap.Length, 0));
+            Assert.Equal(-Errno.EFAULT, wasi.Write(stream.fd, machine.HeapSize, 1));
+            Assert.Equal(0, wasi.Write(stream.fd, machine.HeapSize, 0));
         }
 
         [Fact]
@@ -321,5 +330,217 @@ namespace DergwasmTests
             Assert.Equal(6, wasi.Write(EmscriptenWasi.FD_STDOUT, 0, 6));
             Assert.Equal("012345", output);
         }
+
+        // Creates a stream whose syncer records the content each time it's written back.
+        Stream CreateSyncedStream(List<string> written)
+        {
+            return wasi.CreateStream(
+                "test.txt",
+                Encoding.UTF8.GetBytes("0123456789"),
+                (Stream s) =>
+                {
+                    written.Add(Encoding.UTF8.GetString(s.content));
+                    return 0;
+                }
+            );
+        }
+
+        [Fact]
+        public void SyncSkipsCleanStream()
+        {
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            Assert.Equal(0, wasi.Sync(stream.fd));
+            Assert.Equal(0, wasi.Close(stream.fd));
+
+            Assert.Empty(written);
+        }
+
+        [Fact]
+        public void WriteThroughWritesBackOnEverySync()
+        {
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("a"));
+            Assert.Equal(0, wasi.Sync(stream.fd));
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("b"));
+            Assert.Equal(0, wasi.Sync(stream.fd));
+            Assert.Equal(0, wasi.Sync(stream.fd));
+
+            Assert.Equal(new List<string> { "a123456789", "ab23456789" }, written);
+        }
+
+        [Fact]
+        public void CloseWritesBackDirtyStream()
+        {
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("a"));
+            Assert.Equal(0, wasi.Close(stream.fd));
+
+            Assert.Equal(new List<string> { "a123456789" }, written);
+        }
+
+        [Fact]
+        public void WriteFromHeapWritesBackOnClose()
+        {
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+            env.WriteUTF8StringToMem(new Ptr<byte>(0), "a");
+
+            Assert.Equal(1, wasi.Write(stream.fd, 0, 1));
+            Assert.True(stream.dirty);
+            Assert.Equal(0, wasi.Close(stream.fd));
+
+            Assert.Equal(new List<string> { "a123456789" }, written);
+        }
+
+        [Fact]
+        public void FdWriteWritesBackOnClose()
+        {
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+            env.WriteUTF8StringToMem(new Ptr<byte>(0), "ab");
+            // One iovec at 16: ptr 0, len 2.
+            machine.HeapSet(new Ptr<int>(16), 0);
+            machine.HeapSet(new Ptr<uint>(20), 2u);
+
+            Assert.Equal(0, wasi.FdWrite(null, stream.fd, 16, 1, 24));
+            Assert.Equal(2u, machine.HeapGet(new Ptr<uint>(24)));
+            Assert.Equal(0, wasi.Close(stream.fd));
+
+            Assert.Equal(new List<string> { "ab23456789" }, written);
+        }
+
+        [Fact]
+        public void ReadLeavesStreamClean()
+        {
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            Assert.Equal(4, wasi.Read(stream.fd, new byte[4]));
+            Assert.Equal(4, wasi.Read(stream.fd, 0, 4));
+            Assert.False(stream.dirty);
+            Assert.Equal(0, wasi.Close(stream.fd));
+
+            Assert.Empty(written);
+        }
+
+        [Fact]
+        public void CoalescedWritesBackOncePerFlush()
+        {
+            List<Action> scheduled = new List<Action>();
+            wasi.WriteBackPolicy = WriteBackPolicy.Coalesced;
+            wasi.ScheduleFlush = scheduled.Add;
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("a"));
+            Assert.Equal(0, wasi.Sync(stream.fd));
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("b"));
+            Assert.Equal(0, wasi.Sync(stream.fd));
+
+            Assert.Empty(written);
+            Assert.Single(scheduled);
+
+            scheduled[0]();
+
+            Assert.Equal(new List<string> { "ab23456789" }, written);
+
+            // Nothing changed since, so closing doesn't write back again.
+            Assert.Equal(0, wasi.Close(stream.fd));
+            Assert.Equal(0, wasi.FlushPending());
+            Assert.Single(written);
+        }
+
+        [Fact]
+        public void CoalescedWritesBackClosedStream()
+        {
+            List<Action> scheduled = new List<Action>();
+            wasi.WriteBackPolicy = WriteBackPolicy.Coalesced;
+            wasi.ScheduleFlush = scheduled.Add;
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("a"));
+            Assert.Equal(0, wasi.Close(stream.fd));
+            Assert.Empty(written);
+
+            scheduled[0]();
+
+            Assert.Equal(new List<string> { "a123456789" }, written);
+        }
+
+        [Fact]
+        public void UnwrittenContentIsNewestChange()
+        {
+            wasi.WriteBackPolicy = WriteBackPolicy.Coalesced;
+            List<string> written = new List<string>();
+            Stream first = CreateSyncedStream(written);
+            Stream second = CreateSyncedStream(written);
+
+            Assert.Null(wasi.UnwrittenContent("test.txt"));
+
+            wasi.Write(second.fd, Encoding.UTF8.GetBytes("b"));
+            wasi.Write(first.fd, Encoding.UTF8.GetBytes("a"));
+            Assert.Equal(0, wasi.Close(first.fd));
+
+            Assert.Equal(
+                "a123456789",
+                Encoding.UTF8.GetString(wasi.UnwrittenContent("test.txt"))
+            );
+            Assert.Null(wasi.UnwrittenContent("other.txt"));
+            Assert.Empty(written);
+        }
+
+        [Fact]
+        public void OnCloseIgnoresSync()
+        {
+            wasi.WriteBackPolicy = WriteBackPolicy.OnClose;
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("a"));
+            Assert.Equal(0, wasi.Sync(stream.fd));
+            Assert.Empty(written);
+
+            Assert.Equal(0, wasi.Close(stream.fd));
+            Assert.Equal(new List<string> { "a123456789" }, written);
+        }
+
+        [Fact]
+        public void FlushWritesBackOpenStreams()
+        {
+            wasi.WriteBackPolicy = WriteBackPolicy.OnClose;
+            List<string> written = new List<string>();
+            Stream stream = CreateSyncedStream(written);
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("a"));
+            Assert.Equal(0, wasi.Flush("other.txt"));
+            Assert.Empty(written);
+
+            Assert.Equal(0, wasi.Flush("test.txt"));
+            Assert.Equal(new List<string> { "a123456789" }, written);
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("b"));
+            Assert.Equal(0, wasi.Flush());
+            Assert.Equal(new List<string> { "a123456789", "ab23456789" }, written);
+        }
+
+        [Fact]
+        public void AppendWritesAtEnd()
+        {
+            Stream stream = wasi.CreateStream("test.txt", Encoding.UTF8.GetBytes("0123456789"));
+            stream.append = true;
+
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("a"));
+            wasi.LSeek(stream.fd, 0, 0, out int _);
+            wasi.Write(stream.fd, Encoding.UTF8.GetBytes("b"));
+
+            Assert.Equal("0123456789ab", Encoding.UTF8.GetString(stream.content));
+        }
     }
 }
@@ -0,0 +1,153 @@
+﻿using System.Runtime.InteropServices;
+using System.Text;
+using Dergwasm.Environments;
+using Dergwasm.Wasm;
+using DergwasmTests.testing;
+using Xunit;
+
+namespace DergwasmTests
+{
+    public class FilesystemEnvTests
+    {
+        const int AT_FDCWD = -100;
+        const int O_RDONLY = 0;
+        const int O_WRONLY = 1;
+        const int PathPtr = 16;
+        const int StatPtr = 256;
+
+        static readonly byte[] Bytecode = new byte[] { 0x4d, 0x06, 1, 2, 3 };
+        const string Source = "x = 1\n";
+
+        TestMachine machine;
+        EmscriptenEnv env;
+        EmscriptenWasi wasi;
+        FakeFileNode root;
+        FakeFileNode lib;
+        FilesystemEnv fsEnv;
+
+        public FilesystemEnvTests()
+        {
+            machine = new TestMachine();
+            env = new EmscriptenEnv(machine);
+            wasi = new EmscriptenWasi(machine, env);
+            root = new FakeFileNode();
+            lib = root.AddDirectory("lib");
+            lib.AddFile("foo.py", Source);
+            fsEnv = new FilesystemEnv(machine, root, env, wasi);
+        }
+
+        int Stat(string path)
+        {
+            env.WriteUTF8StringToMem(new Ptr<byte>(PathPtr), path, true);
+            return fsEnv.__syscall_stat64(null, PathPtr, StatPtr);
+        }
+
+        ulong StatSize() =>
+            machine.HeapGet(
+                new Ptr<ulong>(
+                    StatPtr + (int)Marshal.OffsetOf(typeof(FilesystemEnv.Stat), "st_size")
+                )
+            );
+
+        int Open(string path, int flags)
+        {
+            env.WriteUTF8StringToMem(new Ptr<byte>(PathPtr), path, true);
+            return fsEnv.__syscall_openat(null, AT_FDCWD, PathPtr, flags, 0);
+        }
+
+        [Fact]
+        public void StatSeesUnwrittenChangesWithoutWritingBack()
+        {
+            wasi.WriteBackPolicy = WriteBackPolicy.OnClose;
+            int fd = Open("/lib/foo.py", O_WRONLY);
+            Assert.Equal(7, wasi.Write(fd, Encoding.UTF8.GetBytes("y = 22\n")));
+
+            Assert.Equal(0, Stat("/lib/foo.py"));
+            Assert.Equal(7UL, StatSize());
+            Assert.Equal(Source, ((FakeFileNode)lib.FindChild("foo.py")).Contents);
+        }
+
+        [Fact]
+        public void ReopenSeesUnwrittenChangesWithoutWritingBack()
+        {
+            wasi.WriteBackPolicy = WriteBackPolicy.OnClose;
+            FakeFileNode foo = (FakeFileNode)lib.FindChild("foo.py");
+            int writer = Open("/lib/foo.py", O_WRONLY);
+            wasi.Write(writer, Encoding.UTF8.GetBytes("y"));
+
+            int reader = Open("/lib/foo.py", O_RDONLY);
+
+            Assert.Equal("y = 1\n", Encoding.UTF8.GetString(wasi.streams[reader].content));
+            Assert.Equal(Source, foo.Contents);
+
+            Assert.Equal(0, wasi.Close(writer));
+            Assert.Equal("y = 1\n", foo.Contents);
+        }
+
+        [Fact]
+        public void BytecodeCacheIsOffByDefault()
+        {
+            lib.AddFile("foo.mpy", BytecodeCache.Encode(Source, Bytecode));
+
+            Assert.False(fsEnv.UseBytecodeCache);
+            Assert.Equal(0, Stat("/lib/foo.py"));
+            Assert.Equal((ulong)Source.Length, StatSize());
+        }
+
+        [Fact]
+        public void StatHidesSourceWithUpToDateBytecode()
+        {
+            lib.AddFile("foo.mpy", BytecodeCache.Encode(Source, Bytecode));
+            fsEnv.UseBytecodeCache = true;
+
+            Assert.Equal(-Errno.ENOENT, Stat("/lib/foo.py"));
+            Assert.Equal(0, Stat("/lib/foo.mpy"));
+            Assert.Equal((ulong)Bytecode.Length, StatSize());
+        }
+
+        [Fact]
+        public void StatHidesStaleBytecode()
+        {
+            lib.AddFile("foo.mpy", BytecodeCache.Encode("x = 2\n", Bytecode));
+            fsEnv.UseBytecodeCache = true;
+
+            Assert.Equal(-Errno.ENOENT, Stat("/lib/foo.mpy"));
+            Assert.Equal(0, Stat("/lib/foo.py"));
+            Assert.Equal((ulong)Source.Length, StatSize());
+        }
+
+        [Fact]
+        public void OpenatServesBytecode()
+        {
+            lib.AddFile("foo.mpy", BytecodeCache.Encode(Source, Bytecode));
+            fsEnv.UseBytecodeCache = true;
+
+            int fd = Open("/lib/foo.mpy", O_RDONLY);
+
+            Assert.True(fd > 2);
+            Assert.Equal(Bytecode, wasi.streams[fd].content);
+        }
+
+        [Fact]
+        public void OpenatRejectsWritingBytecode()
+        {
+            lib.AddFile("foo.mpy", BytecodeCache.Encode(Source, Bytecode));
+            fsEnv.UseBytecodeCache = true;
+
+            Assert.Equal(-Errno.EACCES, Open("/lib/foo.mpy", O_WRONLY));
+        }
+
+        [Fact]
+        public void OpenatHidesStaleBytecode()
+        {
+            lib.AddFile("foo.mpy", BytecodeCache.Encode("x = 2\n", Bytecode));
+            fsEnv.UseBytecodeCache = true;
+
+            Assert.Equal(-Errno.ENOENT, Open("/lib/foo.mpy", O_RDONLY));
+
+            int fd = Open("/lib/foo.py", O_RDONLY);
+            Assert.True(fd > 2);
+            Assert.Equal(Source, Encoding.UTF8.GetString(wasi.streams[fd].content));
+        }
+    }
+}
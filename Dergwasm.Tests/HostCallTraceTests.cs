@@ -0,0 +1,143 @@
+﻿using System.Collections.Generic;
+using System.IO;
+using Dergwasm.Modules;
+using Dergwasm.Runtime;
+using DergwasmTests.instructions;
+using DergwasmTests.testing;
+using Xunit;
+
+namespace DergwasmTests
+{
+    public class HostCallTraceTests
+    {
+        // A host module with one function, $4: (i32 a, i32 b) -> (i32). It writes a+b to
+        // address 100, sets global 1 to a-b, and returns a*b.
+        class TestHostModule : IHostModule
+        {
+            public List<HostFunc> Functions { get; }
+            public List<ApiFunc> ApiData { get; } = new List<ApiFunc>();
+
+            public TestHostModule(TestMachine machine, HostProxy proxy)
+            {
+                Functions = new List<HostFunc>
+                {
+                    new HostFunc("test", "$4", machine.Frame.GetFuncTypeForIndex(4), proxy),
+                };
+            }
+        }
+
+        static void StoreSum(Machine machine, Frame frame)
+        {
+            int b = frame.Pop<int>();
+            int a = frame.Pop<int>();
+            machine.HeapSet(new Ptr<int>(100), a + b);
+            machine.Globals[1] = new Value { s32 = a - b };
+            frame.Push(new Value { s32 = a * b });
+        }
+
+        static void Unreachable(Machine machine, Frame frame)
+        {
+            throw new Trap("Replayed host function was called");
+        }
+
+        // Sets up a machine where func $2 calls the host function $4 with a and b.
+        static TestMachine CreateMachine(int a, int b)
+        {
+            InstructionTestFixture fixture = new InstructionTestFixture();
+            TestMachine machine = fixture.machine;
+            machine.MainModuleName = "test";
+            machine.SetProgram(0, fixture.Nop());
+            machine.mainModuleInstance = machine.FakeModuleInstance;
+            machine.SetFuncAt(
+                12,
+                fixture.I32Const(a),
+                fixture.I32Const(b),
+                fixture.Call(4),
+                fixture.End()
+            );
+            return machine;
+        }
+
+        static byte[] Record(int a, int b)
+        {
+            TestMachine machine = CreateMachine(a, b);
+            MemoryStream trace = new MemoryStream();
+            using (HostCallRecorder recorder = new HostCallRecorder(machine, trace))
+            {
+                machine.funcs[14] = recorder
+                    .Wrap(new TestHostModule(machine, StoreSum))
+                    .GetHostFunc("$4");
+
+                recorder.BeginEntry("$2", new Value[0]);
+                Assert.Equal(a * b, machine.CallFunc<int>(machine.funcs[12], machine.Frame));
+                recorder.EndEntry();
+
+                // Changes made by the host between entries are recorded too.
+                machine.HeapSet(new Ptr<int>(200), 55);
+
+                recorder.BeginEntry("$2", new Value[0]);
+                machine.CallFunc<int>(machine.funcs[12], machine.Frame);
+                recorder.EndEntry();
+            }
+            return trace.ToArray();
+        }
+
+        static HostCallReplayer CreateReplayer(TestMachine machine, byte[] trace)
+        {
+            HostCallReplayer replayer = new HostCallReplayer(machine, new MemoryStream(trace));
+            machine.funcs[14] = replayer
+                .Wrap(new TestHostModule(machine, Unreachable))
+                .GetHostFunc("$4");
+            return replayer;
+        }
+
+        [Fact]
+        public void ReplayReproducesHostCallEffects()
+        {
+            byte[] trace = Record(3, 4);
+
+            TestMachine machine = CreateMachine(3, 4);
+            HostCallReplayer replayer = CreateReplayer(machine, trace);
+            replayer.ReplayAll();
+
+            Assert.Equal(2, replayer.Entries);
+            Assert.Equal(2, replayer.Calls);
+            Assert.Equal(7, machine.HeapGet(new Ptr<int>(100)));
+            Assert.Equal(55, machine.HeapGet(new Ptr<int>(200)));
+            Assert.Equal(-1, machine.Globals[1].s32);
+        }
+
+        [Fact]
+        public void ReplayStopsAtEndOfTrace()
+        {
+            TestMachine machine = CreateMachine(3, 4);
+            HostCallReplayer replayer = CreateReplayer(machine, Record(3, 4));
+
+            Assert.True(replayer.ReplayEntry());
+            Assert.True(replayer.ReplayEntry());
+            Assert.False(replayer.ReplayEntry());
+        }
+
+        [Fact]
+        public void ReplayThrowsWhenArgsDiverge()
+        {
+            byte[] trace = Record(3, 4);
+
+            TestMachine machine = CreateMachine(3, 5);
+            HostCallReplayer replayer = CreateReplayer(machine, trace);
+
+            Trap trap = Assert.Throws<Trap>(() => replayer.ReplayAll());
+            Assert.Contains("diverged", trap.Message);
+        }
+
+        [Fact]
+        public void ReplayRejectsNonTrace()
+        {
+            TestMachine machine = CreateMachine(3, 4);
+
+            Assert.Throws<Trap>(
+                () => new HostCallReplayer(machine, new MemoryStream(new byte[8]))
+            );
+        }
+    }
+}
@@ -0,0 +1,108 @@
+﻿using Dergwasm.Runtime;
+using DergwasmTests.instructions;
+using DergwasmTests.testing;
+using Xunit;
+
+namespace DergwasmTests
+{
+    public class MachineTests
+    {
+        static readonly FuncType VoidType = new FuncType(new ValueType[] { }, new ValueType[] { });
+
+        [Fact]
+        public void GetFuncFindsAddedFuncs()
+        {
+            Machine machine = new Machine();
+            ModuleFunc a = new ModuleFunc("test", "a", VoidType);
+            ModuleFunc b = new ModuleFunc("test", "b", VoidType);
+            machine.AddFunc(a);
+            machine.AddFunc(b);
+
+            Assert.Same(a, machine.GetFunc("test", "a"));
+            Assert.Same(b, machine.GetFunc("test", "b"));
+            Assert.Null(machine.GetFunc("other", "a"));
+            Assert.Throws<Trap>(() => machine.GetRequiredFunc("test", "c"));
+        }
+
+        [Fact]
+        public void GetFuncReturnsFirstFuncWithName()
+        {
+            Machine machine = new Machine();
+            ModuleFunc first = new ModuleFunc("test", "a", VoidType);
+            machine.AddFunc(first);
+            machine.AddFunc(new ModuleFunc("test", "a", VoidType));
+
+            Assert.Same(first, machine.GetFunc("test", "a"));
+        }
+
+        [Fact]
+        public void GetFuncFindsFuncsPlacedDirectly()
+        {
+            Machine machine = new Machine();
+            machine.AddFunc(new ModuleFunc("test", "a", VoidType));
+            ModuleFunc replacement = new ModuleFunc("test", "b", VoidType);
+            machine.funcs[0] = replacement;
+
+            Assert.Null(machine.GetFunc("test", "a"));
+            Assert.Same(replacement, machine.GetFunc("test", "b"));
+        }
+
+        [Fact]
+        public void ExportedFuncResolvesLazily()
+        {
+            Machine machine = new Machine();
+            machine.MainModuleName = "test";
+            ExportedFunc handle = new ExportedFunc(machine, "a");
+            ModuleFunc a = new ModuleFunc("test", "a", VoidType);
+            machine.AddFunc(a);
+
+            Assert.Same(a, handle.Func);
+            Assert.Same(a, handle.Func);
+        }
+
+        [Fact]
+        public void ExportedFuncThrowsIfNotExported()
+        {
+            Machine machine = new Machine();
+            machine.MainModuleName = "test";
+            ExportedFunc handle = new ExportedFunc(machine, "a");
+
+            Assert.Throws<Trap>(() => handle.Func);
+        }
+
+        [Fact]
+        public void ExportedFuncInvokesWithIntArgs()
+        {
+            TestMachine machine = new InstructionTestFixture().machine;
+            machine.MainModuleName = "test";
+            machine.SetHostFuncAt(
+                14,
+                (m, frame) =>
+                {
+                    int b = frame.Pop().s32;
+                    int a = frame.Pop().s32;
+                    frame.Push(new Value { s32 = a - b });
+                }
+            );
+            ExportedFunc handle = new ExportedFunc(machine, "$4");
+
+            Assert.Equal(3, handle.InvokeInt(machine.Frame, 5, 2));
+            handle.Invoke(machine.Frame, 7, 3);
+            Assert.Equal(4, machine.Frame.Pop().s32);
+        }
+
+        [Fact]
+        public void CountsInstructionsAndHostCalls()
+        {
+            InstructionTestFixture fixture = new InstructionTestFixture();
+            TestMachine machine = fixture.machine;
+            machine.SetProgram(0, fixture.Nop(), fixture.Call(0), fixture.End());
+            machine.SetHostFuncAt(10, (m, frame) => { });
+
+            machine.Step(3);
+
+            Assert.Equal(3, machine.InstructionCount);
+            Assert.Equal(1, machine.HostCallCount);
+        }
+    }
+}
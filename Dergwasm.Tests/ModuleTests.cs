@@ -144,6 +144,36 @@ namespace DergwasmTests
             writer.Write(sectionStream.ToArray());
         }
 
+        static void WriteTestCodeSection(BinaryWriter writer)
+        {
+            writer.Write((byte)10); // Code section
+
+            MemoryStream sectionStream = new MemoryStream();
+            BinaryWriter sectionWriter = new BinaryWriter(sectionStream);
+            sectionWriter.WriteLEB128Unsigned(4UL); // 4 function bodies
+
+            // Function i has i I32 locals and i NOPs.
+            for (int i = 0; i < 4; i++)
+            {
+                MemoryStream bodyStream = new MemoryStream();
+                BinaryWriter bodyWriter = new BinaryWriter(bodyStream);
+                bodyWriter.WriteLEB128Unsigned(1UL); // 1 local spec
+                bodyWriter.WriteLEB128Unsigned((ulong)i);
+                bodyWriter.Write((byte)ValueType.I32);
+                for (int j = 0; j < i; j++)
+                {
+                    bodyWriter.Write((byte)InstructionType.NOP);
+                }
+                bodyWriter.Write((byte)InstructionType.END);
+
+                sectionWriter.WriteLEB128Unsigned((ulong)bodyStream.Length);
+                sectionWriter.Write(bodyStream.ToArray());
+            }
+
+            writer.WriteLEB128Unsigned((ulong)sectionStream.Length);
+            writer.Write(sectionStream.ToArray());
+        }
+
         static void WriteTestImportSection(BinaryWriter writer)
         {
             writer.Write((byte)2); // Import section
@@ -1421,6 +1451,71 @@ namespace DergwasmTests
             Assert.Collection(module.DataSegments, e => Assert.IsType<ActiveDataSegment>(e));
         }
 
+        [Theory]
+        [InlineData(false)]
+        [InlineData(true)]
+        public void ReadsCodeSectionCorrectly(bool parallel)
+        {
+            MemoryStream memStream = new MemoryStream();
+            BinaryWriter writer = new BinaryWriter(memStream);
+            writer.Write(0x6D736100U);
+            writer.Write(1U);
+            WriteTestTypeSection(writer);
+            WriteTestImportSection(writer);
+            WriteTestFunctionSection(writer);
+
+            WriteTestCodeSection(writer);
+
+            memStream.Position = 0;
+            BinaryReader reader = new BinaryReader(memStream);
+
+            Module module = Module.Read("test", reader, parallel);
+
+            // The 2 imports come first.
+            for (int i = 0; i < 4; i++)
+            {
+                ModuleFunc func = Assert.IsType<ModuleFunc>(module.Funcs[2 + i]);
+                Assert.Equal(i, func.Locals.Length);
+                Assert.All(func.Locals, t => Assert.Equal(ValueType.I32, t));
+                Assert.Equal(i + 1, func.Code.Count);
+                Assert.All(
+                    func.Code.GetRange(0, i),
+                    insn => Assert.Equal(InstructionType.NOP, insn.Type)
+                );
+                Assert.Equal(InstructionType.END, func.Code[i].Type);
+            }
+        }
+
+        [Theory]
+        [InlineData(false)]
+        [InlineData(true)]
+        public void ReadCodeSectionThrowsOnMissingEnd(bool parallel)
+        {
+            MemoryStream memStream = new MemoryStream();
+            BinaryWriter writer = new BinaryWriter(memStream);
+            writer.Write(0x6D736100U);
+            writer.Write(1U);
+            WriteTestTypeSection(writer);
+            WriteTestImportSection(writer);
+            WriteTestFunctionSection(writer);
+
+            writer.Write((byte)10); // Code section
+            MemoryStream sectionStream = new MemoryStream();
+            BinaryWriter sectionWriter = new BinaryWriter(sectionStream);
+            sectionWriter.WriteLEB128Unsigned(1UL); // 1 function body
+            sectionWriter.WriteLEB128Unsigned(2UL); // Body size
+            sectionWriter.WriteLEB128Unsigned(0UL); // No locals
+            sectionWriter.Write((byte)InstructionType.NOP); // ...and no END
+
+            writer.WriteLEB128Unsigned((ulong)sectionStream.Length);
+            writer.Write(sectionStream.ToArray());
+
+            memStream.Position = 0;
+            BinaryReader reader = new BinaryReader(memStream);
+
+            Assert.Throws<EndOfStreamException>(() => Module.Read("test", reader, parallel));
+        }
+
         [Fact]
         public void ReadsDataCountSectionCorrectly()
         {
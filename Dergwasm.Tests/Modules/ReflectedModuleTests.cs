@@ -79,6 +79,13 @@ namespace Dergwasm.Modules
         {
             return true;
         }
+
+        [ModFn("annotated")]
+        [ApiAnnotation(ApiAnnotations.ImmutableResult, ApiAnnotations.Batchable)]
+        public int Annotated(Frame frame)
+        {
+            return 1;
+        }
     }
 
     public class ValueTests
@@ -312,6 +319,16 @@ namespace Dergwasm.Modules
             Assert.Equal(new ValueType[] { ValueType.I32 }, Assert.Single(apiData.Returns).Types);
         }
 
+        [Fact]
+        public void AnnotationsApiDataIsCorrect()
+        {
+            Assert.Equal(
+                new[] { ApiAnnotations.ImmutableResult, ApiAnnotations.Batchable },
+                module.GetApiFunc("annotated").Annotations
+            );
+            Assert.Empty(module.GetApiFunc("bool_return").Annotations);
+        }
+
         [Fact]
         public void BoolReturnPassedCorrectly()
         {
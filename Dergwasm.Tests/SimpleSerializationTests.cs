@@ -1,4 +1,6 @@
-﻿using System.Collections.Generic;
+﻿using System;
+using System.Collections.Generic;
+using System.IO;
 using Dergwasm;
 using Dergwasm.Wasm;
 using Dergwasm.Environments;
@@ -109,5 +111,88 @@ namespace DergwasmTests
             Assert.IsAssignableFrom<List<RefID>>(deserialized);
             Assert.Equal(value, (List<RefID>)deserialized);
         }
+
+        [Fact]
+        public void TestStringSerializesInline()
+        {
+            byte[] data = SimpleSerialization.SerializeInline("1234");
+
+            Assert.Equal(4 + 4 + 4, data.Length);
+            Assert.Equal(SimpleSerialization.SimpleType.String, BitConverter.ToInt32(data, 0));
+            Assert.Equal(4, BitConverter.ToInt32(data, 4));
+            Assert.Equal(0x34333231u, BitConverter.ToUInt32(data, 8));
+        }
+
+        [Fact]
+        public void TestRefIDListSerializesInline()
+        {
+            List<RefID> value = new List<RefID> { new RefID(100), new RefID(102) };
+
+            byte[] data = SimpleSerialization.SerializeInline(value);
+
+            Assert.Equal(4 + 4 + 2 * 8, data.Length);
+            Assert.Equal(SimpleSerialization.SimpleType.RefIDList, BitConverter.ToInt32(data, 0));
+            Assert.Equal(2, BitConverter.ToInt32(data, 4));
+            Assert.Equal(100UL, BitConverter.ToUInt64(data, 8));
+            Assert.Equal(102UL, BitConverter.ToUInt64(data, 16));
+        }
+
+        [Theory]
+        [InlineData("1234")]
+        [InlineData("")]
+        [InlineData(42)]
+        [InlineData(1.5)]
+        [InlineData(null)]
+        public void TestInlineRoundTrips(object value)
+        {
+            byte[] data = SimpleSerialization.SerializeInline(value);
+
+            BinaryReader reader = new BinaryReader(new MemoryStream(data));
+            object deserialized = SimpleSerialization.DeserializeInline(reader, resoniteEnv);
+
+            Assert.Equal(value, deserialized);
+            Assert.Equal(data.Length, reader.BaseStream.Position);
+        }
+
+        [Fact]
+        public void TestRefIDListDeserializesInline()
+        {
+            List<RefID> value = new List<RefID> { new RefID(100), new RefID(102) };
+            byte[] data = SimpleSerialization.SerializeInline(value);
+
+            object deserialized = SimpleSerialization.DeserializeInline(
+                new BinaryReader(new MemoryStream(data)),
+                resoniteEnv
+            );
+
+            Assert.Equal(value, (List<RefID>)deserialized);
+        }
+
+        [Fact]
+        public void TestTruncatedInlineStringThrows()
+        {
+            byte[] data = SimpleSerialization.SerializeInline("1234");
+            BinaryReader reader = new BinaryReader(new MemoryStream(data, 0, data.Length - 1));
+
+            Assert.Throws<EndOfStreamException>(
+                () => SimpleSerialization.DeserializeInline(reader, resoniteEnv)
+            );
+        }
+
+        [Fact]
+        public void TestUnknownInlineTypeThrows()
+        {
+            BinaryReader reader = new BinaryReader(new MemoryStream(BitConverter.GetBytes(1000)));
+
+            Assert.Throws<InvalidDataException>(
+                () => SimpleSerialization.DeserializeInline(reader, resoniteEnv)
+            );
+        }
+
+        [Fact]
+        public void TestUnserializableValueSerializesInlineAsNull()
+        {
+            Assert.Null(SimpleSerialization.SerializeInline(new object()));
+        }
     }
 }
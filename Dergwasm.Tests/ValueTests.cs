@@ -97,5 +97,21 @@ namespace DergwasmTests
                 Value.ValueType<Buff<WasmRefID<Slot>>>()
             );
         }
+
+        [Fact]
+        public void EqualFuncTypesHaveEqualHashCodes()
+        {
+            FuncType a = new FuncType(
+                new ValueType[] { ValueType.I32, ValueType.I64 },
+                new ValueType[] { ValueType.F32 }
+            );
+            FuncType b = new FuncType(
+                new ValueType[] { ValueType.I32, ValueType.I64 },
+                new ValueType[] { ValueType.F32 }
+            );
+
+            Assert.Equal(a, b);
+            Assert.Equal(a.GetHashCode(), b.GetHashCode());
+        }
     }
 }
@@ -1,4 +1,5 @@
-﻿using Dergwasm.Modules;
+﻿using Dergwasm.Environments;
+using Dergwasm.Modules;
 using Dergwasm.Instructions;
 using Dergwasm.Runtime;
 using Xunit;
@@ -747,5 +748,157 @@ namespace DergwasmTests.instructions
             Assert.Equal(2, machine.Frame.PC);
             Assert.Equal(new Value { s32 = 2 }, machine.Frame.TopOfStack);
         }
+
+        [Fact]
+        public void TestCallIndirectCachesTarget()
+        {
+            // 0: I32_CONST 1
+            // 1: CALL_INDIRECT 2, 3  // Should call Func 201.
+            // 2: END
+            //
+            // Func 211 (= idx 201, type 2):
+            // 0: I32_CONST 2
+            // 1: END
+            machine.SetProgram(0, I32Const(1), CallIndirect(2, 3), End());
+            machine.SetFuncAt(211, I32Const(2), End());
+            machine.SetTableAt(
+                33,
+                new Table("test", "$table0", new TableType(new Limits(2), ValueType.FUNCREF))
+            );
+            machine.tables[33].Elements[1] = Value.RefOfFuncAddr(211);
+
+            Assert.True(machine.Frame.Code[1].Operands[3].IsNullRef());
+
+            machine.Step(2);
+
+            Assert.Equal(machine.Frame.Module.Id, machine.Frame.Code[1].Operands[2].s32);
+            Assert.Equal(33UL, machine.Frame.Code[1].Operands[2].value_hi);
+            Assert.Equal(Value.RefOfFuncAddr(211), machine.Frame.Code[1].Operands[3]);
+        }
+
+        [Fact]
+        public void TestCallIndirectCacheIsPerModuleInstance()
+        {
+            // 0: I32_CONST 1
+            // 1: CALL_INDIRECT 2, 3
+            // 2: END
+            //
+            // In the first machine, Func 211 (= idx 201, type 2):
+            // 0: I32_CONST 2
+            // 1: END
+            //
+            // In the second machine, which runs the same instructions, Func 211 is Func 110
+            // (= idx 100, type 1), so the call must fail the signature check.
+            machine.SetProgram(0, I32Const(1), CallIndirect(2, 3), End());
+            machine.SetFuncAt(211, I32Const(2), End());
+            machine.SetTableAt(
+                33,
+                new Table("test", "$table0", new TableType(new Limits(2), ValueType.FUNCREF))
+            );
+            machine.tables[33].Elements[1] = Value.RefOfFuncAddr(211);
+            machine.Step(2);
+
+            TestMachine other = new TestMachine();
+            other.SetProgram(0, I32Const(1), CallIndirect(2, 3), End());
+            other.Frame.Func.Code = machine.Frame.Code;
+            other.SetFuncAt(110, Drop(), End());
+            other.funcs[211] = other.funcs[110];
+            other.SetTableAt(
+                33,
+                new Table("test", "$table0", new TableType(new Limits(2), ValueType.FUNCREF))
+            );
+            other.tables[33].Elements[1] = Value.RefOfFuncAddr(211);
+
+            other.Step();
+            Assert.Throws<Trap>(() => other.Step());
+        }
+
+        [Fact]
+        public void TestCallIndirectChecksSignatureAfterTableChange()
+        {
+            // 0: I32_CONST 1
+            // 1: CALL_INDIRECT 2, 3  // Calls Func 201 the first time, and Func 100 the second.
+            // 2: DROP
+            // 3: I32_CONST 1
+            // 4: CALL_INDIRECT 2, 3
+            // 5: END
+            //
+            // Func 110 (= idx 100, type 1):
+            // 0: DROP
+            // 1: END
+            //
+            // Func 211 (= idx 201, type 2):
+            // 0: I32_CONST 2
+            // 1: END
+            machine.SetProgram(
+                0,
+                I32Const(1),
+                CallIndirect(2, 3),
+                Drop(),
+                I32Const(1),
+                CallIndirect(2, 3),
+                End()
+            );
+            machine.SetFuncAt(110, Drop(), End());
+            machine.SetFuncAt(211, I32Const(2), End());
+            machine.SetTableAt(
+                33,
+                new Table("test", "$table0", new TableType(new Limits(2), ValueType.FUNCREF))
+            );
+            machine.tables[33].Elements[1] = Value.RefOfFuncAddr(211);
+
+            machine.Step(3);
+            machine.tables[33].Elements[1] = Value.RefOfFuncAddr(110);
+            machine.Step();
+
+            Assert.Throws<Trap>(() => machine.Step());
+        }
+
+        [Fact]
+        public void TestCallUnwindsOnLongjmp()
+        {
+            // 0: I32_CONST 100
+            // 1: CALL 2
+            // 2: NOP
+            //
+            // Func 12 (= idx 2):
+            // 0: CALL 0
+            // 1: I32_CONST 1
+            // 2: END
+            //
+            // Func 10 (= idx 0): host func that longjmps
+            machine.SetProgram(0, I32Const(100), Call(2), Nop());
+            machine.SetFuncAt(12, Call(0), I32Const(1), End());
+            machine.SetHostFuncAt(10, (m, f) => m.LongjmpPending = true);
+
+            machine.Step(2);
+
+            // Func 12 was abandoned, so it didn't return its value.
+            Assert.True(machine.LongjmpPending);
+            Assert.Equal(2, machine.Frame.PC);
+            Assert.Collection(
+                machine.Frame.value_stack,
+                e => Assert.Equal(new Value { s32 = 100 }, e)
+            );
+        }
+
+        [Fact]
+        public void TestCallFuncThrowsOnLongjmp()
+        {
+            // Func 12 (= idx 2):
+            // 0: CALL 0
+            // 1: I32_CONST 1
+            // 2: END
+            //
+            // Func 10 (= idx 0): host func that longjmps
+            machine.SetProgram(0, Nop());
+            machine.SetFuncAt(12, Call(0), I32Const(1), End());
+            machine.SetHostFuncAt(10, (m, f) => m.LongjmpPending = true);
+
+            Assert.Throws<LongjmpException>(
+                () => machine.CallFunc<int>(machine.funcs[12], machine.Frame)
+            );
+            Assert.False(machine.LongjmpPending);
+        }
     }
 }
@@ -355,7 +355,63 @@ namespace DergwasmTests.instructions
 
             Assert.Collection(machine.Frame.value_stack, v => Assert.Equal(expected_return, v.s32));
 
-            Assert.Equal(expected_size, machine.Heap.Length);
+            Assert.Equal(expected_size, machine.HeapSize);
+        }
+
+        [Fact]
+        public void TestMemoryReservesOnlyWhenAsked()
+        {
+            Assert.Equal(1 << 16, new Memory(new Limits(1)).Data.Length);
+            Assert.Equal(3 << 16, new Memory(new Limits(1), 2).Data.Length);
+            Assert.Equal(4 << 16, new Memory(new Limits(1, 4), 256).Data.Length);
+        }
+
+        [Fact]
+        public void TestMemoryGrowWithinReservedCapacityDoesNotReallocate()
+        {
+            Memory mem = new Memory(new Limits(1, 4), 256);
+            machine.memories[0] = mem;
+            byte[] data = mem.Data;
+            data[0x100] = 0x42;
+
+            Assert.Equal(4 << 16, data.Length);
+            Assert.Equal(1 << 16, machine.HeapSize);
+
+            // 0: I32_CONST 2
+            // 1: MEMORY_GROW 0
+            // 2: NOP
+            machine.SetProgram(
+                0,
+                I32Const(2),
+                Insn(InstructionType.MEMORY_GROW, new Value { s32 = 0 }),
+                Nop()
+            );
+
+            machine.Step(2);
+
+            Assert.Collection(machine.Frame.value_stack, v => Assert.Equal(1, v.s32));
+            Assert.Equal(3 << 16, machine.HeapSize);
+            Assert.Same(data, mem.Data);
+            Assert.Equal(0x42, machine.Heap[0x100]);
+        }
+
+        [Fact]
+        public void TestLoadPastSizeButWithinReservedCapacityTraps()
+        {
+            machine.memories[0] = new Memory(new Limits(1, 4), 3);
+
+            // 0: I32_CONST 0x10000
+            // 1: I32_LOAD 0, 0
+            // 2: NOP
+            machine.SetProgram(
+                0,
+                I32Const(0x10000),
+                Insn(InstructionType.I32_LOAD, new Value { s32 = 0 }, new Value { s32 = 0 }),
+                Nop()
+            );
+
+            machine.Step();
+            Assert.Throws<Trap>(() => machine.Step());
         }
 
         [Theory]
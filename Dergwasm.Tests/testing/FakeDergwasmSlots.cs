@@ -1,5 +1,6 @@
 ﻿using System;
 using System.Threading.Tasks;
+using Dergwasm.Environments;
 using Dergwasm.Resonite;
 using FrooxEngine;
 
@@ -13,7 +14,7 @@ namespace DergwasmTests.testing
 
         public Slot ConsoleSlot => null;
 
-        public Slot FilesystemSlot => null;
+        public IFileNode FilesystemRoot { get; set; }
 
         public bool Ready => true;
 
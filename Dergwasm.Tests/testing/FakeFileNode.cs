@@ -0,0 +1,51 @@
+﻿using System.Collections.Generic;
+using Dergwasm.Environments;
+
+namespace DergwasmTests.testing
+{
+    // An in-memory file or directory, standing in for a slot in the filesystem.
+    public class FakeFileNode : IFileNode
+    {
+        public readonly string Name;
+        public readonly List<FakeFileNode> Children = new List<FakeFileNode>();
+        FakeFileNode parent;
+
+        public FakeFileNode(string name = "root", bool isFile = false)
+        {
+            Name = name;
+            IsFile = isFile;
+        }
+
+        public IFileNode Parent => parent;
+
+        public bool IsFile { get; }
+
+        public string Contents { get; set; }
+
+        // Adds a directory with the given name, and returns it.
+        public FakeFileNode AddDirectory(string name) => (FakeFileNode)AddChild(name, false);
+
+        // Adds a file with the given name and contents, and returns it.
+        public FakeFileNode AddFile(string name, string contents)
+        {
+            FakeFileNode file = (FakeFileNode)AddChild(name, true);
+            file.Contents = contents;
+            return file;
+        }
+
+        public IFileNode FindChild(string name) => Children.Find(child => child.Name == name);
+
+        public IFileNode AddChild(string name, bool isFile)
+        {
+            FakeFileNode child = new FakeFileNode(name, isFile) { parent = this };
+            Children.Add(child);
+            return child;
+        }
+
+        public void Destroy()
+        {
+            parent?.Children.Remove(this);
+            parent = null;
+        }
+    }
+}
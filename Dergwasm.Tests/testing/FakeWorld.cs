@@ -13,6 +13,7 @@ namespace DergwasmTests.testing
     {
         Dictionary<RefID, IWorldElement> objects = new Dictionary<RefID, IWorldElement>();
         Dictionary<Uri, string> assetFiles = new Dictionary<Uri, string>();
+        List<Action> synchronousActions = new List<Action>();
         Slot root;
         ulong nextRefID = 1;
 
@@ -66,5 +67,16 @@ namespace DergwasmTests.testing
         public void ToBackground() { }
 
         public void ToWorld() { }
+
+        public void RunSynchronously(Action action) => synchronousActions.Add(action);
+
+        // Runs the actions queued by RunSynchronously, as a world update would.
+        public void RunUpdate()
+        {
+            List<Action> actions = synchronousActions;
+            synchronousActions = new List<Action>();
+            foreach (Action action in actions)
+                action();
+        }
     }
 }
@@ -4,6 +4,7 @@ using System.IO;
 using System.Threading.Tasks;
 using Dergwasm.Wasm;
 using Dergwasm.Instructions;
+using Dergwasm.Modules;
 using Dergwasm.Runtime;
 using Elements.Core; // For UniLog
 using FrooxEngine;
@@ -22,6 +23,33 @@ namespace Dergwasm
         public override string Version => typeof(Dergwasm).Assembly.GetName().Version.ToString();
         public static ModConfiguration Config;
 
+        [AutoRegisterConfigKey]
+        public static readonly ModConfigurationKey<WriteBackPolicy> FileWriteBack =
+            new ModConfigurationKey<WriteBackPolicy>(
+                "file_write_back",
+                "When changes to files are written back to their slots: WriteThrough (every sync), "
+                    + "Coalesced (at most once per update), or OnClose.",
+                () => WriteBackPolicy.Coalesced
+            );
+
+        [AutoRegisterConfigKey]
+        public static readonly ModConfigurationKey<bool> UseBytecodeCache =
+            new ModConfigurationKey<bool>(
+                "bytecode_cache",
+                "Serve precompiled .mpy files from the slot filesystem in place of their .py "
+                    + "sources. The firmware must be built with MICROPY_PERSISTENT_CODE_LOAD.",
+                () => false
+            );
+
+        [AutoRegisterConfigKey]
+        public static readonly ModConfigurationKey<string> HostCallTracePath =
+            new ModConfigurationKey<string>(
+                "host_call_trace",
+                "If set, records calls between WASM and the host to this file, for replaying "
+                    + "offline with LoadModule --replay. Recording is slow.",
+                () => ""
+            );
+
         public override void OnEngineInit()
         {
             Harmony harmony = new Harmony("dev.xekri.Dergwasm");
@@ -98,6 +126,7 @@ namespace Dergwasm
         public static EmscriptenWasi emscriptenWasi = null;
         public static ResoniteEnv resoniteEnv = null;
         public static FilesystemEnv filesystemEnv = null;
+        public static HostCallRecorder recorder = null;
         public static bool initialized = false;
 
         public static void Output(string msg)
@@ -141,6 +170,7 @@ namespace Dergwasm
             moduleInstance = null;
             emscriptenEnv = null;
             emscriptenWasi = null;
+            resoniteEnv?.Dispose();
             resoniteEnv = null;
             filesystemEnv = null;
             initialized = false;
@@ -172,26 +202,50 @@ namespace Dergwasm
                 Msg($"Dergwasm v{typeof(Dergwasm).Assembly.GetName().Version}");
                 Msg("Init called");
                 machine = new Machine();
+                // Reserve room for the heap to grow into, so that most memory.grow calls don't
+                // copy the whole heap.
+                machine.ReservedMemoryPages = 256;
                 // machine.Debug = true;
 
-                // Register all the environments.
+                recorder?.Dispose();
+                recorder = null;
+                string tracePath = Dergwasm.Config?.GetValue(Dergwasm.HostCallTracePath);
+                if (!string.IsNullOrEmpty(tracePath))
+                {
+                    Msg($"Recording host calls to {tracePath}");
+                    recorder = new HostCallRecorder(machine, File.Create(tracePath));
+                }
+
+                // Register all the environments. The ones with state that WASM can't
+                // reproduce by itself are recorded, if recording.
                 emscriptenEnv = new EmscriptenEnv(machine) { outputWriter = Output };
                 machine.Allocator = emscriptenEnv;
                 machine.RegisterModule(emscriptenEnv);
 
-                emscriptenWasi = new EmscriptenWasi(machine, emscriptenEnv);
-                machine.RegisterModule(emscriptenWasi);
+                emscriptenWasi = new EmscriptenWasi(machine, emscriptenEnv)
+                {
+                    WriteBackPolicy =
+                        Dergwasm.Config?.GetValue(Dergwasm.FileWriteBack)
+                        ?? WriteBackPolicy.Coalesced,
+                    ScheduleFlush = world.RunSynchronously,
+                };
+                machine.RegisterModule(Recorded(emscriptenWasi));
 
-                resoniteEnv = new ResoniteEnv(machine, world, emscriptenEnv);
-                machine.RegisterModule(resoniteEnv);
+                resoniteEnv?.Dispose();
+                resoniteEnv = new ResoniteEnv(machine, world, emscriptenEnv, recorder);
+                machine.RegisterModule(Recorded(resoniteEnv));
 
                 filesystemEnv = new FilesystemEnv(
                     machine,
-                    dergwasmSlots.FilesystemSlot,
+                    dergwasmSlots.FilesystemRoot,
                     emscriptenEnv,
                     emscriptenWasi
-                );
-                machine.RegisterModule(filesystemEnv);
+                )
+                {
+                    UseBytecodeCache =
+                        Dergwasm.Config?.GetValue(Dergwasm.UseBytecodeCache) ?? false,
+                };
+                machine.RegisterModule(Recorded(filesystemEnv));
 
                 // Read and parse the WASM file.
                 Module module;
@@ -200,7 +254,7 @@ namespace Dergwasm
                 using (var stream = File.OpenRead(filename))
                 {
                     BinaryReader reader = new BinaryReader(stream);
-                    module = Module.Read("wasm_main", reader);
+                    module = Module.Read("wasm_main", reader, parallel: true);
                 }
                 Msg("WASM file read");
                 machine.MainModuleName = module.ModuleName;
@@ -227,6 +281,9 @@ namespace Dergwasm
             }
         }
 
+        static IHostModule Recorded(IHostModule module) =>
+            recorder == null ? module : recorder.Wrap(module);
+
         static void CheckForUnimplementedInstructions()
         {
             HashSet<InstructionType> needed = new HashSet<InstructionType>();
@@ -263,7 +320,16 @@ namespace Dergwasm
             Msg("Running __wasm_call_ctors");
             Frame frame = new Frame(ctors as ModuleFunc, moduleInstance, null);
             frame.Label = new Label(0, 0);
-            frame.InvokeFunc(machine, ctors);
+            recorder?.BeginEntry(ctors.Name, new Value[0]);
+            try
+            {
+                frame.InvokeFunc(machine, ctors);
+                machine.ThrowIfLongjmpPending();
+            }
+            finally
+            {
+                recorder?.EndEntry();
+            }
             Msg("Completed __wasm_call_ctors");
         }
 
@@ -278,7 +344,16 @@ namespace Dergwasm
                 Frame frame = new Frame(mp_js_init as ModuleFunc, moduleInstance, null);
                 frame.Label = new Label(1, 0);
                 frame.Push(new Value { s32 = stackSizeBytes });
-                frame.InvokeFunc(machine, mp_js_init);
+                recorder?.BeginEntry(mp_js_init.Name, new[] { new Value { s32 = stackSizeBytes } });
+                try
+                {
+                    frame.InvokeFunc(machine, mp_js_init);
+                    machine.ThrowIfLongjmpPending();
+                }
+                finally
+                {
+                    recorder?.EndEntry();
+                }
                 Msg("Completed mp_js_init");
             }
             catch (ExitTrap)
@@ -0,0 +1,84 @@
+using System;
+using System.Security.Cryptography;
+using System.Text;
+
+namespace Dergwasm.Environments
+{
+    // Encodes and decodes precompiled MicroPython bytecode (.mpy) files stored in the slot
+    // filesystem.
+    //
+    // Files in the slot filesystem are strings, so a cached module is stored as a text file
+    // next to its source, with the same name but a .mpy extension:
+    //
+    //   dergwasm-mpy:<sha256 of the UTF-8 source, lowercase hex>:<base64 of the .mpy bytes>
+    //
+    // The hash ties the bytecode to the exact source it was compiled from. If the source is
+    // edited, the cache entry is stale, and the filesystem acts as if it isn't there.
+    public static class BytecodeCache
+    {
+        public const string SourceExtension = ".py";
+        public const string BytecodeExtension = ".mpy";
+        const string Magic = "dergwasm-mpy:";
+
+        // Returns the path of the cache file for the given source path, or null if the path
+        // isn't a Python source file.
+        public static string BytecodePathFor(string sourcePath)
+        {
+            if (!sourcePath.EndsWith(SourceExtension))
+                return null;
+            return sourcePath.Substring(0, sourcePath.Length - SourceExtension.Length)
+                + BytecodeExtension;
+        }
+
+        // Returns the path of the source file for the given cache path, or null if the path
+        // isn't a bytecode file.
+        public static string SourcePathFor(string bytecodePath)
+        {
+            if (!bytecodePath.EndsWith(BytecodeExtension))
+                return null;
+            return bytecodePath.Substring(0, bytecodePath.Length - BytecodeExtension.Length)
+                + SourceExtension;
+        }
+
+        public static string SourceHash(string source)
+        {
+            using (SHA256 sha = SHA256.Create())
+            {
+                byte[] hash = sha.ComputeHash(Encoding.UTF8.GetBytes(source ?? ""));
+                StringBuilder sb = new StringBuilder(hash.Length * 2);
+                foreach (byte b in hash)
+                    sb.Append(b.ToString("x2"));
+                return sb.ToString();
+            }
+        }
+
+        public static string Encode(string source, byte[] bytecode) =>
+            Magic + SourceHash(source) + ":" + Convert.ToBase64String(bytecode);
+
+        // Decodes the given cache file contents, returning true if it's a valid cache entry
+        // for the given source.
+        public static bool TryDecode(string cached, string source, out byte[] bytecode)
+        {
+            bytecode = null;
+            if (cached == null || !cached.StartsWith(Magic))
+                return false;
+
+            int hashEnd = cached.IndexOf(':', Magic.Length);
+            if (hashEnd < 0)
+                return false;
+            string hash = cached.Substring(Magic.Length, hashEnd - Magic.Length);
+            if (hash != SourceHash(source))
+                return false;
+
+            try
+            {
+                bytecode = Convert.FromBase64String(cached.Substring(hashEnd + 1).Trim());
+            }
+            catch (FormatException)
+            {
+                return false;
+            }
+            return true;
+        }
+    }
+}
@@ -6,8 +6,9 @@ using Dergwasm.Runtime;
 
 namespace Dergwasm.Environments
 {
-    // Exception thrown when longjmp is called in a C program. The WASM code and the EmscriptenEnv
-    // work together to implement setjmp/longjmp functionality.
+    // Exception thrown when a longjmp has to unwind past a host function other than invoke_*.
+    // Normally longjmp doesn't throw: see Machine.LongjmpPending. The WASM code and the
+    // EmscriptenEnv work together to implement setjmp/longjmp functionality.
     public class LongjmpException : Exception
     {
         public LongjmpException()
@@ -21,6 +22,7 @@ namespace Dergwasm.Environments
         public const int EACCES = 13; // Permission denied
         public const int EFAULT = 14; // Bad address
         public const int ENOTDIR = 20; // Not a directory
+        public const int EISDIR = 21; // Is a directory
         public const int EINVAL = 22; // Invalid argument
         public const int EFBIG = 27; // File too large
         public const int ERANGE = 34; // Math result not representable
@@ -33,9 +35,48 @@ namespace Dergwasm.Environments
         public Machine machine;
         public Action<string> outputWriter = null;
 
+        // If true, longjmp throws a LongjmpException instead of setting Machine.LongjmpPending.
+        // This is much slower, and is only here to compare against.
+        public bool ThrowLongjmpExceptions = false;
+
+        // Exports that are called often, such as for every invoke_* call, resolved once
+        // instead of looked up by name on every call.
+        readonly ExportedFunc mallocExport;
+        readonly ExportedFunc freeExport;
+        readonly ExportedFunc setThrewExport;
+        readonly ExportedFunc stackSaveExport;
+        readonly ExportedFunc stackRestoreExport;
+        readonly ExportedFunc stackAllocExport;
+        readonly ExportedFunc dynCall_vExport;
+        readonly ExportedFunc dynCall_viExport;
+        readonly ExportedFunc dynCall_viiExport;
+        readonly ExportedFunc dynCall_viiiExport;
+        readonly ExportedFunc dynCall_viiiiExport;
+        readonly ExportedFunc dynCall_iExport;
+        readonly ExportedFunc dynCall_iiExport;
+        readonly ExportedFunc dynCall_iiiExport;
+        readonly ExportedFunc dynCall_iiiiExport;
+        readonly ExportedFunc dynCall_iiiiiExport;
+
         public EmscriptenEnv(Machine machine)
         {
             this.machine = machine;
+            mallocExport = new ExportedFunc(machine, "malloc");
+            freeExport = new ExportedFunc(machine, "free");
+            setThrewExport = new ExportedFunc(machine, "setThrew");
+            stackSaveExport = new ExportedFunc(machine, "stackSave");
+            stackRestoreExport = new ExportedFunc(machine, "stackRestore");
+            stackAllocExport = new ExportedFunc(machine, "stackAlloc");
+            dynCall_vExport = new ExportedFunc(machine, "dynCall_v");
+            dynCall_viExport = new ExportedFunc(machine, "dynCall_vi");
+            dynCall_viiExport = new ExportedFunc(machine, "dynCall_vii");
+            dynCall_viiiExport = new ExportedFunc(machine, "dynCall_viii");
+            dynCall_viiiiExport = new ExportedFunc(machine, "dynCall_viiii");
+            dynCall_iExport = new ExportedFunc(machine, "dynCall_i");
+            dynCall_iiExport = new ExportedFunc(machine, "dynCall_ii");
+            dynCall_iiiExport = new ExportedFunc(machine, "dynCall_iii");
+            dynCall_iiiiExport = new ExportedFunc(machine, "dynCall_iiii");
+            dynCall_iiiiiExport = new ExportedFunc(machine, "dynCall_iiiii");
         }
 
         // Creates an empty frame which can be used to call a WASM function, if you weren't
@@ -102,12 +143,19 @@ namespace Dergwasm.Environments
         {
             if (ptr == 0)
                 return null;
+            machine.CheckHeapBounds(ptr, 0);
+            byte[] heap = machine.Heap;
+            int heapSize = machine.HeapSize;
             int endPtr = ptr;
-            while (machine.Heap[endPtr] != 0)
+            while (endPtr < heapSize && heap[endPtr] != 0)
             {
                 endPtr++;
             }
-            return Encoding.UTF8.GetString(machine.Heap, ptr, endPtr - ptr);
+            if (endPtr == heapSize)
+            {
+                throw new Trap($"Unterminated string at 0x{ptr:X8} runs off the end of memory");
+            }
+            return Encoding.UTF8.GetString(heap, ptr, endPtr - ptr);
         }
 
         // Gets the NUL-terminated UTF8-encoded string at the given pointer in the heap.
@@ -125,6 +173,7 @@ namespace Dergwasm.Environments
         // NUL-terminated.
         public string GetUTF8StringFromMem(int ptr, uint len)
         {
+            machine.CheckHeapBounds(ptr, (int)len);
             return Encoding.UTF8.GetString(machine.Heap, ptr, (int)len);
         }
 
@@ -132,6 +181,7 @@ namespace Dergwasm.Environments
         // length is given by the buffer, the string does not have to be NUL-terminated.
         public string GetUTF8StringFromMem(Buff<byte> buffer)
         {
+            machine.CheckHeapBounds(buffer.Ptr.Addr, buffer.Length);
             return Encoding.UTF8.GetString(machine.Heap, buffer.Ptr.Addr, buffer.Length);
         }
 
@@ -140,6 +190,7 @@ namespace Dergwasm.Environments
         public int WriteUTF8StringToMem(Ptr<byte> ptr, string s, bool nullTerminated = false)
         {
             byte[] stringData = Encoding.UTF8.GetBytes(s);
+            machine.CheckHeapBounds(ptr.Addr, stringData.Length + (nullTerminated ? 1 : 0));
             Buffer.BlockCopy(stringData, 0, machine.Heap, ptr.Addr, stringData.Length);
             if (nullTerminated)
             {
@@ -366,13 +417,11 @@ namespace Dergwasm.Environments
         public int fflush(Frame frame, int fd) =>
             machine.CallExportedFunc<int, int>("fflush", frame, fd);
 
-        public int malloc(Frame frame, int amt) =>
-            machine.CallExportedFunc<int, int>("malloc", frame, amt);
+        public int malloc(Frame frame, int amt) => mallocExport.InvokeInt(frame, amt);
 
-        public void free(Frame frame, int ptr) => machine.CallExportedFunc("free", frame, ptr);
+        public void free(Frame frame, int ptr) => freeExport.Invoke(frame, ptr);
 
-        public void setThrew(Frame frame, int a, int b) =>
-            machine.CallExportedFunc("setThrew", frame, a, b);
+        public void setThrew(Frame frame, int a, int b) => setThrewExport.Invoke(frame, a, b);
 
         public void setTempRet0(Frame frame, int a) =>
             machine.CallExportedFunc("setTempRet0", frame, a);
@@ -392,13 +441,11 @@ namespace Dergwasm.Environments
         public int emscripten_stack_get_current(Frame frame) =>
             machine.CallExportedFunc<int>("emscripten_stack_get_current", frame);
 
-        public int stackSave(Frame frame) => machine.CallExportedFunc<int>("stackSave", frame);
+        public int stackSave(Frame frame) => stackSaveExport.InvokeInt(frame);
 
-        public void stackRestore(Frame frame, int ptr) =>
-            machine.CallExportedFunc("stackRestore", frame, ptr);
+        public void stackRestore(Frame frame, int ptr) => stackRestoreExport.Invoke(frame, ptr);
 
-        public int stackAlloc(Frame frame, int size) =>
-            machine.CallExportedFunc<int, int>("stackAlloc", frame, size);
+        public int stackAlloc(Frame frame, int size) => stackAllocExport.InvokeInt(frame, size);
 
         //
         // Micropython-specific functions.
@@ -442,50 +489,33 @@ namespace Dergwasm.Environments
         // d = f64
         // e = externref
         // p = i32 (a pointer)
-        public void dynCall_v(Frame frame, int index) =>
-            machine.CallExportedFunc("dynCall_v", frame, index);
+        public void dynCall_v(Frame frame, int index) => dynCall_vExport.Invoke(frame, index);
 
         public void dynCall_vi(Frame frame, int index, int a0) =>
-            machine.CallExportedFunc("dynCall_vi", frame, index, a0);
+            dynCall_viExport.Invoke(frame, index, a0);
 
         public void dynCall_vii(Frame frame, int index, int a0, int a1) =>
-            machine.CallExportedFunc("dynCall_vii", frame, index, a0, a1);
+            dynCall_viiExport.Invoke(frame, index, a0, a1);
 
         public void dynCall_viii(Frame frame, int index, int a0, int a1, int a2) =>
-            machine.CallExportedFunc("dynCall_viii", frame, index, a0, a1, a2);
+            dynCall_viiiExport.Invoke(frame, index, a0, a1, a2);
 
         public void dynCall_viiii(Frame frame, int index, int a0, int a1, int a2, int a3) =>
-            machine.CallExportedFunc("dynCall_viiii", frame, index, a0, a1, a2, a3);
+            dynCall_viiiiExport.Invoke(frame, index, a0, a1, a2, a3);
 
-        public int dynCall_i(Frame frame, int index) =>
-            machine.CallExportedFunc<int, int>("dynCall_i", frame, index);
+        public int dynCall_i(Frame frame, int index) => dynCall_iExport.InvokeInt(frame, index);
 
         public int dynCall_ii(Frame frame, int index, int a0) =>
-            machine.CallExportedFunc<int, int, int>("dynCall_ii", frame, index, a0);
+            dynCall_iiExport.InvokeInt(frame, index, a0);
 
         public int dynCall_iii(Frame frame, int index, int a0, int a1) =>
-            machine.CallExportedFunc<int, int, int, int>("dynCall_iii", frame, index, a0, a1);
+            dynCall_iiiExport.InvokeInt(frame, index, a0, a1);
 
         public int dynCall_iiii(Frame frame, int index, int a0, int a1, int a2) =>
-            machine.CallExportedFunc<int, int, int, int, int>(
-                "dynCall_iiii",
-                frame,
-                index,
-                a0,
-                a1,
-                a2
-            );
+            dynCall_iiiiExport.InvokeInt(frame, index, a0, a1, a2);
 
         public int dynCall_iiiii(Frame frame, int index, int a0, int a1, int a2, int a3) =>
-            machine.CallExportedFunc<int, int, int, int, int, int>(
-                "dynCall_iiiii",
-                frame,
-                index,
-                a0,
-                a1,
-                a2,
-                a3
-            );
+            dynCall_iiiiiExport.InvokeInt(frame, index, a0, a1, a2, a3);
 
         public void __assert_fail(
             int conditionStrPtr,
@@ -499,16 +529,24 @@ namespace Dergwasm.Environments
         [ModFn("_emscripten_throw_longjmp")]
         public void _emscripten_throw_longjmp(Frame frame)
         {
-            throw new LongjmpException();
+            if (ThrowLongjmpExceptions)
+                throw new LongjmpException();
+            machine.LongjmpPending = true;
         }
 
         [ModFn("emscripten_memcpy_js")]
         public void emscripten_memcpy_js(Frame frame, int dest, int src, int len)
         {
-            Console.WriteLine($"emscripten_memcpy_js({dest}, {src}, {len})");
             byte[] mem = machine.Heap;
             try
             {
+                if (
+                    !machine.GetMemoryFromIndex(0).InBounds((uint)src, (uint)len)
+                    || !machine.GetMemoryFromIndex(0).InBounds((uint)dest, (uint)len)
+                )
+                {
+                    throw new IndexOutOfRangeException();
+                }
                 Array.Copy(mem, src, mem, dest, len);
             }
             catch (Exception)
@@ -552,169 +590,130 @@ namespace Dergwasm.Environments
         // Indirect function calls resulting from Emscripten's setjmp/longjmp implementation.
         //
 
-        [ModFn("invoke_v")]
-        public void invoke_v(Frame frame, int index)
+        // Calls the given dynCall_* function on behalf of an invoke_* function. The table index
+        // and args must already be pushed onto the frame.
+        //
+        // If the callee longjmps, the interpreter unwinds back to here without throwing (see
+        // Machine.LongjmpPending). Then we restore the stack pointer and call setThrew, as
+        // Emscripten expects, and return false. Otherwise we return true, and the callee's
+        // return value, if any, is on the frame's stack.
+        bool InvokeCatchingLongjmp(Frame frame, ExportedFunc dynCall, int sp)
         {
-            int sp = stackSave(frame);
             try
             {
-                // CallIndirectFunc(index, frame);
-                dynCall_v(frame, index);
+                frame.InvokeFunc(machine, dynCall.Func);
             }
             catch (LongjmpException)
             {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
+                machine.LongjmpPending = true;
             }
+            if (!machine.LongjmpPending)
+                return true;
+
+            machine.LongjmpPending = false;
+            stackRestore(frame, sp);
+            setThrew(frame, 1, 0);
+            return false;
+        }
+
+        [ModFn("invoke_v")]
+        public void invoke_v(Frame frame, int index)
+        {
+            int sp = stackSave(frame);
+            frame.Push(index);
+            InvokeCatchingLongjmp(frame, dynCall_vExport, sp);
         }
 
         [ModFn("invoke_vi")]
         public void invoke_vi(Frame frame, int index, int a0)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // CallIndirectFunc<int>(index, frame, a0);
-                dynCall_vi(frame, index, a0);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            InvokeCatchingLongjmp(frame, dynCall_viExport, sp);
         }
 
         [ModFn("invoke_vii")]
         public void invoke_vii(Frame frame, int index, int a0, int a1)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // CallIndirectFunc<int, int>(index, frame, a0, a1);
-                dynCall_vii(frame, index, a0, a1);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            frame.Push(a1);
+            InvokeCatchingLongjmp(frame, dynCall_viiExport, sp);
         }
 
         [ModFn("invoke_viii")]
         public void invoke_viii(Frame frame, int index, int a0, int a1, int a2)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // CallIndirectFunc<int, int, int>(index, frame, a0, a1, a2);
-                dynCall_viii(frame, index, a0, a1, a2);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            frame.Push(a1);
+            frame.Push(a2);
+            InvokeCatchingLongjmp(frame, dynCall_viiiExport, sp);
         }
 
         [ModFn("invoke_viiii")]
         public void invoke_viiii(Frame frame, int index, int a0, int a1, int a2, int a3)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // CallIndirectFunc<int, int, int, int>(index, frame, a0, a1, a2, a3);
-                dynCall_viiii(frame, index, a0, a1, a2, a3);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            frame.Push(a1);
+            frame.Push(a2);
+            frame.Push(a3);
+            InvokeCatchingLongjmp(frame, dynCall_viiiiExport, sp);
         }
 
         [ModFn("invoke_i")]
         public int invoke_i(Frame frame, int index)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // return CallIndirectFunc<int>(index, frame);
-                return dynCall_i(frame, index);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-                return 0; // ????
-            }
+            frame.Push(index);
+            return InvokeCatchingLongjmp(frame, dynCall_iExport, sp) ? frame.Pop<int>() : 0;
         }
 
         [ModFn("invoke_ii")]
         public int invoke_ii(Frame frame, int index, int a0)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // return CallIndirectFunc<int, int>(index, frame, a0);
-                return dynCall_ii(frame, index, a0);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-                return 0; // ????
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            return InvokeCatchingLongjmp(frame, dynCall_iiExport, sp) ? frame.Pop<int>() : 0;
         }
 
         [ModFn("invoke_iii")]
         public int invoke_iii(Frame frame, int index, int a0, int a1)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // return CallIndirectFunc<int, int, int>(index, frame, a0, a1);
-                return dynCall_iii(frame, index, a0, a1);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-                return 0; // ????
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            frame.Push(a1);
+            return InvokeCatchingLongjmp(frame, dynCall_iiiExport, sp) ? frame.Pop<int>() : 0;
         }
 
         [ModFn("invoke_iiii")]
         public int invoke_iiii(Frame frame, int index, int a0, int a1, int a2)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // return CallIndirectFunc<int, int, int, int>(index, frame, a0, a1, a2);
-                return dynCall_iiii(frame, index, a0, a1, a2);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-                return 0; // ????
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            frame.Push(a1);
+            frame.Push(a2);
+            return InvokeCatchingLongjmp(frame, dynCall_iiiiExport, sp) ? frame.Pop<int>() : 0;
         }
 
         [ModFn("invoke_iiiii")]
         public int invoke_iiiii(Frame frame, int index, int a0, int a1, int a2, int a3)
         {
             int sp = stackSave(frame);
-            try
-            {
-                // return CallIndirectFunc<int, int, int, int, int>(index, frame, a0, a1, a2, a3);
-                return dynCall_iiiii(frame, index, a0, a1, a2, a3);
-            }
-            catch (LongjmpException)
-            {
-                stackRestore(frame, sp);
-                setThrew(frame, 1, 0);
-                return 0; // ????
-            }
+            frame.Push(index);
+            frame.Push(a0);
+            frame.Push(a1);
+            frame.Push(a2);
+            frame.Push(a3);
+            return InvokeCatchingLongjmp(frame, dynCall_iiiiiExport, sp) ? frame.Pop<int>() : 0;
         }
 
         //
@@ -737,9 +736,9 @@ namespace Dergwasm.Environments
         [ModFn("mp_js_write")]
         public void mp_js_write(Frame frame, int ptr, int len)
         {
+            machine.CheckHeapBounds(ptr, len);
             byte[] data = new byte[len];
             Array.Copy(machine.Heap, ptr, data, 0, len);
-            Console.WriteLine($"  MicroPython wrote: {Encoding.UTF8.GetString(data)}");
             if (outputWriter != null)
             {
                 outputWriter(Encoding.UTF8.GetString(data));
@@ -19,10 +19,49 @@ namespace Dergwasm.Environments
         // See https://learn.microsoft.com/en-us/dotnet/api/system.array
         public ulong position;
 
-        // Called when this stream is synced.
+        // If true, every write goes to the end of the file.
+        public bool append;
+
+        // Whether the content has changed since it was last written back with sync.
+        //
+        // This is a flag rather than a set of dirty byte ranges on purpose: a file is stored
+        // in its slot as a single string field, and FrooxEngine replicates a field by sending
+        // its whole new value, so there's no way to write back only the bytes that changed.
+        // The cost of a write-back is paid per write-back, not per changed byte, which is why
+        // WriteBackPolicy limits how often write-backs happen instead.
+        public bool dirty;
+
+        // When the content last changed, as a count of changes to any stream. Used to find the
+        // newest unwritten content of a file that several streams have changed.
+        public long modified;
+
+        // Called to write this stream's content back to wherever it came from. See
+        // WriteBackPolicy for when this happens.
         public Func<Stream, int> sync;
     }
 
+    // When a stream's changes are written back with its sync function.
+    //
+    // Writing a file back to its slot replaces the whole string value of a field, which is
+    // replicated to every user in the session, so writing back on every fd_sync is expensive
+    // for programs that write and sync a little at a time, like loggers. The policies trade
+    // durability for throughput. Whatever the policy, a stream is only written back if it has
+    // changed, and any file that's still dirty when it's closed is written back.
+    public enum WriteBackPolicy
+    {
+        // Every fd_sync writes the stream back immediately.
+        WriteThrough,
+
+        // fd_sync marks the stream as pending, and pending streams are written back together
+        // by FlushPending, which is scheduled to run once per engine update. A file is written
+        // back at most once per update, no matter how often it's synced.
+        Coalesced,
+
+        // fd_sync does nothing. Streams are only written back when they're closed, or by an
+        // explicit Flush.
+        OnClose,
+    }
+
     [Mod("wasi_snapshot_preview1")]
     public class EmscriptenWasi : ReflectedModule
     {
@@ -36,6 +75,20 @@ namespace Dergwasm.Environments
         public Dictionary<int, Stream> streams = new Dictionary<int, Stream>();
         SortedSet<int> availableFds = new SortedSet<int>();
 
+        public WriteBackPolicy WriteBackPolicy = WriteBackPolicy.WriteThrough;
+
+        // Schedules an action to run at the next engine update. Used to run FlushPending under
+        // the Coalesced policy. If null, pending streams are only written back by explicit
+        // calls to FlushPending or Flush.
+        public Action<Action> ScheduleFlush = null;
+
+        // Streams, open or closed, waiting to be written back by FlushPending.
+        HashSet<Stream> pendingStreams = new HashSet<Stream>();
+        bool flushScheduled = false;
+
+        // The number of changes made to any stream's content, for Stream.modified.
+        long changes = 0;
+
         public EmscriptenWasi(Machine machine, EmscriptenEnv emscriptenEnv)
         {
             this.machine = machine;
@@ -54,17 +107,13 @@ namespace Dergwasm.Environments
             return streams.Count + 3;
         }
 
-        // Creates a stream for the given slot, which must be a file. The `path` is
-        // the normalized path to the slot.
+        // Creates a stream for the given file node, which must be a file. The `path` is
+        // the normalized path to the file.
         //
         // We do not support binary files yet.
-        public Stream CreateStream(Slot slot, string path, Func<Stream, int> syncer = null)
+        public Stream CreateStream(IFileNode file, string path, Func<Stream, int> syncer = null)
         {
-            return CreateStream(
-                path,
-                Encoding.UTF8.GetBytes(slot.GetComponent<ValueField<string>>().Value),
-                syncer
-            );
+            return CreateStream(path, Encoding.UTF8.GetBytes(file.Contents ?? ""), syncer);
         }
 
         // Creates a stream for the given path and content. The `path` is required to be
@@ -84,18 +133,26 @@ namespace Dergwasm.Environments
             return stream;
         }
 
-        // Closes a file descriptor. Closing does not guarantee that the data has been
-        // successfully saved. Use Sync() to ensure that the data has been saved.
+        // Closes a file descriptor. Closing writes back the stream if it has changed, but
+        // under the Coalesced policy, that only happens at the next FlushPending. Use Flush()
+        // to ensure that the data has been saved.
         public int Close(int fd)
         {
             if (!streams.ContainsKey(fd))
                 return -Errno.EBADF;
+            Stream stream = streams[fd];
             streams.Remove(fd);
             // There's an opportunity for more cleverness, since there's no need to store fd
             // numbers higher than the highest fd number in use. But it's not worth the
             // code complexity at this point.
             availableFds.Add(fd);
-            return 0;
+
+            if (WriteBackPolicy == WriteBackPolicy.Coalesced)
+            {
+                MarkPending(stream);
+                return 0;
+            }
+            return WriteBack(stream);
         }
 
         // Reads data from a file descriptor, returning the amount of data read, or -errno.
@@ -136,6 +193,7 @@ namespace Dergwasm.Environments
 
             try
             {
+                machine.CheckHeapBounds(memptr, nread);
                 Buffer.BlockCopy(
                     streams[fd].content,
                     (int)streams[fd].position,
@@ -206,6 +264,8 @@ namespace Dergwasm.Environments
                 return WriteStdout(data);
             if (!streams.ContainsKey(fd))
                 return -Errno.EBADF;
+            if (streams[fd].append)
+                streams[fd].position = (ulong)streams[fd].content.Length;
 
             ulong newpos = streams[fd].position + (ulong)data.Length;
             if (newpos > MAX_ARRAY_LENGTH)
@@ -217,6 +277,8 @@ namespace Dergwasm.Environments
             }
             Buffer.BlockCopy(data, 0, streams[fd].content, (int)streams[fd].position, data.Length);
             streams[fd].position = newpos;
+            if (data.Length > 0)
+                MarkChanged(streams[fd]);
             return data.Length;
         }
 
@@ -228,6 +290,8 @@ namespace Dergwasm.Environments
                 return WriteStdout(memptr, len);
             if (!streams.ContainsKey(fd))
                 return -Errno.EBADF;
+            if (streams[fd].append)
+                streams[fd].position = (ulong)streams[fd].content.Length;
 
             ulong newpos = streams[fd].position + (ulong)len;
             if (newpos > MAX_ARRAY_LENGTH)
@@ -240,6 +304,7 @@ namespace Dergwasm.Environments
 
             try
             {
+                machine.CheckHeapBounds(memptr, len);
                 Buffer.BlockCopy(
                     machine.Heap,
                     memptr,
@@ -256,6 +321,8 @@ namespace Dergwasm.Environments
             }
 
             streams[fd].position = newpos;
+            if (len > 0)
+                MarkChanged(streams[fd]);
             return len;
         }
 
@@ -322,9 +389,142 @@ namespace Dergwasm.Environments
                 return 0;
             if (!streams.ContainsKey(fd))
                 return -Errno.EBADF;
-            if (streams[fd].sync == null)
+            switch (WriteBackPolicy)
+            {
+                case WriteBackPolicy.Coalesced:
+                    MarkPending(streams[fd]);
+                    return 0;
+                case WriteBackPolicy.OnClose:
+                    return 0;
+                default:
+                    return WriteBack(streams[fd]);
+            }
+        }
+
+        void MarkChanged(Stream stream)
+        {
+            stream.dirty = true;
+            stream.modified = ++changes;
+        }
+
+        // Empties the stream's content, as when a file is opened with O_TRUNC.
+        public void Truncate(Stream stream)
+        {
+            if (stream.content.Length == 0)
+                return;
+            stream.content = new byte[0];
+            stream.position = 0;
+            MarkChanged(stream);
+        }
+
+        // Returns the newest content of the file at the given normalized path that hasn't been
+        // written back yet, from an open stream or a closed one that's pending, or null if
+        // there is none and the file's slot is up to date. This lets the filesystem see
+        // unwritten changes without writing them back, which would defeat the
+        // WriteBackPolicy. The returned array is the stream's own; copy it before changing it.
+        public byte[] UnwrittenContent(string path)
+        {
+            Stream newest = null;
+            foreach (Stream stream in streams.Values)
+            {
+                if (stream.dirty && stream.path == path)
+                {
+                    if (newest == null || stream.modified > newest.modified)
+                        newest = stream;
+                }
+            }
+            foreach (Stream stream in pendingStreams)
+            {
+                if (stream.dirty && stream.path == path)
+                {
+                    if (newest == null || stream.modified > newest.modified)
+                        newest = stream;
+                }
+            }
+            return newest?.content;
+        }
+
+        // Writes back the stream if it has changed since it was last written back. Returns 0
+        // on success, or -errno.
+        int WriteBack(Stream stream)
+        {
+            if (!stream.dirty || stream.sync == null)
                 return 0;
-            return streams[fd].sync(streams[fd]);
+            int err = stream.sync(stream);
+            if (err == 0)
+                stream.dirty = false;
+            return err;
+        }
+
+        void MarkPending(Stream stream)
+        {
+            if (!stream.dirty)
+                return;
+            pendingStreams.Add(stream);
+            if (!flushScheduled && ScheduleFlush != null)
+            {
+                flushScheduled = true;
+                ScheduleFlush(() => FlushPending());
+            }
+        }
+
+        // Writes back all pending streams. Returns 0 on success, or the first -errno
+        // encountered. Streams that fail to write back are dropped, rather than retried
+        // forever.
+        public int FlushPending()
+        {
+            flushScheduled = false;
+            int result = 0;
+            foreach (Stream stream in pendingStreams)
+            {
+                int err = WriteBack(stream);
+                if (result == 0)
+                    result = err;
+            }
+            pendingStreams.Clear();
+            return result;
+        }
+
+        // Writes back all pending streams, and all open streams that have changed, regardless
+        // of the policy. Returns 0 on success, or the first -errno encountered.
+        public int Flush()
+        {
+            int result = FlushPending();
+            foreach (Stream stream in streams.Values)
+            {
+                int err = WriteBack(stream);
+                if (result == 0)
+                    result = err;
+            }
+            return result;
+        }
+
+        // Writes back any changes to the file at the given normalized path, so that reading
+        // the file from its slot sees them. Returns 0 on success, or the first -errno
+        // encountered.
+        public int Flush(string path)
+        {
+            int result = 0;
+            foreach (Stream stream in pendingStreams)
+            {
+                if (stream.path == path)
+                {
+                    int err = WriteBack(stream);
+                    if (result == 0)
+                        result = err;
+                }
+            }
+            pendingStreams.RemoveWhere(stream => stream.path == path);
+            foreach (Stream stream in streams.Values)
+            {
+                if (stream.path == path)
+                {
+                    int err = WriteBack(stream);
+                    if (result == 0)
+                        result = err;
+                }
+            }
+            return result;
         }
 
         // Terminates the process, closing all open file descriptors.
@@ -338,7 +538,7 @@ namespace Dergwasm.Environments
         [ModFn("proc_exit")]
         public void ProcExit(Frame frame, int exit_code)
         {
-            foreach (int fd in streams.Keys)
+            foreach (int fd in new List<int>(streams.Keys))
                 Close(fd);
             throw new ExitTrap(exit_code);
         }
@@ -363,10 +563,13 @@ namespace Dergwasm.Environments
 
         void EmscriptenMemcpyJs(Frame frame, int dest, int src, int len)
         {
-            Console.WriteLine($"EmscriptenMemcpyJs({dest}, {src}, {len})");
             Memory mem = machine.GetMemoryFromIndex(0);
             try
             {
+                if (!mem.InBounds((uint)src, (uint)len) || !mem.InBounds((uint)dest, (uint)len))
+                {
+                    throw new IndexOutOfRangeException();
+                }
                 Array.Copy(mem.Data, src, mem.Data, dest, len);
             }
             catch (Exception)
@@ -401,7 +604,7 @@ namespace Dergwasm.Environments
                 return -Errno.EFAULT;
 
             uint nwritten = 0;
-            using (MemoryStream iovStream = new MemoryStream(machine.Heap))
+            using (MemoryStream iovStream = machine.HeapStream())
             {
                 iovStream.Position = iov;
                 BinaryReader iovReader = new BinaryReader(iovStream);
@@ -474,7 +677,7 @@ namespace Dergwasm.Environments
 
             uint nread = 0;
 
-            using (MemoryStream iovStream = new MemoryStream(machine.Heap))
+            using (MemoryStream iovStream = machine.HeapStream())
             {
                 iovStream.Position = iov;
                 BinaryReader iovReader = new BinaryReader(iovStream);
@@ -16,32 +16,42 @@ namespace Dergwasm.Environments
     // constructor. This represents the root of the filesystem ("/"). Children of this
     // slot are either directories or files. Both are slots, but files additionally
     // have a ValueField<string> component attached to them, which contains the contents
-    // of the file.
+    // of the file. The slots are accessed through IFileNode (see SlotFileNode).
     //
     // Directory slots can further have directory or file children.
     //
     // Except for the root slot, the name of the file or directory is the name of its slot.
     //
     // The code acts so that the parent of the root slot is the root slot itself.
+    //
+    // Python modules can have precompiled bytecode cached next to them (see BytecodeCache).
+    // While a module's cache entry is up to date, stat reports the .py file as missing, so
+    // that MicroPython's importer, which prefers .py to .mpy, loads the bytecode instead of
+    // compiling the source. Opening the .py file directly still works.
     [Mod("env")]
     public class FilesystemEnv : ReflectedModule
     {
         public Machine machine;
-        public Slot fsRoot;
+        public IFileNode fsRoot;
         public EmscriptenEnv env;
         public EmscriptenWasi wasi;
         public bool Debug = false;
+
+        // Whether to serve up-to-date .mpy cache entries in place of their .py sources. Off by
+        // default, since the firmware can only import them if it was built with
+        // MICROPY_PERSISTENT_CODE_LOAD.
+        public bool UseBytecodeCache = false;
         string cwd = "/";
 
         public FilesystemEnv(
             Machine machine,
-            Slot fsRootSlot,
+            IFileNode fsRoot,
             EmscriptenEnv emscriptenEnv,
             EmscriptenWasi wasi
         )
         {
             this.machine = machine;
-            fsRoot = fsRootSlot;
+            this.fsRoot = fsRoot;
             env = emscriptenEnv;
             this.wasi = wasi;
         }
@@ -206,13 +216,15 @@ namespace Dergwasm.Environments
             return dir + "/" + path;
         }
 
-        bool slot_is_regular_file(Slot slot)
+        bool slot_is_regular_file(IFileNode slot)
         {
-            return slot.GetComponent<ValueField<string>>() != null;
+            return slot.IsFile;
         }
 
         int chdir_absolute(string path)
         {
+            if (fsRoot == null)
+                return -Errno.ENOENT;
             if (path == "/")
             {
                 cwd = "/";
@@ -224,7 +236,7 @@ namespace Dergwasm.Environments
             }
 
             List<string> normalized_elements = new List<string>();
-            Slot slot = fsRoot;
+            IFileNode slot = fsRoot;
 
             foreach (string element in path.Split('/'))
             {
@@ -234,7 +246,7 @@ namespace Dergwasm.Environments
                     continue;
                 if (element == "..")
                 {
-                    if (slot.Parent == fsRoot)
+                    if (fsRoot.Equals(slot.Parent))
                         continue;
                     slot = slot.Parent;
                     normalized_elements.RemoveAt(normalized_elements.Count - 1);
@@ -259,10 +271,17 @@ namespace Dergwasm.Environments
             return 0;
         }
 
-        int get_slot_for_absolute_path(string path, out Slot slot, out string normalized_path)
+        int get_slot_for_absolute_path(
+            string path,
+            out IFileNode slot,
+            out string normalized_path
+        )
         {
             slot = fsRoot;
             normalized_path = "";
+            // Without a filesystem slot, the filesystem is empty: not even the root exists.
+            if (fsRoot == null)
+                return -Errno.ENOENT;
             List<string> normalized_elements = new List<string>();
 
             foreach (string element in path.Split('/'))
@@ -273,7 +292,7 @@ namespace Dergwasm.Environments
                     continue;
                 if (element == "..")
                 {
-                    if (slot.Parent == fsRoot)
+                    if (fsRoot.Equals(slot.Parent))
                         continue;
                     slot = slot.Parent;
                     normalized_elements.RemoveAt(normalized_elements.Count - 1);
@@ -294,6 +313,29 @@ namespace Dergwasm.Environments
             return 0;
         }
 
+        // Gets the cached bytecode for the Python source file at the given normalized path.
+        // Returns false if caching is off, or there is no cache entry, or the entry is stale.
+        bool try_get_cached_bytecode(string sourcePath, out byte[] bytecode)
+        {
+            bytecode = null;
+            if (!UseBytecodeCache)
+                return false;
+            string bytecodePath = BytecodeCache.BytecodePathFor(sourcePath);
+            if (bytecodePath == null)
+                return false;
+
+            IFileNode sourceSlot;
+            IFileNode bytecodeSlot;
+            if (get_slot_for_absolute_path(sourcePath, out sourceSlot, out _) != 0)
+                return false;
+            if (get_slot_for_absolute_path(bytecodePath, out bytecodeSlot, out _) != 0)
+                return false;
+            if (!slot_is_regular_file(sourceSlot) || !slot_is_regular_file(bytecodeSlot))
+                return false;
+
+            return BytecodeCache.TryDecode(bytecodeSlot.Contents, sourceSlot.Contents, out bytecode);
+        }
+
         string basename(string path)
         {
             string[] elements = path.Split('/');
@@ -309,11 +351,11 @@ namespace Dergwasm.Environments
         }
 
         // Makes a directory or file slot at the given absolute path.
-        int mknod(string path, bool as_file, out Slot slot)
+        int mknod(string path, bool as_file, out IFileNode slot)
         {
             slot = null;
 
-            Slot parentSlot;
+            IFileNode parentSlot;
             int err = get_slot_for_absolute_path(dirname(path), out parentSlot, out _);
             if (err != 0)
                 return err;
@@ -325,12 +367,7 @@ namespace Dergwasm.Environments
                     DergwasmMachine.Msg($"mknode: invalid name: {name}");
                 return -Errno.EINVAL;
             }
-            slot = parentSlot.AddSlot(name);
-
-            if (as_file)
-            {
-                slot.AttachComponent<ValueField<string>>();
-            }
+            slot = parentSlot.AddChild(name, as_file);
             return 0;
         }
 
@@ -341,7 +378,7 @@ namespace Dergwasm.Environments
         // If the data is not valid UTF-8, returns -EINVAL.
         int sync(Stream stream)
         {
-            Slot slot;
+            IFileNode slot;
             int err = get_slot_for_absolute_path(stream.path, out slot, out _);
             if (err != 0)
                 return err;
@@ -349,9 +386,7 @@ namespace Dergwasm.Environments
                 return 0;
             try
             {
-                slot.GetComponent<ValueField<string>>().Value.Value = Encoding.UTF8.GetString(
-                    stream.content
-                );
+                slot.Contents = Encoding.UTF8.GetString(stream.content);
             }
             catch (Exception)
             {
@@ -380,7 +415,7 @@ namespace Dergwasm.Environments
         public int __syscall_rmdir(Frame frame, int pathPtr)
         {
             string path = env.GetUTF8StringFromMem(pathPtr);
-            Slot slot;
+            IFileNode slot;
             int err;
             if (path.StartsWith("/"))
             {
@@ -392,7 +427,7 @@ namespace Dergwasm.Environments
             }
             if (err != 0)
                 return err;
-            if (slot.ReferenceID == fsRoot.ReferenceID)
+            if (slot.Equals(fsRoot))
             {
                 if (Debug)
                     DergwasmMachine.Msg($"__syscall_rmdir: cannot remove root directory");
@@ -414,6 +449,7 @@ namespace Dergwasm.Environments
             byte[] bytes = Encoding.UTF8.GetBytes(cwd);
             if (size < bytes.Length + 1)
                 return -Errno.ERANGE;
+            machine.CheckHeapBounds(buf, bytes.Length + 1);
             Array.Copy(bytes, 0, machine.Heap, buf, bytes.Length);
             machine.Heap[buf + bytes.Length] = 0;
             return 0;
@@ -443,23 +479,18 @@ namespace Dergwasm.Environments
             if (Debug)
                 DergwasmMachine.Msg($"__syscall_openat: path={path}");
 
-            Slot slot;
+            IFileNode slot;
             string normalized_path;
             int err = get_slot_for_absolute_path(path, out slot, out normalized_path);
             if (err != 0)
                 return err;
 
-            int unsupported_mask =
-                OpenFlags.O_CREAT | OpenFlags.O_WRONLY | OpenFlags.O_RDWR | OpenFlags.O_DIRECTORY;
+            int unsupported_mask = OpenFlags.O_CREAT | OpenFlags.O_DIRECTORY;
             if ((flags & unsupported_mask) != 0)
             {
                 string unsupported_flags = "";
                 if ((flags & OpenFlags.O_CREAT) != 0)
                     unsupported_flags += "O_CREAT ";
-                if ((flags & OpenFlags.O_WRONLY) != 0)
-                    unsupported_flags += "O_WRONLY ";
-                if ((flags & OpenFlags.O_RDWR) != 0)
-                    unsupported_flags += "O_RDWR ";
                 if ((flags & OpenFlags.O_DIRECTORY) != 0)
                     unsupported_flags += "O_DIRECTORY ";
                 if (Debug)
@@ -469,7 +500,47 @@ namespace Dergwasm.Environments
                 return -Errno.EINVAL;
             }
 
-            int fd = wasi.CreateStream(slot, normalized_path, sync).fd;
+            bool writable = (flags & (OpenFlags.O_WRONLY | OpenFlags.O_RDWR)) != 0;
+            if (writable && !slot_is_regular_file(slot))
+                return -Errno.EISDIR;
+
+            int fd;
+            if (UseBytecodeCache && BytecodeCache.SourcePathFor(normalized_path) != null)
+            {
+                if (writable)
+                    return -Errno.EACCES;
+
+                // Bytecode is only served if it matches its source, and is read-only.
+                byte[] bytecode;
+                if (
+                    !try_get_cached_bytecode(
+                        BytecodeCache.SourcePathFor(normalized_path),
+                        out bytecode
+                    )
+                )
+                {
+                    if (Debug)
+                        DergwasmMachine.Msg($"__syscall_openat: stale bytecode: {path}");
+                    return -Errno.ENOENT;
+                }
+                fd = wasi.CreateStream(normalized_path, bytecode).fd;
+            }
+            else
+            {
+                // Pick up any writes to the file that haven't been written back yet, without
+                // forcing them to be written back.
+                byte[] unwritten = wasi.UnwrittenContent(normalized_path);
+                Stream stream =
+                    unwritten == null
+                        ? wasi.CreateStream(slot, normalized_path, sync)
+                        : wasi.CreateStream(normalized_path, (byte[])unwritten.Clone(), sync);
+                if ((flags & OpenFlags.O_TRUNC) != 0 && writable)
+                {
+                    wasi.Truncate(stream);
+                }
+                stream.append = (flags & OpenFlags.O_APPEND) != 0;
+                fd = stream.fd;
+            }
             if (Debug)
                 DergwasmMachine.Msg($"__syscall_openat: fd={fd}");
             return fd;
@@ -537,11 +608,31 @@ namespace Dergwasm.Environments
             string path = env.GetUTF8StringFromMem(pathPtr);
             if (Debug)
                 DergwasmMachine.Msg($"__syscall_stat64: path={path}");
-            Slot slot;
-            int err = get_slot_for_absolute_path(path, out slot, out _);
+            IFileNode slot;
+            string normalized_path;
+            int err = get_slot_for_absolute_path(path, out slot, out normalized_path);
             if (err != 0)
                 return err;
             bool is_file = slot_is_regular_file(slot);
+
+            byte[] bytecode = null;
+            if (is_file && UseBytecodeCache)
+            {
+                string sourcePath = BytecodeCache.SourcePathFor(normalized_path);
+                if (sourcePath != null && !try_get_cached_bytecode(sourcePath, out bytecode))
+                {
+                    if (Debug)
+                        DergwasmMachine.Msg($"__syscall_stat64: stale bytecode: {path}");
+                    return -Errno.ENOENT;
+                }
+                if (try_get_cached_bytecode(normalized_path, out _))
+                {
+                    if (Debug)
+                        DergwasmMachine.Msg($"__syscall_stat64: using bytecode for {path}");
+                    return -Errno.ENOENT;
+                }
+            }
+
             Stat stat = new Stat();
             stat.st_dev = 0; // Always 0
             stat.st_mode = (is_file ? 0x8000 : 0x4000) | 0755; // rwxr-xr-x
@@ -550,11 +641,23 @@ namespace Dergwasm.Environments
             stat.st_gid = 0; // Not supported
             stat.st_rdev = 0; // Not supported
             stat.st_size = 0;
-            if (is_file)
+            if (bytecode != null)
+            {
+                stat.st_size = (ulong)bytecode.Length;
+            }
+            else if (is_file)
             {
-                string contents = slot.GetComponent<ValueField<string>>().Value;
-                UTF8Encoding utf8 = new UTF8Encoding();
-                stat.st_size = (ulong)utf8.GetByteCount(contents);
+                // Report the size of any changes that haven't been written back yet.
+                byte[] unwritten = wasi.UnwrittenContent(normalized_path);
+                if (unwritten != null)
+                {
+                    stat.st_size = (ulong)unwritten.Length;
+                }
+                else
+                {
+                    UTF8Encoding utf8 = new UTF8Encoding();
+                    stat.st_size = (ulong)utf8.GetByteCount(slot.Contents ?? "");
+                }
             }
             stat.st_blksize = 1024; // I guess?
             stat.st_blocks = 1; // Technicaly correct
@@ -570,6 +673,7 @@ namespace Dergwasm.Environments
             try
             {
                 int size = Marshal.SizeOf(stat);
+                machine.CheckHeapBounds(buf, size);
                 ptr = Marshal.AllocHGlobal(size);
                 Marshal.StructureToPtr(stat, ptr, true);
                 Marshal.Copy(ptr, machine.Heap, buf, size);
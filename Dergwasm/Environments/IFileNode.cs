@@ -0,0 +1,27 @@
+﻿namespace Dergwasm.Environments
+{
+    // A file or directory in the filesystem that FilesystemEnv serves. In Resonite, these are
+    // slots (see SlotFileNode). Files hold their contents as a string.
+    //
+    // Nodes are compared with Equals, since a node may be wrapped more than once.
+    public interface IFileNode
+    {
+        // The node's parent, or null if it has none.
+        IFileNode Parent { get; }
+
+        // Whether this is a regular file, as opposed to a directory.
+        bool IsFile { get; }
+
+        // The contents of a regular file.
+        string Contents { get; set; }
+
+        // Returns the child with the given name, or null if there isn't one.
+        IFileNode FindChild(string name);
+
+        // Adds a child file or directory with the given name, and returns it.
+        IFileNode AddChild(string name, bool isFile);
+
+        // Removes this node and everything under it.
+        void Destroy();
+    }
+}
@@ -16,17 +16,46 @@ namespace Dergwasm.Environments
     // In the API, we don't use anything other than ints, longs, floats, and doubles.
     // Pointers to memory are uints.
     [Mod("resonite")]
-    public class ResoniteEnv : ReflectedModule
+    public class ResoniteEnv : ReflectedModule, IDisposable
     {
         public Machine machine;
         public IWorld world;
         public EmscriptenEnv emscriptenEnv;
 
-        public ResoniteEnv(Machine machine, IWorld world, EmscriptenEnv emscriptenEnv)
+        // Records calls into WASM made by InvokeWasmFunction, if not null. This must be the
+        // recorder that the machine's recorded modules were wrapped with.
+        readonly HostCallRecorder recorder;
+
+        // Change feeds, keyed by the address of their ring buffer in WASM memory.
+        Dictionary<int, ChangeFeed> changeFeeds = new Dictionary<int, ChangeFeed>();
+
+        // Command buffers, keyed by their address in WASM memory. The values are their
+        // capacities, in bytes.
+        Dictionary<int, int> commandBuffers = new Dictionary<int, int>();
+
+        public ResoniteEnv(
+            Machine machine,
+            IWorld world,
+            EmscriptenEnv emscriptenEnv,
+            HostCallRecorder recorder = null
+        )
         {
             this.machine = machine;
             this.world = world;
             this.emscriptenEnv = emscriptenEnv;
+            this.recorder = recorder;
+        }
+
+        // Stops every change feed watching the world. Call this before replacing the env, or
+        // the world's events keep the feeds, and the machine they write to, alive.
+        public void Dispose()
+        {
+            foreach (ChangeFeed changeFeed in changeFeeds.Values)
+            {
+                changeFeed.UnwatchAll();
+            }
+            changeFeeds.Clear();
+            commandBuffers.Clear();
         }
 
         public T FromRefID<T>(RefID slot_id)
@@ -111,7 +140,16 @@ namespace Dergwasm.Environments
             {
                 frame.Push(arg);
             }
-            frame.InvokeFunc(machine, f);
+            recorder?.BeginEntry(funcName, args);
+            try
+            {
+                frame.InvokeFunc(machine, f);
+                machine.ThrowIfLongjmpPending();
+            }
+            finally
+            {
+                recorder?.EndEntry();
+            }
         }
 
         // Calls a WASM function, where the function to call and its arguments are stored in
@@ -151,6 +189,7 @@ namespace Dergwasm.Environments
         //
 
         [ModFn("slot__root_slot")]
+        [ApiAnnotation(ApiAnnotations.ImmutableResult)]
         public ResoniteError slot__root_slot(Frame frame, Output<WasmRefID<Slot>> outSlot)
         {
             try
@@ -275,6 +314,7 @@ namespace Dergwasm.Environments
         }
 
         [ModFn("slot__set_name")]
+        [ApiAnnotation(ApiAnnotations.Batchable)]
         public ResoniteError slot__set_name(
             Frame frame,
             WasmRefID<Slot> slot,
@@ -365,6 +405,49 @@ namespace Dergwasm.Environments
             return default;
         }
 
+        // Gets the ref IDs of up to count of the given slot's children, starting with the child
+        // at index start. Fewer are returned if the slot runs out of children, and none if start
+        // is past the last child. This lets WASM page through a very wide slot without
+        // materializing every child at once. The caller is responsible for freeing the data at
+        // outChildren.
+        [ModFn("slot__get_children_range")]
+        public ResoniteError slot__get_children_range(
+            Frame frame,
+            WasmRefID<Slot> slot,
+            int start,
+            int count,
+            Output<Buff<WasmRefID<Slot>>> outChildren
+        )
+        {
+            try
+            {
+                outChildren.CheckNullArg("outChildren");
+                slot.CheckValidRef("slot", world, out Slot slotInstance);
+                if (start < 0 || count < 0)
+                {
+                    throw new ResoniteException(
+                        ResoniteError.FailedPrecondition,
+                        $"Invalid child range: start {start}, count {count}"
+                    );
+                }
+
+                int end = (int)Math.Min((long)start + count, slotInstance.ChildrenCount);
+                List<WasmRefID<Slot>> children = new List<WasmRefID<Slot>>(
+                    Math.Max(end - start, 0)
+                );
+                for (int i = start; i < end; i++)
+                {
+                    children.Add(slotInstance[i].GetWasmRef());
+                }
+                machine.HeapSet(outChildren, Buff<WasmRefID<Slot>>.Make(machine, frame, children));
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
         // Finds a child slot by name. If no match was found, success is returned, but outChild
         // will be the null reference.
         [ModFn("slot__find_child_by_name")]
@@ -488,7 +571,45 @@ namespace Dergwasm.Environments
             return default;
         }
 
+        // Gets the slot's components, and their type names separated by newlines, in the same
+        // order. This saves a component__get_type_name call per component when listing them.
+        [ModFn("slot__get_components_with_type_names")]
+        public ResoniteError slot__get_components_with_type_names(
+            Frame frame,
+            WasmRefID<Slot> slot,
+            Output<Buff<WasmRefID<Component>>> outComponents,
+            Output<NullTerminatedString> outTypeNames
+        )
+        {
+            try
+            {
+                outComponents.CheckNullArg("outComponents");
+                outTypeNames.CheckNullArg("outTypeNames");
+                slot.CheckValidRef("slot", world, out Slot slotInstance);
+
+                List<Component> components = slotInstance.Components.ToList();
+                Buff<WasmRefID<Component>> list = Buff<WasmRefID<Component>>.Make(
+                    machine,
+                    frame,
+                    components.Select(e => e.GetWasmRef()).ToList()
+                );
+                machine.HeapSet(outComponents, list);
+                machine.HeapSet(
+                    emscriptenEnv,
+                    frame,
+                    outTypeNames,
+                    string.Join("\n", components.Select(c => c.GetType().GetNiceName()))
+                );
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
         [ModFn("component__get_type_name")]
+        [ApiAnnotation(ApiAnnotations.ImmutableResult)]
         public ResoniteError component__get_type_name(
             Frame frame,
             WasmRefID<Component> component,
@@ -531,6 +652,7 @@ namespace Dergwasm.Environments
         }
 
         [ModFn("component__get_member")]
+        [ApiAnnotation(ApiAnnotations.ImmutableResult)]
         public ResoniteError component__get_member(
             Frame frame,
             WasmRefID<Component> component,
@@ -589,6 +711,7 @@ namespace Dergwasm.Environments
         [ModFn("value__set_int", typeof(int))]
         [ModFn("value__set_float", typeof(float))]
         [ModFn("value__set_double", typeof(double))]
+        [ApiAnnotation(ApiAnnotations.Batchable)]
         public ResoniteError value__set<T>(Frame frame, WasmRefID<IValue<T>> refId, T value)
             where T : unmanaged
         {
@@ -604,5 +727,296 @@ namespace Dergwasm.Environments
             }
             return default;
         }
+
+        ChangeFeed GetChangeFeed(int feed)
+        {
+            if (!changeFeeds.TryGetValue(feed, out ChangeFeed changeFeed))
+            {
+                throw new ResoniteException(
+                    ResoniteError.FailedPrecondition,
+                    $"No change feed at 0x{feed:X8}"
+                );
+            }
+            return changeFeed;
+        }
+
+        // Creates a change feed with a ring buffer whose data area is `capacity` bytes, and
+        // returns the address of the ring buffer. The capacity must be a power of two. See
+        // ChangeFeed for its layout.
+        [ModFn("changes__create_feed")]
+        public ResoniteError changes__create_feed(Frame frame, int capacity, Output<int> outFeed)
+        {
+            try
+            {
+                outFeed.CheckNullArg("outFeed");
+                if (capacity < ChangeFeed.RecordHeaderSize)
+                {
+                    throw new ResoniteException(
+                        ResoniteError.FailedPrecondition,
+                        $"Capacity must be at least {ChangeFeed.RecordHeaderSize} bytes"
+                    );
+                }
+                if ((capacity & (capacity - 1)) != 0)
+                {
+                    throw new ResoniteException(
+                        ResoniteError.FailedPrecondition,
+                        $"Capacity must be a power of two, not {capacity}"
+                    );
+                }
+
+                int addr = emscriptenEnv.Malloc(frame, ChangeFeed.HeaderSize + capacity);
+                changeFeeds[addr] = new ChangeFeed(machine, addr, capacity);
+                machine.HeapSet(outFeed, addr);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        // Stops watching everything and frees the feed's ring buffer.
+        [ModFn("changes__destroy_feed")]
+        public ResoniteError changes__destroy_feed(Frame frame, int feed)
+        {
+            try
+            {
+                ChangeFeed changeFeed = GetChangeFeed(feed);
+                changeFeed.UnwatchAll();
+                changeFeeds.Remove(feed);
+                emscriptenEnv.Free(frame, changeFeed.Addr);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        // Starts sending changes to the given slot or field to the feed.
+        [ModFn("changes__watch")]
+        public ResoniteError changes__watch(
+            Frame frame,
+            int feed,
+            WasmRefID<IWorldElement> refId
+        )
+        {
+            try
+            {
+                ChangeFeed changeFeed = GetChangeFeed(feed);
+                refId.CheckValidRef("refId", world, out IWorldElement element);
+
+                changeFeed.Watch(element);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        // Stops sending changes to the given slot or field to the feed.
+        [ModFn("changes__unwatch")]
+        public ResoniteError changes__unwatch(
+            Frame frame,
+            int feed,
+            WasmRefID<IWorldElement> refId
+        )
+        {
+            try
+            {
+                ChangeFeed changeFeed = GetChangeFeed(feed);
+                refId.CheckValidRef("refId", world, out IWorldElement element);
+
+                changeFeed.Unwatch(element);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        int GetCommandBufferCapacity(int buffer)
+        {
+            if (!commandBuffers.TryGetValue(buffer, out int capacity))
+            {
+                throw new ResoniteException(
+                    ResoniteError.FailedPrecondition,
+                    $"No command buffer at 0x{buffer:X8}"
+                );
+            }
+            return capacity;
+        }
+
+        // Allocates a command buffer of `capacity` bytes, and returns its address. See
+        // CommandBuffer for what goes in it.
+        [ModFn("commands__create_buffer")]
+        public ResoniteError commands__create_buffer(
+            Frame frame,
+            int capacity,
+            Output<int> outBuffer
+        )
+        {
+            try
+            {
+                outBuffer.CheckNullArg("outBuffer");
+                if (capacity < CommandBuffer.CommandHeaderSize)
+                {
+                    throw new ResoniteException(
+                        ResoniteError.FailedPrecondition,
+                        $"Capacity must be at least {CommandBuffer.CommandHeaderSize} bytes"
+                    );
+                }
+
+                int addr = emscriptenEnv.Malloc(frame, capacity);
+                commandBuffers[addr] = capacity;
+                machine.HeapSet(outBuffer, addr);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        [ModFn("commands__destroy_buffer")]
+        public ResoniteError commands__destroy_buffer(Frame frame, int buffer)
+        {
+            try
+            {
+                GetCommandBufferCapacity(buffer);
+                commandBuffers.Remove(buffer);
+                emscriptenEnv.Free(frame, buffer);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        // Applies the first `length` bytes of commands in the buffer, and returns the number
+        // of commands applied. If any command is invalid, none are applied. If a valid command
+        // fails to apply, the ones before it stay applied, and the count stops short of it.
+        [ModFn("commands__apply")]
+        public ResoniteError commands__apply(
+            Frame frame,
+            int buffer,
+            int length,
+            Output<int> outApplied
+        )
+        {
+            try
+            {
+                outApplied.CheckNullArg("outApplied");
+                int capacity = GetCommandBufferCapacity(buffer);
+                if (length < 0 || length > capacity)
+                {
+                    throw new ResoniteException(
+                        ResoniteError.FailedPrecondition,
+                        $"Length {length} is outside the buffer's capacity of {capacity} bytes"
+                    );
+                }
+
+                int applied = CommandBuffer.Apply(machine, this, world, buffer, length);
+                machine.HeapSet(outApplied, applied);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        // Returns the number of elements in an array or list field. Any other field has one
+        // element.
+        [ModFn("array__get_length")]
+        public ResoniteError array__get_length(
+            Frame frame,
+            WasmRefID<IWorldElement> refId,
+            Output<int> outLength
+        )
+        {
+            try
+            {
+                outLength.CheckNullArg("outLength");
+                refId.CheckValidRef("refId", world, out IWorldElement element);
+
+                machine.HeapSet(outLength, ArrayTransfer.Length(element));
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        // Copies up to `count` elements of an array, list, or field, starting at `start`, into
+        // the packed buffer at `buffer`, and returns the number copied. See ArrayTransfer.
+        [ModFn("array__read_int", typeof(int))]
+        [ModFn("array__read_float", typeof(float))]
+        [ModFn("array__read_double", typeof(double))]
+        [ModFn("array__read_float2", typeof(float2))]
+        [ModFn("array__read_float3", typeof(float3))]
+        [ModFn("array__read_float4", typeof(float4))]
+        [ModFn("array__read_floatQ", typeof(floatQ))]
+        [ModFn("array__read_color", typeof(color))]
+        public ResoniteError array__read<T>(
+            Frame frame,
+            WasmRefID<IWorldElement> refId,
+            int start,
+            int buffer,
+            int count,
+            Output<int> outCount
+        )
+            where T : unmanaged
+        {
+            try
+            {
+                outCount.CheckNullArg("outCount");
+                refId.CheckValidRef("refId", world, out IWorldElement element);
+
+                int copied = ArrayTransfer.Read<T>(machine, element, start, buffer, count);
+                machine.HeapSet(outCount, copied);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
+
+        // Copies `count` elements from the packed buffer at `buffer` into an array, list, or
+        // field, starting at `start`, extending the array if necessary. See ArrayTransfer.
+        [ModFn("array__write_int", typeof(int))]
+        [ModFn("array__write_float", typeof(float))]
+        [ModFn("array__write_double", typeof(double))]
+        [ModFn("array__write_float2", typeof(float2))]
+        [ModFn("array__write_float3", typeof(float3))]
+        [ModFn("array__write_float4", typeof(float4))]
+        [ModFn("array__write_floatQ", typeof(floatQ))]
+        [ModFn("array__write_color", typeof(color))]
+        public ResoniteError array__write<T>(
+            Frame frame,
+            WasmRefID<IWorldElement> refId,
+            int start,
+            int buffer,
+            int count
+        )
+            where T : unmanaged
+        {
+            try
+            {
+                refId.CheckValidRef("refId", world, out IWorldElement element);
+
+                ArrayTransfer.Write<T>(machine, element, start, buffer, count);
+            }
+            catch (Exception e)
+            {
+                return e.ToError();
+            }
+            return default;
+        }
     }
 }
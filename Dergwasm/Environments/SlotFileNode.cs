@@ -0,0 +1,47 @@
+﻿using FrooxEngine;
+
+namespace Dergwasm.Environments
+{
+    // A file or directory backed by a slot. Directories are plain slots, and files are slots
+    // with a ValueField<string> component holding the contents.
+    public class SlotFileNode : IFileNode
+    {
+        public readonly Slot Slot;
+
+        public SlotFileNode(Slot slot)
+        {
+            Slot = slot;
+        }
+
+        // Returns a node for the slot, or null if the slot is null.
+        public static SlotFileNode For(Slot slot) => slot == null ? null : new SlotFileNode(slot);
+
+        public IFileNode Parent => For(Slot.Parent);
+
+        public bool IsFile => Slot.GetComponent<ValueField<string>>() != null;
+
+        public string Contents
+        {
+            get => Slot.GetComponent<ValueField<string>>().Value.Value;
+            set => Slot.GetComponent<ValueField<string>>().Value.Value = value;
+        }
+
+        public IFileNode FindChild(string name) => For(Slot.FindChild(name));
+
+        public IFileNode AddChild(string name, bool isFile)
+        {
+            Slot child = Slot.AddSlot(name);
+            if (isFile)
+            {
+                child.AttachComponent<ValueField<string>>();
+            }
+            return new SlotFileNode(child);
+        }
+
+        public void Destroy() => Slot.Destroy();
+
+        public override bool Equals(object obj) => obj is SlotFileNode other && other.Slot == Slot;
+
+        public override int GetHashCode() => Slot.GetHashCode();
+    }
+}
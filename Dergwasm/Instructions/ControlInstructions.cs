@@ -145,8 +145,25 @@ namespace Dergwasm.Instructions
         {
             int tableidx = instruction.Operands[1].s32;
             int typeidx = instruction.Operands[0].s32;
-            Table table = machine.GetTable(frame.GetTableAddrForIndex(tableidx));
-            FuncType funcType = frame.GetFuncTypeForIndex(typeidx);
+
+            // Most call sites only ever call one function, so we remember the last funcref that
+            // passed the signature check here, in operands[3]. Funcs never change their
+            // signature, so a hit means we can skip the check entirely. Note that the table can
+            // be modified, so we key on the funcref rather than the table index. We also remember
+            // the table's address, in operands[2].value_hi.
+            //
+            // Instructions are shared by every instance of a module, possibly in different
+            // machines, so the cache is only valid for the instance in operands[2].s32.
+            //
+            // Instructions that weren't produced by the Flattener won't have the cache slots.
+            Value[] operands = instruction.Operands;
+            bool hasCache = operands.Length > 3;
+            int instanceId = frame.Module.Id;
+            bool cached = hasCache && operands[2].s32 == instanceId;
+            int tableAddr = cached
+                ? (int)operands[2].value_hi
+                : frame.GetTableAddrForIndex(tableidx);
+            Table table = machine.GetTable(tableAddr);
             uint i = frame.Pop().u32;
             if (i >= table.Elements.LongLength)
             {
@@ -159,15 +176,32 @@ namespace Dergwasm.Instructions
             {
                 throw new Trap("call_indirect: null reference");
             }
+
+            if (
+                cached
+                && funcAddr.u64 == operands[3].u64
+                && funcAddr.value_hi == operands[3].value_hi
+            )
+            {
+                frame.InvokeFunc(machine, funcAddr.RefAddr);
+                return;
+            }
+
             Func func = machine.GetFunc(funcAddr.RefAddr);
-            if (func.Signature != funcType)
+            if (machine.GetSignatureId(func) != frame.GetFuncTypeIdForIndex(machine, typeidx))
             {
+                FuncType funcType = frame.GetFuncTypeForIndex(typeidx);
                 throw new Trap(
                     $"call_indirect: type mismatch calling function address {funcAddr.RefAddr} "
                         + $"({func.ModuleName}.{func.Name}). "
                         + $"Expected signature {funcType} but was {func.Signature}."
                 );
             }
+            if (hasCache)
+            {
+                operands[2] = new Value { s32 = instanceId, value_hi = (ulong)tableAddr };
+                operands[3] = funcAddr;
+            }
             // This fully executes the call. This way, we can throw an exception
             // and have the machine's frame stack automatically unwind.
             frame.InvokeFunc(machine, funcAddr.RefAddr);
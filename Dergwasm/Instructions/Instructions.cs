@@ -849,6 +849,23 @@ namespace Dergwasm.Instructions
                         // Note that if there was no ELSE, then both targets will be equal.
                         break;
 
+                    case InstructionType.CALL_INDIRECT:
+                        // The typeidx and tableidx, plus two slots for CallIndirect's inline cache,
+                        // which start out zeroed. See CallIndirect for what they hold.
+                        flattened.Add(
+                            new Instruction(
+                                InstructionType.CALL_INDIRECT,
+                                new Value[]
+                                {
+                                    instruction.Operands[0].value,
+                                    instruction.Operands[1].value,
+                                    new Value(),
+                                    new Value()
+                                }
+                            )
+                        );
+                        break;
+
                     default:
                         flattened.Add(
                             new Instruction(
@@ -9,7 +9,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    u32 = machine.HeapGet<uint>(frame.Pop().s32, instruction.Operands[1].s32)
+                    u32 = frame.GetMemory(machine).Load<uint>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -17,7 +17,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    s32 = machine.HeapGet<sbyte>(frame.Pop().s32, instruction.Operands[1].s32)
+                    s32 = frame.GetMemory(machine).Load<sbyte>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -25,7 +25,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    u32 = machine.HeapGet<byte>(frame.Pop().s32, instruction.Operands[1].s32)
+                    u32 = frame.GetMemory(machine).Load<byte>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -33,7 +33,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    s32 = machine.HeapGet<short>(frame.Pop().s32, instruction.Operands[1].s32)
+                    s32 = frame.GetMemory(machine).Load<short>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -41,7 +41,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    u32 = machine.HeapGet<ushort>(frame.Pop().s32, instruction.Operands[1].s32)
+                    u32 = frame.GetMemory(machine).Load<ushort>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -49,7 +49,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    u64 = machine.HeapGet<ulong>(frame.Pop().s32, instruction.Operands[1].s32)
+                    u64 = frame.GetMemory(machine).Load<ulong>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -57,7 +57,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    s64 = machine.HeapGet<sbyte>(frame.Pop().s32, instruction.Operands[1].s32)
+                    s64 = frame.GetMemory(machine).Load<sbyte>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -65,7 +65,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    u64 = machine.HeapGet<byte>(frame.Pop().s32, instruction.Operands[1].s32)
+                    u64 = frame.GetMemory(machine).Load<byte>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -73,7 +73,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    s64 = machine.HeapGet<short>(frame.Pop().s32, instruction.Operands[1].s32)
+                    s64 = frame.GetMemory(machine).Load<short>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -81,7 +81,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    u64 = machine.HeapGet<ushort>(frame.Pop().s32, instruction.Operands[1].s32)
+                    u64 = frame.GetMemory(machine).Load<ushort>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -89,7 +89,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    s64 = machine.HeapGet<int>(frame.Pop().s32, instruction.Operands[1].s32)
+                    s64 = frame.GetMemory(machine).Load<int>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -97,7 +97,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    u64 = machine.HeapGet<uint>(frame.Pop().s32, instruction.Operands[1].s32)
+                    u64 = frame.GetMemory(machine).Load<uint>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -105,7 +105,7 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    f32 = machine.HeapGet<float>(frame.Pop().s32, instruction.Operands[1].s32)
+                    f32 = frame.GetMemory(machine).Load<float>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
@@ -113,66 +113,66 @@ namespace Dergwasm.Instructions
             frame.Push(
                 new Value
                 {
-                    f64 = machine.HeapGet<double>(frame.Pop().s32, instruction.Operands[1].s32)
+                    f64 = frame.GetMemory(machine).Load<double>(frame.Pop().s32, instruction.Operands[1].s32)
                 }
             );
 
         public static void I32Store(Instruction instruction, Machine machine, Frame frame)
         {
             uint val = frame.Pop().u32;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void I32Store8(Instruction instruction, Machine machine, Frame frame)
         {
             byte val = (byte)frame.Pop().u32;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void I32Store16(Instruction instruction, Machine machine, Frame frame)
         {
             ushort val = (ushort)frame.Pop().u32;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void I64Store(Instruction instruction, Machine machine, Frame frame)
         {
             ulong val = frame.Pop().u64;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void I64Store8(Instruction instruction, Machine machine, Frame frame)
         {
             byte val = (byte)frame.Pop().u64;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void I64Store16(Instruction instruction, Machine machine, Frame frame)
         {
             ushort val = (ushort)frame.Pop().u64;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void I64Store32(Instruction instruction, Machine machine, Frame frame)
         {
             uint val = (uint)frame.Pop().u64;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void F32Store(Instruction instruction, Machine machine, Frame frame)
         {
             float val = frame.Pop().f32;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void F64Store(Instruction instruction, Machine machine, Frame frame)
         {
             double val = frame.Pop().f64;
-            machine.HeapSet(frame.Pop().s32, instruction.Operands[1].s32, val);
+            frame.GetMemory(machine).Store(frame.Pop().s32, instruction.Operands[1].s32, val);
         }
 
         public static void MemorySize(Instruction instruction, Machine machine, Frame frame) =>
-            frame.Push(new Value { u32 = (uint)machine.Heap.Length >> 16 });
+            frame.Push(new Value { u32 = frame.GetMemory(machine).Pages });
 
         public static void MemoryGrow(Instruction instruction, Machine machine, Frame frame)
         {
@@ -182,23 +182,7 @@ namespace Dergwasm.Instructions
                 throw new Trap("memory.grow: Non-zero memory segment accessed");
             }
             uint delta = frame.Pop().u32;
-            Memory mem = machine.GetMemoryFromIndex(0);
-            uint oldSize = (uint)mem.Data.Length >> 16;
-            uint newSize = oldSize + delta;
-            if (mem.Limits.Maximum.HasValue && newSize > mem.Limits.Maximum)
-            {
-                frame.Push(new Value { s32 = -1 });
-                return;
-            }
-            // .NET has a limitation on value sizes to about 0x80000000 bytes.
-            if (newSize > 0x7FFF)
-            {
-                frame.Push(new Value { s32 = -1 });
-                return;
-            }
-            Array.Resize(ref mem.Data, (int)newSize << 16);
-            mem.Limits.Minimum = newSize;
-            frame.Push(new Value { u32 = oldSize });
+            frame.Push(new Value { s32 = machine.GetMemoryFromIndex(0).Grow(delta) });
         }
 
         public static void MemoryFill(Instruction instruction, Machine machine, Frame frame)
@@ -212,16 +196,13 @@ namespace Dergwasm.Instructions
             byte val = (byte)frame.Pop().u32;
             uint d = frame.Pop().u32;
             Memory mem = machine.GetMemoryFromIndex(0);
-            try
-            {
-                machine.Heap.AsSpan((int)d, (int)n).Fill(val);
-            }
-            catch (Exception)
+            if (!mem.InBounds(d, n))
             {
                 throw new Trap(
                     $"memory.fill: Access out of bounds: offset 0x{d:X8} length 0x{n:X8} bytes"
                 );
             }
+            mem.Data.AsSpan((int)d, (int)n).Fill(val);
         }
 
         public static void MemoryCopy(Instruction instruction, Machine machine, Frame frame)
@@ -235,16 +216,13 @@ namespace Dergwasm.Instructions
             uint s = frame.Pop().u32;
             uint d = frame.Pop().u32;
             Memory mem = machine.GetMemoryFromIndex(0);
-            try
-            {
-                Array.Copy(mem.Data, s, mem.Data, d, n);
-            }
-            catch (Exception)
+            if (!mem.InBounds(s, n) || !mem.InBounds(d, n))
             {
                 throw new Trap(
                     $"memory.copy: Access out of bounds: source offset 0x{s:X8}, destination offset 0x{d:X8}, length 0x{n:X8} bytes"
                 );
             }
+            Array.Copy(mem.Data, s, mem.Data, d, n);
         }
 
         public static void MemoryInit(Instruction instruction, Machine machine, Frame frame)
@@ -265,6 +243,10 @@ namespace Dergwasm.Instructions
             uint d_offset = frame.Pop().u32;
             try
             {
+                if (!machine.GetMemoryFromIndex(0).InBounds(d_offset, n))
+                {
+                    throw new IndexOutOfRangeException();
+                }
                 Array.Copy(data, s_offset, machine.Heap, d_offset, n);
             }
             catch (Exception)
@@ -19,6 +19,9 @@ namespace Dergwasm.Modules
         public List<Parameter> Parameters { get; } = new List<Parameter>();
         public List<Parameter> Returns { get; } = new List<Parameter>();
 
+        // Properties of the function that API generators can rely on. See ApiAnnotations.
+        public List<string> Annotations { get; } = new List<string>();
+
         [JsonIgnore]
         public IEnumerable<ValueType> ParameterValueTypes => Parameters.SelectMany(p => p.Types);
 
@@ -136,6 +136,7 @@ namespace Dergwasm.Modules
         ReflectHostFunc(string name, string module, MethodInfo method, ParameterExpression context)
         {
             ApiFunc apiData = new ApiFunc { Module = module, Name = name, };
+            AddAnnotations(apiData, method);
 
             var funcCtor = GenerateHostFuncCtor(context, method, apiData);
 
@@ -166,6 +167,7 @@ namespace Dergwasm.Modules
         )
         {
             var apiData = new ApiFunc { Module = module, Name = name, };
+            AddAnnotations(apiData, function.Method);
 
             // This is a parameter for the outer lambda, that is stored in the closure for the func.
             var context = Expression.Constant(function.Target);
@@ -177,6 +179,15 @@ namespace Dergwasm.Modules
             return (apiData, func);
         }
 
+        private static void AddAnnotations(ApiFunc apiData, MethodInfo method)
+        {
+            var annotationAttr = method.GetCustomAttribute<ApiAnnotationAttribute>();
+            if (annotationAttr != null)
+            {
+                apiData.Annotations.AddRange(annotationAttr.Annotations);
+            }
+        }
+
         private static Expression GenerateHostFuncCtor(
             Expression context,
             MethodInfo method,
@@ -37,6 +37,31 @@ namespace Dergwasm.Modules
         }
     }
 
+    // The values of ApiAnnotationAttribute.
+    public static class ApiAnnotations
+    {
+        // The function always returns the same result for the same arguments, for example a
+        // component's type name. Wrappers may cache the result.
+        public const string ImmutableResult = "immutable_result";
+
+        // The function is a mutation that can also be submitted as a command in a command
+        // buffer (see CommandBuffer), so wrappers may queue it instead of calling it.
+        public const string Batchable = "batchable";
+    }
+
+    // Annotates a module function in its API data, for API generators. The annotations don't
+    // change how the function is called.
+    [AttributeUsage(AttributeTargets.Method)]
+    public class ApiAnnotationAttribute : Attribute
+    {
+        public string[] Annotations { get; }
+
+        public ApiAnnotationAttribute(params string[] annotations)
+        {
+            Annotations = annotations;
+        }
+    }
+
     public class ReflectedModule : IHostModule
     {
         public List<HostFunc> Functions { get; }
@@ -0,0 +1,198 @@
+using System;
+using Dergwasm.Runtime;
+using FrooxEngine;
+
+namespace Dergwasm.Resonite
+{
+    // Copies the contents of array and list fields between the world and packed buffers in
+    // WASM memory, so that a WASM program can move thousands of values in one host call
+    // instead of one call per element.
+    //
+    // A buffer of T is its elements laid out back to back, each in T's in-memory layout. For
+    // the vector types, that's their components in order, so a buffer of float3 is x0, y0,
+    // z0, x1, y1, z1, and so on, and can be read directly as an array of floats.
+    //
+    // The element transferred can be:
+    // * a SyncArray<T>,
+    // * a list of Sync<T>, such as a SyncFieldList<T>, or
+    // * any other IField<T>, which acts as an array of length 1. This lets a single vector
+    //   value be read and written as its packed components.
+    public static class ArrayTransfer
+    {
+        // Returns the number of elements in an array, list, or field.
+        public static int Length(IWorldElement element)
+        {
+            switch (element)
+            {
+                case ISyncArray array:
+                    return array.Count;
+                case ISyncList list:
+                    return list.Count;
+                case IField _:
+                    return 1;
+                default:
+                    throw new ResoniteException(
+                        ResoniteError.InvalidRefId,
+                        $"{element.GetType()} is not an array, list, or field"
+                    );
+            }
+        }
+
+        // Copies up to `count` elements, starting at index `start`, into the buffer at `addr`.
+        // Returns the number of elements copied, which is less than `count` if the end of
+        // the array is reached.
+        public static unsafe int Read<T>(
+            Machine machine,
+            IWorldElement element,
+            int start,
+            int addr,
+            int count
+        )
+            where T : unmanaged
+        {
+            int length = TypedLength<T>(element);
+            if (start < 0 || count < 0 || start > length)
+            {
+                throw new ResoniteException(
+                    ResoniteError.FailedPrecondition,
+                    $"{count} elements at {start} is an invalid range for length {length}"
+                );
+            }
+            int n = Math.Min(count, length - start);
+            CheckBuffer(machine, addr, n, sizeof(T));
+            if (n == 0)
+            {
+                return 0;
+            }
+
+            fixed (byte* heap = &machine.Heap[addr])
+            {
+                T* buffer = (T*)heap;
+                switch (element)
+                {
+                    case SyncArray<T> array:
+                        for (int i = 0; i < n; i++)
+                        {
+                            buffer[i] = array[start + i];
+                        }
+                        break;
+
+                    case SyncElementList<Sync<T>> list:
+                        for (int i = 0; i < n; i++)
+                        {
+                            buffer[i] = list[start + i].Value;
+                        }
+                        break;
+
+                    case IField<T> field:
+                        buffer[0] = field.Value;
+                        break;
+                }
+            }
+            return n;
+        }
+
+        // Copies `count` elements from the buffer at `addr` into the array, starting at
+        // index `start`. Elements past the end of the array are appended to it. A field can
+        // only be written at index 0.
+        public static unsafe void Write<T>(
+            Machine machine,
+            IWorldElement element,
+            int start,
+            int addr,
+            int count
+        )
+            where T : unmanaged
+        {
+            int length = TypedLength<T>(element);
+            if (
+                start < 0
+                || count < 0
+                || start > length
+                || (element is IField<T> && (long)start + count > 1)
+            )
+            {
+                throw new ResoniteException(
+                    ResoniteError.FailedPrecondition,
+                    $"{count} elements at {start} is an invalid range for length {length}"
+                );
+            }
+            CheckBuffer(machine, addr, count, sizeof(T));
+            if (count == 0)
+            {
+                return;
+            }
+
+            // Copy the elements out of WASM memory before changing anything, since changes can
+            // run arbitrary event handlers.
+            T[] values = new T[count];
+            fixed (byte* heap = &machine.Heap[addr])
+            {
+                T* buffer = (T*)heap;
+                for (int i = 0; i < count; i++)
+                {
+                    values[i] = buffer[i];
+                }
+            }
+
+            switch (element)
+            {
+                case SyncArray<T> array:
+                    for (int i = 0; i < count; i++)
+                    {
+                        if (start + i < array.Count)
+                        {
+                            array[start + i] = values[i];
+                        }
+                        else
+                        {
+                            array.Append(values[i]);
+                        }
+                    }
+                    break;
+
+                case SyncElementList<Sync<T>> list:
+                    for (int i = 0; i < count; i++)
+                    {
+                        Sync<T> item = start + i < list.Count ? list[start + i] : list.Add();
+                        item.Value = values[i];
+                    }
+                    break;
+
+                case IField<T> field:
+                    field.Value = values[0];
+                    break;
+            }
+        }
+
+        // Returns the length of an array, list, or field of T.
+        static int TypedLength<T>(IWorldElement element)
+        {
+            switch (element)
+            {
+                case SyncArray<T> array:
+                    return array.Count;
+                case SyncElementList<Sync<T>> list:
+                    return list.Count;
+                case IField<T> _:
+                    return 1;
+                default:
+                    throw new ResoniteException(
+                        ResoniteError.InvalidRefId,
+                        $"{element.GetType()} is not an array, list, or field of {typeof(T)}"
+                    );
+            }
+        }
+
+        static void CheckBuffer(Machine machine, int addr, int count, int size)
+        {
+            if (addr < 0 || (long)addr + (long)count * size > machine.HeapSize)
+            {
+                throw new ResoniteException(
+                    ResoniteError.FailedPrecondition,
+                    $"Buffer of {count} elements at 0x{addr:X8} is outside of memory"
+                );
+            }
+        }
+    }
+}
@@ -0,0 +1,201 @@
+﻿using System;
+using System.Collections.Generic;
+using Dergwasm.Runtime;
+using Dergwasm.Wasm;
+using Elements.Core;
+using FrooxEngine;
+
+namespace Dergwasm.Resonite
+{
+    // The kinds of change records a ChangeFeed can produce.
+    public enum ChangeKind : int
+    {
+        // A watched field's value changed. The payload is the new value.
+        FieldChanged = 1,
+
+        // A child was added to a watched slot. The payload is the child slot.
+        ChildAdded = 2,
+
+        // A child was removed from a watched slot. The payload is the child slot.
+        ChildRemoved = 3,
+
+        // A watched slot's name changed. The payload is the new name.
+        NameChanged = 4,
+    }
+
+    // A feed of changes to watched slots and fields, delivered into a ring buffer in WASM
+    // memory. Instead of polling everything it's interested in, a WASM program watches the
+    // elements it cares about and drains the ring buffer whenever it likes. The host only does
+    // work when something actually changes.
+    //
+    // The ring buffer is laid out as a 16-byte header followed by Capacity bytes of data.
+    // Capacity is a power of two:
+    //
+    //   +0  uint capacity  The size of the data area, in bytes.
+    //   +4  uint head      Total bytes ever written. Only the host writes this.
+    //   +8  uint tail      Total bytes ever consumed. Only WASM writes this.
+    //   +12 uint dropped   Number of records dropped because the buffer was full.
+    //
+    // head and tail are free-running counters, so the number of unread bytes is head - tail
+    // (mod 2^32), and the next record starts at data + (tail & (capacity - 1)). Because the
+    // capacity divides 2^32, positions stay consistent when the counters wrap past 2^32.
+    // Records wrap around the end of the data area, byte by byte. Each record is:
+    //
+    //   +0  int   payload length, in bytes
+    //   +4  int   kind (see ChangeKind)
+    //   +8  ulong refid of the watched element
+    //   +16       payload: a SimpleSerialization value, serialized inline
+    //
+    // A record is either written completely or not at all. If there isn't room, the record is
+    // dropped and the dropped count is incremented, so the reader knows to resynchronize.
+    public class ChangeFeed
+    {
+        public const int HeaderSize = 16;
+        public const int RecordHeaderSize = 16;
+
+        // The serialized form of a value that SimpleSerialization can't serialize.
+        static readonly byte[] UnknownPayload = BitConverter.GetBytes(
+            SimpleSerialization.SimpleType.Unknown
+        );
+
+        readonly Machine machine;
+
+        // The address of the ring buffer header in WASM memory.
+        public readonly int Addr;
+
+        // The size of the data area, in bytes. Always a power of two.
+        public readonly int Capacity;
+
+        readonly HashSet<IWorldElement> watched = new HashSet<IWorldElement>();
+
+        // The handlers subscribed to each watched slot's name field, which need to know which
+        // slot they're for.
+        readonly Dictionary<Slot, Action<IChangeable>> nameHandlers =
+            new Dictionary<Slot, Action<IChangeable>>();
+
+        public ChangeFeed(Machine machine, int addr, int capacity)
+        {
+            this.machine = machine;
+            Addr = addr;
+            Capacity = capacity;
+            machine.HeapSet(new Ptr<uint>(Addr), (uint)capacity);
+            machine.HeapSet(new Ptr<uint>(Addr + 4), 0u);
+            machine.HeapSet(new Ptr<uint>(Addr + 8), 0u);
+            machine.HeapSet(new Ptr<uint>(Addr + 12), 0u);
+        }
+
+        public IEnumerable<IWorldElement> Watched => watched;
+
+        // Starts watching a slot or field. Watching something that's already watched does
+        // nothing.
+        public void Watch(IWorldElement element)
+        {
+            if (watched.Contains(element))
+            {
+                return;
+            }
+            switch (element)
+            {
+                case Slot slot:
+                    slot.ChildAdded += OnChildAdded;
+                    slot.ChildRemoved += OnChildRemoved;
+                    Action<IChangeable> onNameChanged = _ =>
+                        Append(slot.ReferenceID, ChangeKind.NameChanged, slot.Name);
+                    nameHandlers[slot] = onNameChanged;
+                    slot.NameField.Changed += onNameChanged;
+                    break;
+
+                case IField field:
+                    field.Changed += OnFieldChanged;
+                    break;
+
+                default:
+                    throw new ResoniteException(
+                        ResoniteError.FailedPrecondition,
+                        $"Can only watch slots and fields, not {element.GetType()}"
+                    );
+            }
+            watched.Add(element);
+        }
+
+        // Stops watching a slot or field. Unwatching something that isn't watched does
+        // nothing.
+        public void Unwatch(IWorldElement element)
+        {
+            if (!watched.Remove(element))
+            {
+                return;
+            }
+            switch (element)
+            {
+                case Slot slot:
+                    slot.ChildAdded -= OnChildAdded;
+                    slot.ChildRemoved -= OnChildRemoved;
+                    slot.NameField.Changed -= nameHandlers[slot];
+                    nameHandlers.Remove(slot);
+                    break;
+
+                case IField field:
+                    field.Changed -= OnFieldChanged;
+                    break;
+            }
+        }
+
+        public void UnwatchAll()
+        {
+            foreach (IWorldElement element in new List<IWorldElement>(watched))
+            {
+                Unwatch(element);
+            }
+        }
+
+        void OnChildAdded(Slot slot, Slot child) =>
+            Append(slot.ReferenceID, ChangeKind.ChildAdded, child);
+
+        void OnChildRemoved(Slot slot, Slot child) =>
+            Append(slot.ReferenceID, ChangeKind.ChildRemoved, child);
+
+        void OnFieldChanged(IChangeable changeable)
+        {
+            IField field = (IField)changeable;
+            Append(field.ReferenceID, ChangeKind.FieldChanged, field.BoxedValue);
+        }
+
+        // Appends a record to the ring buffer, or drops it if there isn't room.
+        public void Append(RefID refID, ChangeKind kind, object value)
+        {
+            byte[] payload = SimpleSerialization.SerializeInline(value) ?? UnknownPayload;
+
+            uint head = machine.HeapGet(new Ptr<uint>(Addr + 4));
+            uint tail = machine.HeapGet(new Ptr<uint>(Addr + 8));
+            uint free = (uint)Capacity - (head - tail);
+            if ((ulong)RecordHeaderSize + (ulong)payload.Length > free)
+            {
+                Ptr<uint> droppedPtr = new Ptr<uint>(Addr + 12);
+                machine.HeapSet(droppedPtr, machine.HeapGet(droppedPtr) + 1);
+                return;
+            }
+
+            byte[] header = new byte[RecordHeaderSize];
+            BitConverter.GetBytes(payload.Length).CopyTo(header, 0);
+            BitConverter.GetBytes((int)kind).CopyTo(header, 4);
+            BitConverter.GetBytes((ulong)refID).CopyTo(header, 8);
+
+            head = Write(head, header);
+            head = Write(head, payload);
+            machine.HeapSet(new Ptr<uint>(Addr + 4), head);
+        }
+
+        // Writes the bytes into the data area at the given head, wrapping around the end if
+        // necessary. Returns the new head.
+        uint Write(uint head, byte[] bytes)
+        {
+            int data = Addr + HeaderSize;
+            int pos = (int)(head & (uint)(Capacity - 1));
+            int firstPart = Math.Min(bytes.Length, Capacity - pos);
+            Array.Copy(bytes, 0, machine.Heap, data + pos, firstPart);
+            Array.Copy(bytes, firstPart, machine.Heap, data, bytes.Length - firstPart);
+            return head + (uint)bytes.Length;
+        }
+    }
+}
@@ -0,0 +1,219 @@
+﻿using System;
+using System.Collections.Generic;
+using System.IO;
+using Dergwasm.Environments;
+using Dergwasm.Runtime;
+using Elements.Core;
+using FrooxEngine;
+
+namespace Dergwasm.Resonite
+{
+    // The operations a command buffer can contain.
+    public enum CommandOp : int
+    {
+        // Sets a field's value. The target is the field, and the payload is the new value.
+        SetValue = 1,
+
+        // Sets a slot's name. The target is the slot, and the payload is the new name (a
+        // string, or null).
+        SetName = 2,
+    }
+
+    // Applies a batch of world mutations that WASM encoded into its own memory, in a single
+    // host call. Instead of calling into the host once per mutation, a WASM program appends
+    // commands to a buffer and submits the whole buffer at once.
+    //
+    // The buffer is a sequence of commands, packed one after the other. Each command is:
+    //
+    //   +0  int   op (see CommandOp)
+    //   +4  ulong refid of the target element
+    //   +12       payload: a SimpleSerialization value, serialized inline
+    //
+    // Every command is decoded and validated before any of them is applied, so a buffer with
+    // a bad command changes nothing. Applying a valid command can still throw, for example if
+    // the engine rejects the change. Then the commands before it stay applied, and Apply stops
+    // there and returns how many were applied, which the caller compares to what it sent.
+    public static class CommandBuffer
+    {
+        public const int CommandHeaderSize = 12;
+
+        // Applies the commands in the given region of WASM memory, returning the number of
+        // commands applied. This is less than the number of commands if one failed to apply.
+        public static int Apply(
+            Machine machine,
+            ResoniteEnv resoniteEnv,
+            IWorld world,
+            int addr,
+            int length
+        )
+        {
+            return ApplyDecoded(Decode(machine, resoniteEnv, world, addr, length));
+        }
+
+        // Runs the decoded commands in order, stopping at the first that throws. Returns the
+        // number that ran successfully.
+        public static int ApplyDecoded(List<Action> commands)
+        {
+            for (int i = 0; i < commands.Count; i++)
+            {
+                try
+                {
+                    commands[i]();
+                }
+                catch (Exception e)
+                {
+                    DergwasmMachine.Msg($"[Dergwasm] Command {i} failed to apply: {e}");
+                    return i;
+                }
+            }
+            return commands.Count;
+        }
+
+        // Decodes and validates the commands in the given region of WASM memory, returning an
+        // action for each that applies it.
+        public static List<Action> Decode(
+            Machine machine,
+            ResoniteEnv resoniteEnv,
+            IWorld world,
+            int addr,
+            int length
+        )
+        {
+            if (addr < 0 || length < 0 || (long)addr + length > machine.HeapSize)
+            {
+                throw new ResoniteException(
+                    ResoniteError.FailedPrecondition,
+                    "Command buffer is outside of memory"
+                );
+            }
+
+            List<Action> commands = new List<Action>();
+            using (MemoryStream stream = new MemoryStream(machine.Heap, addr, length, false))
+            {
+                BinaryReader reader = new BinaryReader(stream);
+                while (stream.Position < length)
+                {
+                    int index = commands.Count;
+                    if (length - stream.Position < CommandHeaderSize)
+                    {
+                        throw new ResoniteException(
+                            ResoniteError.FailedPrecondition,
+                            $"Command {index} is truncated"
+                        );
+                    }
+                    CommandOp op = (CommandOp)reader.ReadInt32();
+                    RefID refID = (RefID)reader.ReadUInt64();
+
+                    object value;
+                    try
+                    {
+                        value = SimpleSerialization.DeserializeInline(reader, resoniteEnv);
+                    }
+                    catch (Exception e)
+                    {
+                        throw new ResoniteException(
+                            ResoniteError.FailedPrecondition,
+                            $"Command {index} has a malformed value: {e.Message}"
+                        );
+                    }
+
+                    IWorldElement target = world.GetObjectOrNull(refID);
+                    if (target == null)
+                    {
+                        throw new ResoniteException(
+                            ResoniteError.InvalidRefId,
+                            $"Command {index} targets a nonexistent element {refID}"
+                        );
+                    }
+                    commands.Add(Prepare(index, op, target, value));
+                }
+            }
+            return commands;
+        }
+
+        // Checks that the command can be applied, and returns an action that applies it.
+        static Action Prepare(int index, CommandOp op, IWorldElement target, object value)
+        {
+            switch (op)
+            {
+                case CommandOp.SetValue:
+                    if (!(target is IField field))
+                    {
+                        throw new ResoniteException(
+                            ResoniteError.InvalidRefId,
+                            $"Command {index} sets the value of {target.GetType()}, not a field"
+                        );
+                    }
+                    object converted = ConvertValue(index, value, field.ValueType);
+                    return () => field.BoxedValue = converted;
+
+                case CommandOp.SetName:
+                    if (!(target is Slot slot))
+                    {
+                        throw new ResoniteException(
+                            ResoniteError.InvalidRefId,
+                            $"Command {index} sets the name of {target.GetType()}, not a slot"
+                        );
+                    }
+                    if (value != null && !(value is string))
+                    {
+                        throw new ResoniteException(
+                            ResoniteError.FailedPrecondition,
+                            $"Command {index} sets a slot name to a {value.GetType()}"
+                        );
+                    }
+                    string name = (string)value;
+                    return () => slot.Name = name;
+
+                default:
+                    throw new ResoniteException(
+                        ResoniteError.FailedPrecondition,
+                        $"Command {index} has unknown op {(int)op}"
+                    );
+            }
+        }
+
+        // Converts a deserialized value to the type of the field it's going into. Numbers are
+        // converted between primitive types, so WASM can send an int to a float field, or a
+        // double to a float field, as long as the value fits.
+        static object ConvertValue(int index, object value, Type fieldType)
+        {
+            if (value == null)
+            {
+                if (!fieldType.IsValueType || Nullable.GetUnderlyingType(fieldType) != null)
+                {
+                    return null;
+                }
+            }
+            else if (fieldType.IsInstanceOfType(value))
+            {
+                return value;
+            }
+            else if (fieldType.IsPrimitive && value is IConvertible)
+            {
+                try
+                {
+                    object converted = Convert.ChangeType(value, fieldType);
+                    // Narrowing a double to a float doesn't throw when it's out of range, it
+                    // just gives infinity.
+                    if (!(converted is float f && float.IsInfinity(f) && IsFinite(value)))
+                    {
+                        return converted;
+                    }
+                }
+                catch (Exception e) when (e is InvalidCastException || e is OverflowException)
+                {
+                    // Falls through to the error below.
+                }
+            }
+            string valueType = value == null ? "null" : value.GetType().ToString();
+            throw new ResoniteException(
+                ResoniteError.FailedPrecondition,
+                $"Command {index} sets a {fieldType} field to {valueType}"
+            );
+        }
+
+        static bool IsFinite(object value) =>
+            !(value is double d && (double.IsInfinity(d) || double.IsNaN(d)));
+    }
+}
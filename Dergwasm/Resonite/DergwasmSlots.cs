@@ -1,5 +1,6 @@
 ﻿using System;
 using System.Threading.Tasks;
+using Dergwasm.Environments;
 using Elements.Core; // For UniLog
 using FrooxEngine;
 
@@ -12,6 +13,7 @@ namespace Dergwasm.Resonite
 
         public Slot ConsoleSlot { get; }
         public Slot FilesystemSlot { get; }
+        public IFileNode FilesystemRoot => SlotFileNode.For(FilesystemSlot);
 
         public bool Ready => DergwasmRoot != null && WasmBinarySlot != null;
 
@@ -1,4 +1,5 @@
 ﻿using System.Threading.Tasks;
+using Dergwasm.Environments;
 using FrooxEngine;
 
 namespace Dergwasm.Resonite
@@ -9,7 +10,9 @@ namespace Dergwasm.Resonite
         Slot WasmBinarySlot { get; }
 
         Slot ConsoleSlot { get; }
-        Slot FilesystemSlot { get; }
+
+        // The root of the filesystem, or null if there is none.
+        IFileNode FilesystemRoot { get; }
 
         bool Ready { get; }
 
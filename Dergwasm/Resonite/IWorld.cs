@@ -37,5 +37,8 @@ namespace Dergwasm.Resonite
 
         // Moves the current async context to the main thread.
         void ToWorld();
+
+        // Runs the action at the next opportunity during a world update.
+        void RunSynchronously(Action action);
     }
 }
@@ -39,5 +39,7 @@ namespace Dergwasm.Resonite
         public async void ToBackground() => await new ToBackground();
 
         public async void ToWorld() => await new ToWorld();
+
+        public void RunSynchronously(Action action) => world.RunSynchronously(action);
     }
 }
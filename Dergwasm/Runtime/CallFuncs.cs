@@ -19,11 +19,14 @@ namespace Dergwasm.Runtime
     //
     // For such functions, you must specify the return type and argument types
     // in the generic type parameters.
+    //
+    // If the called function longjmps out past the call, a LongjmpException is thrown.
     public static class CallFuncExtensions
     {
         public static void CallFunc(this Machine machine, Func f, Frame frame)
         {
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
         }
 
         public static void CallFunc<T1>(this Machine machine, Func f, Frame frame, T1 arg1)
@@ -31,6 +34,7 @@ namespace Dergwasm.Runtime
         {
             frame.Push(arg1);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
         }
 
         public static void CallFunc<T1, T2>(
@@ -46,6 +50,7 @@ namespace Dergwasm.Runtime
             frame.Push(arg1);
             frame.Push(arg2);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
         }
 
         public static void CallFunc<T1, T2, T3>(
@@ -64,6 +69,7 @@ namespace Dergwasm.Runtime
             frame.Push(arg2);
             frame.Push(arg3);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
         }
 
         public static void CallFunc<T1, T2, T3, T4>(
@@ -85,6 +91,7 @@ namespace Dergwasm.Runtime
             frame.Push(arg3);
             frame.Push(arg4);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
         }
 
         public static void CallFunc<T1, T2, T3, T4, T5>(
@@ -109,12 +116,14 @@ namespace Dergwasm.Runtime
             frame.Push(arg4);
             frame.Push(arg5);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
         }
 
         public static R CallFunc<R>(this Machine machine, Func f, Frame frame)
             where R : unmanaged
         {
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
             return frame.Pop<R>();
         }
 
@@ -124,6 +133,7 @@ namespace Dergwasm.Runtime
         {
             frame.Push(arg1);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
             return frame.Pop<R>();
         }
 
@@ -141,6 +151,7 @@ namespace Dergwasm.Runtime
             frame.Push(arg1);
             frame.Push(arg2);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
             return frame.Pop<R>();
         }
 
@@ -161,6 +172,7 @@ namespace Dergwasm.Runtime
             frame.Push(arg2);
             frame.Push(arg3);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
             return frame.Pop<R>();
         }
 
@@ -184,6 +196,7 @@ namespace Dergwasm.Runtime
             frame.Push(arg3);
             frame.Push(arg4);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
             return frame.Pop<R>();
         }
 
@@ -210,6 +223,7 @@ namespace Dergwasm.Runtime
             frame.Push(arg4);
             frame.Push(arg5);
             frame.InvokeFunc(machine, f);
+            machine.ThrowIfLongjmpPending();
             return frame.Pop<R>();
         }
 
@@ -0,0 +1,145 @@
+﻿namespace Dergwasm.Runtime
+{
+    // A handle to a function exported by the machine's main module.
+    //
+    // The function is looked up by name the first time the handle is used, and then cached,
+    // so calling through the handle doesn't cost a lookup each time. The lookup can't happen
+    // when the handle is created, because host environments create their handles before the
+    // main module is instantiated.
+    //
+    // The Invoke methods call the function with i32 args, and InvokeInt also pops an i32
+    // result. They push the args straight onto the frame rather than going through the
+    // generic CallFunc extensions, which convert every arg with Value.From. For example:
+    //
+    //   ExportedFunc malloc = new ExportedFunc(machine, "malloc");
+    //   int ptr = malloc.InvokeInt(frame, size);
+    //
+    // For other signatures, use the CallFunc extensions with Func.
+    public class ExportedFunc
+    {
+        readonly Machine machine;
+        public readonly string Name;
+        Func func;
+
+        public ExportedFunc(Machine machine, string name)
+        {
+            this.machine = machine;
+            Name = name;
+        }
+
+        // The function. Throws a Trap if the main module doesn't export it.
+        public Func Func
+        {
+            get
+            {
+                if (func == null)
+                {
+                    func = machine.GetRequiredFunc(machine.MainModuleName, Name);
+                }
+                return func;
+            }
+        }
+
+        void Call(Frame frame)
+        {
+            frame.InvokeFunc(machine, Func);
+            machine.ThrowIfLongjmpPending();
+        }
+
+        public void Invoke(Frame frame)
+        {
+            Call(frame);
+        }
+
+        public void Invoke(Frame frame, int a0)
+        {
+            frame.Push(new Value { s32 = a0 });
+            Call(frame);
+        }
+
+        public void Invoke(Frame frame, int a0, int a1)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            Call(frame);
+        }
+
+        public void Invoke(Frame frame, int a0, int a1, int a2)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            frame.Push(new Value { s32 = a2 });
+            Call(frame);
+        }
+
+        public void Invoke(Frame frame, int a0, int a1, int a2, int a3)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            frame.Push(new Value { s32 = a2 });
+            frame.Push(new Value { s32 = a3 });
+            Call(frame);
+        }
+
+        public void Invoke(Frame frame, int a0, int a1, int a2, int a3, int a4)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            frame.Push(new Value { s32 = a2 });
+            frame.Push(new Value { s32 = a3 });
+            frame.Push(new Value { s32 = a4 });
+            Call(frame);
+        }
+
+        public int InvokeInt(Frame frame)
+        {
+            Call(frame);
+            return frame.Pop().s32;
+        }
+
+        public int InvokeInt(Frame frame, int a0)
+        {
+            frame.Push(new Value { s32 = a0 });
+            Call(frame);
+            return frame.Pop().s32;
+        }
+
+        public int InvokeInt(Frame frame, int a0, int a1)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            Call(frame);
+            return frame.Pop().s32;
+        }
+
+        public int InvokeInt(Frame frame, int a0, int a1, int a2)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            frame.Push(new Value { s32 = a2 });
+            Call(frame);
+            return frame.Pop().s32;
+        }
+
+        public int InvokeInt(Frame frame, int a0, int a1, int a2, int a3)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            frame.Push(new Value { s32 = a2 });
+            frame.Push(new Value { s32 = a3 });
+            Call(frame);
+            return frame.Pop().s32;
+        }
+
+        public int InvokeInt(Frame frame, int a0, int a1, int a2, int a3, int a4)
+        {
+            frame.Push(new Value { s32 = a0 });
+            frame.Push(new Value { s32 = a1 });
+            frame.Push(new Value { s32 = a2 });
+            frame.Push(new Value { s32 = a3 });
+            frame.Push(new Value { s32 = a4 });
+            Call(frame);
+            return frame.Pop().s32;
+        }
+    }
+}
@@ -38,6 +38,11 @@ namespace Dergwasm.Runtime
 
         public Frame prev_frame;
 
+        // The memory that loads and stores go to, cached so that they don't have to look it up
+        // through the machine every time. The Memory object never changes, even when the memory
+        // grows.
+        Memory memory;
+
         public Frame(ModuleFunc func, ModuleInstance module, Frame prev_frame)
         {
             if (func != null)
@@ -55,17 +60,30 @@ namespace Dergwasm.Runtime
         // Steps the machine by n steps. Note that call instructions count as one step.
         public void Step(Machine machine, int n = 1)
         {
-            for (int i = 0; i < n; i++)
+            int i = 0;
+            try
+            {
+                for (; i < n; i++)
+                {
+                    StepOnce(machine);
+                }
+            }
+            finally
+            {
+                machine.InstructionCount += i;
+            }
+        }
+
+        void StepOnce(Machine machine)
+        {
+            Instruction insn = Code[PC];
+            InstructionEvaluation.Execute(insn, machine, this);
+            if (stepBudget > 0)
             {
-                Instruction insn = Code[PC];
-                InstructionEvaluation.Execute(insn, machine, this);
-                if (stepBudget > 0)
+                stepBudget--;
+                if (stepBudget == 0)
                 {
-                    stepBudget--;
-                    if (stepBudget == 0)
-                    {
-                        throw new Trap("Step budget exceeded");
-                    }
+                    throw new Trap("Step budget exceeded");
                 }
             }
         }
@@ -74,11 +92,25 @@ namespace Dergwasm.Runtime
         // when there are no labels on the label stack. Thus, before entering this function,
         // the frame should have a label on the stack. The first label is typically a label
         // pointing to the end of the function, and containing the function's arity.
+        //
+        // Also stops if a longjmp is pending, abandoning the frame.
+        //
+        // Executed instructions are counted locally and added to the machine's count once the
+        // frame is done, keeping the shared counter out of the per-instruction loop.
         public void Execute(Machine machine)
         {
-            while (HasLabel())
+            long executed = 0;
+            try
+            {
+                while (HasLabel() && !machine.LongjmpPending)
+                {
+                    StepOnce(machine);
+                    executed++;
+                }
+            }
+            finally
             {
-                Step(machine);
+                machine.InstructionCount += executed;
             }
         }
 
@@ -114,6 +146,9 @@ namespace Dergwasm.Runtime
 
         public bool HasLabel() => label_stack.Count > 0;
 
+        public Memory GetMemory(Machine machine) =>
+            memory ?? (memory = machine.GetMemoryFromIndex(0));
+
         public int GetGlobalAddrForIndex(int idx) => Module.GlobalsMap[idx];
 
         public int GetTableAddrForIndex(int idx) => Module.TablesMap[idx];
@@ -126,6 +161,9 @@ namespace Dergwasm.Runtime
 
         public FuncType GetFuncTypeForIndex(int idx) => Module.FuncTypes[idx];
 
+        public int GetFuncTypeIdForIndex(Machine machine, int idx) =>
+            Module.GetFuncTypeId(machine, idx);
+
         public void InvokeFuncFromIndex(Machine machine, int idx) =>
             InvokeFunc(machine, GetFuncAddrForIndex(idx));
 
@@ -140,6 +178,7 @@ namespace Dergwasm.Runtime
             if (machine.Debug)
                 Console.WriteLine($"Invoking host func {f.ModuleName}.{f.Name}");
 
+            machine.HostCallCount++;
             f.Proxy.Invoke(machine, this);
         }
 
@@ -174,7 +213,9 @@ namespace Dergwasm.Runtime
 
             next_frame.Label = new Label(arity, f.Code.Count);
             next_frame.Execute(machine);
-            next_frame.EndFrame();
+            // A frame abandoned by a longjmp has no return values.
+            if (!machine.LongjmpPending)
+                next_frame.EndFrame();
         }
 
         // Executes a function call. This sets up a new frame, pops the args off the current frame and
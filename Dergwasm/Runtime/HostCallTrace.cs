@@ -0,0 +1,584 @@
+﻿using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Runtime.ExceptionServices;
+using Dergwasm.Modules;
+
+namespace Dergwasm.Runtime
+{
+    // Host call traces record everything that passes between the host and a WASM program, so
+    // that the program's execution can be reproduced later without the host. For example, a
+    // MicroPython script that ran in a Resonite world can be re-run headlessly against the same
+    // firmware, to measure the effect of interpreter changes.
+    //
+    // A trace is a sequence of entries and host calls. An entry is a call from the host into
+    // WASM while no WASM is running, such as running a script. A host call is a call from WASM
+    // to a recorded host function. Each holds the function, its arguments, and every change
+    // made to memory and globals that WASM didn't make itself: for an entry, the changes the
+    // host made since the previous entry returned, and for a host call, the changes the call
+    // made. Host calls also hold their results.
+    //
+    // Replaying a trace calls each entry again with the same arguments, after applying its
+    // changes. The recorded host functions are replaced by ones that check their arguments
+    // against the trace, then apply the recorded changes and push the recorded results
+    // instead of running. As long as the WASM program is deterministic given its host calls,
+    // it executes exactly as it did when it was recorded.
+    //
+    // The format is little-endian binary, where LEB means an unsigned LEB128 integer:
+    //
+    //   uint magic ("DWHT"), uint version
+    //   Records, each starting with a tag byte:
+    //     FuncTag:  LEB id, string module, string name. Defines a function id for later calls.
+    //     CallTag:  LEB function id, byte flags, values args, values results, changes. Then if
+    //               the Exited flag is set, LEB exit code, or if the Threw flag is set, string
+    //               message.
+    //     EntryTag: string function name, values args, changes.
+    //     EndTag:   The end of the trace.
+    //
+    //   values:  LEB count, then for each value, LEB low 64 bits and LEB high 64 bits.
+    //   changes: LEB memory size, LEB count of memory writes, then for each, LEB address,
+    //            LEB length, and the bytes. Then LEB count of global writes, then for each,
+    //            LEB global index and the value as above.
+    public static class HostCallTrace
+    {
+        public const uint Magic = 0x54485744;
+        public const uint Version = 1;
+
+        internal const byte EndTag = 0;
+        internal const byte FuncTag = 1;
+        internal const byte CallTag = 2;
+        internal const byte EntryTag = 3;
+
+        // Call flags.
+        internal const byte Threw = 1;
+        internal const byte Exited = 2;
+        internal const byte LongjmpPending = 4;
+
+        internal static void WriteLEB(BinaryWriter writer, ulong value)
+        {
+            do
+            {
+                byte b = (byte)(value & 0x7F);
+                value >>= 7;
+                if (value != 0)
+                    b |= 0x80;
+                writer.Write(b);
+            } while (value != 0);
+        }
+
+        internal static ulong ReadLEB(BinaryReader reader)
+        {
+            ulong value = 0;
+            int shift = 0;
+            byte b;
+            do
+            {
+                b = reader.ReadByte();
+                value |= (ulong)(b & 0x7F) << shift;
+                shift += 7;
+            } while ((b & 0x80) != 0);
+            return value;
+        }
+
+        internal static void WriteValue(BinaryWriter writer, Value value)
+        {
+            WriteLEB(writer, value.u64);
+            WriteLEB(writer, value.value_hi);
+        }
+
+        internal static Value ReadValue(BinaryReader reader) =>
+            new Value { u64 = ReadLEB(reader), value_hi = ReadLEB(reader) };
+
+        internal static void WriteValues(BinaryWriter writer, Value[] values)
+        {
+            WriteLEB(writer, (ulong)values.Length);
+            foreach (Value value in values)
+                WriteValue(writer, value);
+        }
+
+        internal static Value[] ReadValues(BinaryReader reader)
+        {
+            Value[] values = new Value[ReadLEB(reader)];
+            for (int i = 0; i < values.Length; i++)
+                values[i] = ReadValue(reader);
+            return values;
+        }
+
+        // Returns the top n values on the frame's stack, without popping them. The value
+        // deepest in the stack comes first.
+        internal static Value[] PeekValues(Frame frame, int n)
+        {
+            Value[] values = frame.value_stack.Take(n).ToArray();
+            Array.Reverse(values);
+            return values;
+        }
+
+        // Applies changes to the machine's memory and globals read from the trace.
+        internal static void ApplyChanges(Machine machine, BinaryReader reader)
+        {
+            int size = (int)ReadLEB(reader);
+            int writes = (int)ReadLEB(reader);
+            if (size > 0 || writes > 0)
+            {
+                Memory memory = machine.GetMemoryFromIndex(0);
+                if (size > memory.Size && memory.Grow((uint)(size - memory.Size) >> 16) < 0)
+                {
+                    throw new Trap($"Replay couldn't grow memory to {size} bytes");
+                }
+                for (int i = 0; i < writes; i++)
+                {
+                    int addr = (int)ReadLEB(reader);
+                    int len = (int)ReadLEB(reader);
+                    byte[] data = reader.ReadBytes(len);
+                    Buffer.BlockCopy(data, 0, memory.Data, addr, len);
+                }
+            }
+
+            int globals = (int)ReadLEB(reader);
+            for (int i = 0; i < globals; i++)
+            {
+                int idx = (int)ReadLEB(reader);
+                machine.Globals[idx] = ReadValue(reader);
+            }
+        }
+    }
+
+    // A copy of a machine's memory and globals, to find out what changed since.
+    class MachineSnapshot
+    {
+        // Changes are found by first comparing pages, and then blocks within pages that
+        // changed. Each changed block is written in full.
+        const int PageSize = 4096;
+        const int BlockSize = 64;
+
+        byte[] memory = new byte[0];
+        Value[] globals = new Value[0];
+
+        public void Take(Machine machine)
+        {
+            int size = machine.memories.Count > 0 ? machine.memories[0].Size : 0;
+            if (memory.Length < size)
+            {
+                memory = new byte[size];
+            }
+            if (size > 0)
+            {
+                Buffer.BlockCopy(machine.memories[0].Data, 0, memory, 0, size);
+            }
+            globals = machine.Globals.ToArray();
+        }
+
+        // Writes the changes to the machine since the snapshot was taken.
+        public void WriteChanges(Machine machine, BinaryWriter writer)
+        {
+            int size = machine.memories.Count > 0 ? machine.memories[0].Size : 0;
+            byte[] data = size > 0 ? machine.memories[0].Data : memory;
+            if (memory.Length < size)
+            {
+                // Memory only grows, and new memory starts out zeroed.
+                Array.Resize(ref memory, size);
+            }
+
+            List<(int, int)> ranges = new List<(int, int)>();
+            int start = -1;
+            for (int page = 0; page < size; page += PageSize)
+            {
+                int pageEnd = Math.Min(page + PageSize, size);
+                if (Same(data, page, pageEnd))
+                {
+                    if (start >= 0)
+                    {
+                        ranges.Add((start, page - start));
+                        start = -1;
+                    }
+                    continue;
+                }
+                for (int block = page; block < pageEnd; block += BlockSize)
+                {
+                    bool same = Same(data, block, Math.Min(block + BlockSize, pageEnd));
+                    if (same && start >= 0)
+                    {
+                        ranges.Add((start, block - start));
+                        start = -1;
+                    }
+                    else if (!same && start < 0)
+                    {
+                        start = block;
+                    }
+                }
+            }
+            if (start >= 0)
+            {
+                ranges.Add((start, size - start));
+            }
+
+            HostCallTrace.WriteLEB(writer, (ulong)size);
+            HostCallTrace.WriteLEB(writer, (ulong)ranges.Count);
+            foreach ((int addr, int len) in ranges)
+            {
+                HostCallTrace.WriteLEB(writer, (ulong)addr);
+                HostCallTrace.WriteLEB(writer, (ulong)len);
+                writer.Write(data, addr, len);
+            }
+
+            List<int> changedGlobals = new List<int>();
+            for (int i = 0; i < machine.Globals.Count; i++)
+            {
+                Value value = machine.Globals[i];
+                if (
+                    i >= globals.Length
+                    || value.u64 != globals[i].u64
+                    || value.value_hi != globals[i].value_hi
+                )
+                {
+                    changedGlobals.Add(i);
+                }
+            }
+            HostCallTrace.WriteLEB(writer, (ulong)changedGlobals.Count);
+            foreach (int i in changedGlobals)
+            {
+                HostCallTrace.WriteLEB(writer, (ulong)i);
+                HostCallTrace.WriteValue(writer, machine.Globals[i]);
+            }
+        }
+
+        bool Same(byte[] data, int start, int end) =>
+            data.AsSpan(start, end - start).SequenceEqual(memory.AsSpan(start, end - start));
+    }
+
+    // A host module whose functions have been replaced by recording or replaying ones.
+    class TracedModule : IHostModule
+    {
+        public List<HostFunc> Functions { get; }
+        public List<ApiFunc> ApiData { get; }
+
+        public TracedModule(IHostModule module, Func<HostFunc, HostFunc> wrap)
+        {
+            Functions = module.Functions.Select(wrap).ToList();
+            ApiData = module.ApiData;
+        }
+    }
+
+    // Records a machine's entries and host calls to a trace (see HostCallTrace).
+    //
+    // Recording compares all of memory before and after every recorded host call, so it's
+    // slow. It's meant for capturing a workload once, not for leaving on.
+    public class HostCallRecorder : IDisposable
+    {
+        readonly Machine machine;
+        readonly BinaryWriter writer;
+        readonly Dictionary<HostFunc, int> funcIds = new Dictionary<HostFunc, int>();
+
+        // The machine as it was when the last entry returned.
+        readonly MachineSnapshot entryBase = new MachineSnapshot();
+
+        // The machine as it was when the current host call was made.
+        readonly MachineSnapshot callBase = new MachineSnapshot();
+        bool started = false;
+        int entryDepth = 0;
+        int callDepth = 0;
+
+        public HostCallRecorder(Machine machine, System.IO.Stream output)
+        {
+            this.machine = machine;
+            writer = new BinaryWriter(output);
+            writer.Write(HostCallTrace.Magic);
+            writer.Write(HostCallTrace.Version);
+        }
+
+        // Returns a module that behaves like the given one, but records calls to its
+        // functions. Register it with the machine in place of the given module. If shouldRecord
+        // is given, only the functions whose names it accepts are recorded.
+        //
+        // Record every host function that isn't deterministic, or that depends on state that
+        // a recorded function changes (such as file descriptors). Host functions that call
+        // back into WASM, like invoke_*, must not be recorded, because replaying would skip
+        // the WASM code they call.
+        public IHostModule Wrap(IHostModule module, Predicate<string> shouldRecord = null) =>
+            new TracedModule(
+                module,
+                f =>
+                    shouldRecord == null || shouldRecord(f.Name)
+                        ? new HostFunc(
+                            f.ModuleName,
+                            f.Name,
+                            f.Signature,
+                            (m, frame) => RecordCall(f, frame)
+                        )
+                        : f
+            );
+
+        // Records a call from the host into WASM. Call this just before invoking the function,
+        // with the same arguments, and call EndEntry when the function returns or throws.
+        //
+        // The first entry must happen before the host has changed the machine since it was
+        // instantiated, since replaying starts from a freshly instantiated machine. WASM calls
+        // the host makes outside of entries, such as to malloc, aren't recorded. Their effects
+        // are recorded as changes at the start of the next entry.
+        public void BeginEntry(string funcName, IEnumerable<Value> args)
+        {
+            if (entryDepth++ > 0)
+            {
+                return;
+            }
+            if (!started)
+            {
+                entryBase.Take(machine);
+                started = true;
+            }
+            writer.Write(HostCallTrace.EntryTag);
+            writer.Write(funcName);
+            HostCallTrace.WriteValues(writer, args.ToArray());
+            entryBase.WriteChanges(machine, writer);
+        }
+
+        public void EndEntry()
+        {
+            if (--entryDepth > 0)
+            {
+                return;
+            }
+            entryBase.Take(machine);
+            writer.Flush();
+        }
+
+        void RecordCall(HostFunc func, Frame frame)
+        {
+            // Calls outside of entries are covered by the next entry's changes, and calls made
+            // while another host call is running are covered by that call's changes.
+            if (entryDepth == 0 || callDepth > 0)
+            {
+                func.Proxy(machine, frame);
+                return;
+            }
+
+            Value[] args = HostCallTrace.PeekValues(frame, func.Signature.args.Length);
+            callBase.Take(machine);
+            Exception exception = null;
+            callDepth++;
+            try
+            {
+                func.Proxy(machine, frame);
+            }
+            catch (Exception e)
+            {
+                exception = e;
+            }
+            finally
+            {
+                callDepth--;
+            }
+
+            if (!funcIds.TryGetValue(func, out int id))
+            {
+                id = funcIds.Count;
+                funcIds.Add(func, id);
+                writer.Write(HostCallTrace.FuncTag);
+                HostCallTrace.WriteLEB(writer, (ulong)id);
+                writer.Write(func.ModuleName);
+                writer.Write(func.Name);
+            }
+
+            byte flags = 0;
+            if (exception is ExitTrap)
+                flags |= HostCallTrace.Exited;
+            else if (exception != null)
+                flags |= HostCallTrace.Threw;
+            if (machine.LongjmpPending)
+                flags |= HostCallTrace.LongjmpPending;
+
+            writer.Write(HostCallTrace.CallTag);
+            HostCallTrace.WriteLEB(writer, (ulong)id);
+            writer.Write(flags);
+            HostCallTrace.WriteValues(writer, args);
+            HostCallTrace.WriteValues(
+                writer,
+                exception == null
+                    ? HostCallTrace.PeekValues(frame, func.Signature.returns.Length)
+                    : new Value[0]
+            );
+            callBase.WriteChanges(machine, writer);
+            if (exception is ExitTrap exit)
+                HostCallTrace.WriteLEB(writer, (uint)exit.ExitCode);
+            else if (exception != null)
+                writer.Write(exception.Message);
+
+            if (exception != null)
+                ExceptionDispatchInfo.Capture(exception).Throw();
+        }
+
+        // Ends the trace, and closes the output stream.
+        public void Dispose()
+        {
+            writer.Write(HostCallTrace.EndTag);
+            writer.Dispose();
+        }
+    }
+
+    // Replays a trace recorded by HostCallRecorder (see HostCallTrace).
+    public class HostCallReplayer
+    {
+        readonly Machine machine;
+        readonly BinaryReader reader;
+        readonly Dictionary<int, (string, string)> funcNames =
+            new Dictionary<int, (string, string)>();
+
+        // The number of entries and host calls replayed so far.
+        public int Entries { get; private set; }
+        public int Calls { get; private set; }
+
+        public HostCallReplayer(Machine machine, System.IO.Stream input)
+        {
+            this.machine = machine;
+            reader = new BinaryReader(input);
+            if (reader.ReadUInt32() != HostCallTrace.Magic)
+            {
+                throw new Trap("Not a host call trace");
+            }
+            uint version = reader.ReadUInt32();
+            if (version != HostCallTrace.Version)
+            {
+                throw new Trap($"Unsupported host call trace version {version}");
+            }
+        }
+
+        // Returns a module whose functions replay their calls from the trace instead of
+        // running. Register it with the machine in place of the given module. Wrap the same
+        // modules, with the same shouldReplay, as the recording did.
+        public IHostModule Wrap(IHostModule module, Predicate<string> shouldReplay = null) =>
+            new TracedModule(
+                module,
+                f =>
+                    shouldReplay == null || shouldReplay(f.Name)
+                        ? new HostFunc(
+                            f.ModuleName,
+                            f.Name,
+                            f.Signature,
+                            (m, frame) => ReplayCall(f, frame)
+                        )
+                        : f
+            );
+
+        // Reads the next record's tag, taking in any function definitions along the way. A
+        // trace that was cut off ends as if it had an EndTag.
+        byte ReadTag()
+        {
+            while (true)
+            {
+                byte tag;
+                try
+                {
+                    tag = reader.ReadByte();
+                }
+                catch (EndOfStreamException)
+                {
+                    return HostCallTrace.EndTag;
+                }
+                if (tag != HostCallTrace.FuncTag)
+                {
+                    return tag;
+                }
+                int id = (int)HostCallTrace.ReadLEB(reader);
+                string module = reader.ReadString();
+                string name = reader.ReadString();
+                funcNames[id] = (module, name);
+            }
+        }
+
+        Trap Diverged(string message) =>
+            new Trap($"Replay diverged from the trace after {Calls} host calls: {message}");
+
+        void ReplayCall(HostFunc func, Frame frame)
+        {
+            if (ReadTag() != HostCallTrace.CallTag)
+            {
+                throw Diverged($"{func.ModuleName}.{func.Name} was called, but wasn't recorded");
+            }
+            (string module, string name) = funcNames[(int)HostCallTrace.ReadLEB(reader)];
+            if (module != func.ModuleName || name != func.Name)
+            {
+                throw Diverged($"expected {module}.{name}, got {func.ModuleName}.{func.Name}");
+            }
+            byte flags = reader.ReadByte();
+            Value[] args = HostCallTrace.ReadValues(reader);
+            Value[] results = HostCallTrace.ReadValues(reader);
+
+            Value[] actualArgs = new Value[func.Signature.args.Length];
+            for (int i = actualArgs.Length - 1; i >= 0; i--)
+            {
+                actualArgs[i] = frame.Pop();
+            }
+            for (int i = 0; i < actualArgs.Length; i++)
+            {
+                if (
+                    actualArgs[i].u64 != args[i].u64
+                    || actualArgs[i].value_hi != args[i].value_hi
+                )
+                {
+                    throw Diverged(
+                        $"{name} arg {i} was 0x{actualArgs[i].u64:X}, recorded 0x{args[i].u64:X}"
+                    );
+                }
+            }
+
+            HostCallTrace.ApplyChanges(machine, reader);
+            Calls++;
+            if ((flags & HostCallTrace.Exited) != 0)
+            {
+                throw new ExitTrap((int)HostCallTrace.ReadLEB(reader));
+            }
+            if ((flags & HostCallTrace.Threw) != 0)
+            {
+                throw new Trap(reader.ReadString());
+            }
+            foreach (Value result in results)
+            {
+                frame.Push(result);
+            }
+            if ((flags & HostCallTrace.LongjmpPending) != 0)
+            {
+                machine.LongjmpPending = true;
+            }
+        }
+
+        // Replays the next entry, returning false if the trace has ended.
+        public bool ReplayEntry()
+        {
+            byte tag = ReadTag();
+            if (tag == HostCallTrace.EndTag)
+            {
+                return false;
+            }
+            if (tag != HostCallTrace.EntryTag)
+            {
+                throw Diverged("a host call was recorded that didn't happen");
+            }
+            string funcName = reader.ReadString();
+            Value[] args = HostCallTrace.ReadValues(reader);
+            HostCallTrace.ApplyChanges(machine, reader);
+
+            Func f = machine.GetRequiredFunc(machine.MainModuleName, funcName);
+            Frame frame = new Frame(f as ModuleFunc, machine.mainModuleInstance, null);
+            frame.Label = new Label(0, 0);
+            foreach (Value arg in args)
+            {
+                frame.Push(arg);
+            }
+            try
+            {
+                frame.InvokeFunc(machine, f);
+                machine.ThrowIfLongjmpPending();
+            }
+            catch (ExitTrap) { }
+            Entries++;
+            return true;
+        }
+
+        // Replays all the remaining entries in the trace.
+        public void ReplayAll()
+        {
+            while (ReplayEntry()) { }
+        }
+    }
+}
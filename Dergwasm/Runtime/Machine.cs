@@ -1,5 +1,6 @@
 ﻿using System;
 using System.Collections.Generic;
+using System.IO;
 using Dergwasm.Modules;
 using Dergwasm.Wasm;
 using FrooxEngine;
@@ -20,8 +21,16 @@ namespace Dergwasm.Runtime
         // globals, funcs, and so on).
         public ModuleInstance mainModuleInstance;
         public Dictionary<string, HostFunc> hostFuncs = new Dictionary<string, HostFunc>();
-        public List<FuncType> funcTypes = new List<FuncType>(); // is this even used?
+        // Every distinct FuncType seen by the machine, indexed by its canonical ID. Two FuncTypes
+        // are structurally equal if and only if their IDs are equal.
+        public List<FuncType> funcTypes = new List<FuncType>();
+        Dictionary<FuncType, int> funcTypeIds = new Dictionary<FuncType, int>();
         public List<Func> funcs = new List<Func>();
+
+        // The address of each func added with AddFunc, by module name and func name, so that
+        // looking up a func by name doesn't have to scan every func.
+        Dictionary<(string, string), int> funcAddrsByName =
+            new Dictionary<(string, string), int>();
         public List<Table> tables = new List<Table>();
         public List<ElementSegment> elementSegments = new List<ElementSegment>();
         public List<Value> Globals = new List<Value>();
@@ -30,6 +39,35 @@ namespace Dergwasm.Runtime
 
         public IWasmAllocator Allocator;
 
+        // How many pages beyond their initial size to reserve for memories that the machine
+        // allocates (see Memory). None by default, so a memory only takes up its current size.
+        public uint ReservedMemoryPages;
+
+        // Set when WASM code calls longjmp (see EmscriptenEnv._emscripten_throw_longjmp). While
+        // this is set, every frame's run loop stops and the frame is abandoned without returning
+        // any values, unwinding back to the invoke_* host function that called setjmp's caller,
+        // which clears it. This avoids unwinding with a .NET exception, which is expensive.
+        public bool LongjmpPending;
+
+        // The number of instructions executed and host functions called since the machine was
+        // created. These only ever increase; measure a stretch of execution by taking the
+        // difference. Instructions are added when each frame finishes or Frame.Step returns, so
+        // the count lags while a frame is running.
+        public long InstructionCount;
+        public long HostCallCount;
+
+        // Throws a LongjmpException if a longjmp is unwinding past a host function that called
+        // into WASM. Host functions other than the invoke_* functions can't resume a longjmp,
+        // so it continues as an exception from here.
+        public void ThrowIfLongjmpPending()
+        {
+            if (LongjmpPending)
+            {
+                LongjmpPending = false;
+                throw new LongjmpException();
+            }
+        }
+
 #pragma warning disable CS8500 // This takes the address of, gets the size of, or declares a pointer to a managed type
         public unsafe Ptr<T> HeapAlloc<T>(Frame frame)
             where T : struct
@@ -74,15 +112,8 @@ namespace Dergwasm.Runtime
         // in the sense of "address within the memory starting at the offset").
         //
         // Throws a Trap if the offset + address + size of value is out of bounds.
-        public unsafe T HeapGet<T>(int offset, int addr)
-            where T : struct
-        {
-            Span<byte> mem = HeapSpan(offset, addr, sizeof(T));
-            fixed (byte* ptr = mem)
-            {
-                return *(T*)ptr;
-            }
-        }
+        public T HeapGet<T>(int offset, int addr)
+            where T : struct => memories[0].Load<T>(offset, addr);
 
         // Sets a value on the heap at the given address.
         //
@@ -104,15 +135,8 @@ namespace Dergwasm.Runtime
         // in the sense of "address within the memory starting at the offset").
         //
         // Throws a Trap if the offset + address + size of value is out of bounds.
-        public unsafe void HeapSet<T>(int offset, int addr, T value)
-            where T : struct
-        {
-            Span<byte> mem = HeapSpan(offset, addr, sizeof(T));
-            fixed (byte* ptr = mem)
-            {
-                *(T*)ptr = value;
-            }
-        }
+        public void HeapSet<T>(int offset, int addr, T value)
+            where T : struct => memories[0].Store(offset, addr, value);
 
         public void HeapSet(Ptr<ulong> ptr, IWorldElement element) =>
             HeapSet(ptr, (ulong)element.ReferenceID);
@@ -168,9 +192,29 @@ namespace Dergwasm.Runtime
             return memories[0];
         }
 
-        // Returns the backing byte array of the first memory (i.e. the heap).
+        // Returns the backing byte array of the first memory (i.e. the heap). Note that the
+        // array may be longer than the heap itself, since memories reserve capacity to grow into.
+        // Use HeapSize for the heap's actual size.
         public byte[] Heap => memories[0].Data;
 
+        // Returns the size of the first memory (i.e. the heap) in bytes.
+        public int HeapSize => memories[0].Size;
+
+        // Throws a Trap if the given range is not entirely within the heap. Use this before
+        // working on Heap directly, since the array extends past the end of the heap.
+        public void CheckHeapBounds(int addr, int sz)
+        {
+            if (addr < 0 || sz < 0 || !memories[0].InBounds((ulong)addr, (ulong)sz))
+            {
+                throw new Trap(
+                    $"Memory access out of bounds: offset 0x{(uint)addr:X8} size 0x{(uint)sz:X8}"
+                );
+            }
+        }
+
+        // Returns a stream over the heap, which can't read or write past its end.
+        public MemoryStream HeapStream() => new MemoryStream(Heap, 0, HeapSize, true);
+
         // Returns a Span of bytes over the heap, starting from the given offset,
         // with the given size. Note that .NET limits arrays to 2GB, so negative
         // offsets and sizes will lead to an out of bounds condition. Offsets and
@@ -190,16 +234,8 @@ namespace Dergwasm.Runtime
         // Throws a Trap if the offset and size are out of bounds.
         public Span<byte> HeapSpan(Ptr offset, int sz)
         {
-            try
-            {
-                return Heap.AsSpan(offset.Addr, sz);
-            }
-            catch (Exception)
-            {
-                throw new Trap(
-                    $"Memory access out of bounds: offset 0x{(uint)offset.Addr:X8} size 0x{(uint)sz:X8}"
-                );
-            }
+            CheckHeapBounds(offset.Addr, sz);
+            return Heap.AsSpan(offset.Addr, sz);
         }
 
         // Returns a Span of bytes over the heap, starting from the given offset,
@@ -223,7 +259,7 @@ namespace Dergwasm.Runtime
             ulong long_offset = (uint)offset;
             ulong long_address = (uint)address;
             ulong long_size = (uint)sz;
-            if (long_offset + long_address + long_size > (ulong)Heap.Length)
+            if (long_offset + long_address + long_size > (ulong)HeapSize)
             {
                 throw new Trap(
                     $"Memory access out of bounds: offset 0x{offset:X8} address 0x{address:X8} size 0x{sz:X8}"
@@ -235,8 +271,40 @@ namespace Dergwasm.Runtime
 
         public int AddFunc(Func func)
         {
+            func.SignatureId = InternFuncType(func.Signature);
             funcs.Add(func);
-            return funcs.Count - 1;
+            int addr = funcs.Count - 1;
+            // If two funcs have the same name, the first one wins, as it does in a scan.
+            if (!funcAddrsByName.ContainsKey((func.ModuleName, func.Name)))
+            {
+                funcAddrsByName.Add((func.ModuleName, func.Name), addr);
+            }
+            return addr;
+        }
+
+        // Returns the canonical ID for the given FuncType, assigning a new one if the type
+        // hasn't been seen before.
+        public int InternFuncType(FuncType funcType)
+        {
+            if (!funcTypeIds.TryGetValue(funcType, out int id))
+            {
+                id = funcTypes.Count;
+                funcTypes.Add(funcType);
+                funcTypeIds.Add(funcType, id);
+            }
+            return id;
+        }
+
+        // Returns the canonical ID for the func's signature. Funcs are normally interned when
+        // they're added to the machine, but this also handles funcs that were placed directly
+        // into the funcs list.
+        public int GetSignatureId(Func func)
+        {
+            if (func.SignatureId < 0)
+            {
+                func.SignatureId = InternFuncType(func.Signature);
+            }
+            return func.SignatureId;
         }
 
         public int NumFuncs => funcs.Count;
@@ -245,7 +313,17 @@ namespace Dergwasm.Runtime
 
         public Func GetFunc(string moduleName, string name, bool throw_if_not_found = false)
         {
-            // O(N) for now
+            if (
+                funcAddrsByName.TryGetValue((moduleName, name), out int addr)
+                && addr < funcs.Count
+                && funcs[addr].ModuleName == moduleName
+                && funcs[addr].Name == name
+            )
+            {
+                return funcs[addr];
+            }
+
+            // Funcs placed directly into the funcs list aren't indexed, so fall back to a scan.
             foreach (var f in funcs)
             {
                 if (f.ModuleName == moduleName && f.Name == name)
@@ -328,8 +406,7 @@ namespace Dergwasm.Runtime
             {
                 throw new Trap($"Could not find host function {key} {signature}");
             }
-            funcs.Add(hostFuncs[key]);
-            return funcs.Count - 1;
+            return AddFunc(hostFuncs[key]);
         }
     }
 }
@@ -1,7 +1,9 @@
 ﻿using System;
 using System.Collections.Generic;
 using System.IO;
+using System.Runtime.ExceptionServices;
 using System.Text;
+using System.Threading.Tasks;
 using Dergwasm.Instructions;
 using Dergwasm.Runtime;
 
@@ -28,6 +30,10 @@ namespace Dergwasm.Runtime
         public int StartIdx = -1;
         public int DataCount;
 
+        // When set, function bodies in the code section are decoded and flattened on the
+        // thread pool instead of one after another.
+        public bool ParallelCodeDecode;
+
         public int[] ExternalFuncAddrs;
         public int[] ExternalTableAddrs;
         public int[] ExternalMemoryAddrs;
@@ -39,6 +45,11 @@ namespace Dergwasm.Runtime
         }
 
         public static Module Read(string moduleName, BinaryReader stream)
+        {
+            return Read(moduleName, stream, false);
+        }
+
+        public static Module Read(string moduleName, BinaryReader stream, bool parallel)
         {
             if (stream.ReadUInt32() != Magic)
             {
@@ -50,6 +61,7 @@ namespace Dergwasm.Runtime
             }
 
             Module module = new Module(moduleName);
+            module.ParallelCodeDecode = parallel;
 
             while (true)
             {
@@ -405,6 +417,8 @@ namespace Dergwasm.Runtime
 
         public static void ReadCodeSection(BinaryReader stream, Module module, int section_len)
         {
+            long beginPos = stream.BaseStream.Position;
+
             // Count up the number of imported functions. These functions
             // come after those.
             int numImportedFuncs = module.NumImportedFuncs();
@@ -412,24 +426,98 @@ namespace Dergwasm.Runtime
             int numFuncs = (int)stream.ReadLEB128Unsigned();
             if (Module.Debug)
                 Console.WriteLine($"Reading {numFuncs} function bodies");
+
+            if (module.ParallelCodeDecode)
+            {
+                int bodiesLen = (int)(section_len - (stream.BaseStream.Position - beginPos));
+                ReadFuncBodiesParallel(
+                    stream.ReadBytes(bodiesLen),
+                    module,
+                    numImportedFuncs,
+                    numFuncs
+                );
+                return;
+            }
+
             for (int i = 0; i < numFuncs; i++)
             {
                 int bodySize = (int)stream.ReadLEB128Unsigned(); // not needed
-                int numLocalSpecs = (int)stream.ReadLEB128Unsigned();
-                List<ValueType> localTypes = new List<ValueType>();
-                for (int j = 0; j < numLocalSpecs; j++)
+                ReadFuncBody(stream, module.Funcs[numImportedFuncs + i] as ModuleFunc);
+            }
+        }
+
+        static void ReadFuncBody(BinaryReader stream, ModuleFunc func)
+        {
+            int numLocalSpecs = (int)stream.ReadLEB128Unsigned();
+            List<ValueType> localTypes = new List<ValueType>();
+            for (int j = 0; j < numLocalSpecs; j++)
+            {
+                int howMany = (int)stream.ReadLEB128Unsigned();
+                ValueType valueType = (ValueType)stream.ReadByte();
+                for (int k = 0; k < howMany; k++)
+                {
+                    localTypes.Add(valueType);
+                }
+            }
+            func.Locals = localTypes.ToArray();
+            func.Code = Module.ReadExpr(stream);
+        }
+
+        // Decodes the function bodies of a code section on the thread pool. Each body is
+        // prefixed by its size, so a quick serial pass finds where every body starts, and then
+        // the bodies are decoded and flattened independently. Each body only ever writes to
+        // its own ModuleFunc, so the result is identical to the serial path no matter how the
+        // work gets scheduled.
+        static void ReadFuncBodiesParallel(
+            byte[] bodies,
+            Module module,
+            int numImportedFuncs,
+            int numFuncs
+        )
+        {
+            int[] offsets = new int[numFuncs];
+            int[] sizes = new int[numFuncs];
+            using (BinaryReader scanner = new BinaryReader(new MemoryStream(bodies, false)))
+            {
+                for (int i = 0; i < numFuncs; i++)
                 {
-                    int howMany = (int)stream.ReadLEB128Unsigned();
-                    ValueType valueType = (ValueType)stream.ReadByte();
-                    for (int k = 0; k < howMany; k++)
+                    sizes[i] = (int)scanner.ReadLEB128Unsigned();
+                    offsets[i] = (int)scanner.BaseStream.Position;
+                    if (sizes[i] < 0 || offsets[i] + sizes[i] > bodies.Length)
                     {
-                        localTypes.Add(valueType);
+                        throw new Trap(
+                            $"Function body {i} extends past the end of the code section"
+                        );
                     }
+                    scanner.BaseStream.Position += sizes[i];
                 }
-                List<Instruction> body = Module.ReadExpr(stream);
-                int funcIdx = numImportedFuncs + i;
-                (module.Funcs[funcIdx] as ModuleFunc).Locals = localTypes.ToArray();
-                (module.Funcs[funcIdx] as ModuleFunc).Code = body;
+            }
+
+            try
+            {
+                Parallel.For(
+                    0,
+                    numFuncs,
+                    i =>
+                    {
+                        using (
+                            BinaryReader bodyStream = new BinaryReader(
+                                new MemoryStream(bodies, offsets[i], sizes[i], false)
+                            )
+                        )
+                        {
+                            ReadFuncBody(
+                                bodyStream,
+                                module.Funcs[numImportedFuncs + i] as ModuleFunc
+                            );
+                        }
+                    }
+                );
+            }
+            catch (AggregateException e)
+            {
+                // Surface the same exception (usually a Trap) that the serial path would have thrown.
+                ExceptionDispatchInfo.Capture(e.Flatten().InnerExceptions[0]).Throw();
             }
         }
 
@@ -1,6 +1,7 @@
 ﻿using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Threading;
 using Dergwasm.Instructions;
 
 namespace Dergwasm.Runtime
@@ -8,8 +9,18 @@ namespace Dergwasm.Runtime
     // The runtime representation of a module.
     public class ModuleInstance
     {
+        static int nextId;
+
+        // Identifies this instance among all instances in all machines. Instructions belong to
+        // the Module, so any state they cache per instance (see ControlInstructions.CallIndirect)
+        // is keyed on this. Never 0.
+        public readonly int Id = Interlocked.Increment(ref nextId);
+
         public string ModuleName;
         public List<FuncType> FuncTypes = new List<FuncType>();
+
+        // The machine's canonical IDs for FuncTypes, by type index.
+        int[] funcTypeIds;
         public List<int> FuncsMap = new List<int>();
         public List<int> TablesMap = new List<int>();
         public List<int> MemoriesMap = new List<int>();
@@ -50,7 +61,9 @@ namespace Dergwasm.Runtime
             // mapped.
             for (int i = module.NumImportedMemories(); i < module.Memories.Count; i++)
             {
-                MemoriesMap.Add(machine.AddMemory(new Memory(module.Memories[i])));
+                MemoriesMap.Add(
+                    machine.AddMemory(new Memory(module.Memories[i], machine.ReservedMemoryPages))
+                );
             }
         }
 
@@ -107,6 +120,17 @@ namespace Dergwasm.Runtime
             AllocatedDataSegments(machine, module);
 
             FuncTypes.AddRange(module.FuncTypes);
+            funcTypeIds = FuncTypes.Select(machine.InternFuncType).ToArray();
+        }
+
+        // Gets the machine's canonical ID for the type at the given type index.
+        public int GetFuncTypeId(Machine machine, int idx)
+        {
+            if (funcTypeIds == null || funcTypeIds.Length != FuncTypes.Count)
+            {
+                funcTypeIds = FuncTypes.Select(machine.InternFuncType).ToArray();
+            }
+            return funcTypeIds[idx];
         }
 
         void ValidateNumExternsVersusRequiredImports(Module module)
@@ -359,7 +383,7 @@ namespace Dergwasm.Runtime
                     activeDataSegment.OffsetExpr
                 ).s32;
                 int n = dataSegment.Data.Length;
-                if (d + n > memory.Data.Length)
+                if (!memory.InBounds((uint)d, (uint)n))
                 {
                     throw new Trap("memory.init during module instantiation: access out of bounds");
                 }
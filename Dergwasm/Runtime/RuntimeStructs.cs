@@ -1,4 +1,5 @@
-﻿using System.Collections.Generic;
+﻿using System;
+using System.Collections.Generic;
 using System.IO;
 using Dergwasm.Instructions;
 
@@ -79,6 +80,10 @@ namespace Dergwasm.Runtime
         public string Name;
         public FuncType Signature;
 
+        // The Machine's canonical ID for Signature, or -1 if it hasn't been interned yet.
+        // See Machine.GetSignatureId.
+        public int SignatureId = -1;
+
         public Func(string moduleName, string name, FuncType signature)
         {
             ModuleName = moduleName;
@@ -228,15 +233,126 @@ namespace Dergwasm.Runtime
         }
     }
 
+    // A linear memory.
+    //
+    // The backing array can be allocated with spare capacity beyond the memory's current size,
+    // so that most memory.grow calls only have to bump Size instead of copying the whole heap.
+    // Only the first Size bytes of Data are addressable by WASM. The rest is reserved, and is
+    // always zero.
     public class Memory
     {
+        // .NET has a limitation on array sizes to about 0x80000000 bytes.
+        public const uint MaxPages = 0x7FFF;
+
         public Limits Limits;
-        public byte[] Data;
 
-        public Memory(Limits limits)
+        // The current size of the memory in bytes. This is always a multiple of the page size.
+        public int Size;
+
+        byte[] data;
+
+        // reservedPages is how many pages beyond the initial size to reserve up front. The
+        // reservation never goes past the memory's maximum.
+        public Memory(Limits limits, uint reservedPages = 0)
         {
             Limits = limits;
-            Data = new byte[Limits.Minimum << 16];
+            data = new byte[CapacityFor(Limits.Minimum, Limits.Minimum + reservedPages) << 16];
+            Size = (int)(Limits.Minimum << 16);
+        }
+
+        // The backing array, which may be longer than Size. Setting it replaces the memory's
+        // contents, and the memory's size becomes the array's length.
+        public byte[] Data
+        {
+            get => data;
+            set
+            {
+                data = value;
+                Size = value.Length;
+                Limits.Minimum = (uint)value.Length >> 16;
+            }
+        }
+
+        public uint Pages => (uint)Size >> 16;
+
+        // Returns true if the delta bytes starting at offset are all within the memory.
+        public bool InBounds(ulong offset, ulong delta) => offset + delta <= (ulong)Size;
+
+        // Grows the memory by delta pages, returning the old size in pages, or -1 if the memory
+        // can't grow that far. The backing array is only reallocated if the reserved capacity
+        // runs out, and then the capacity at least doubles so that reallocations stay rare.
+        public int Grow(uint delta)
+        {
+            uint oldSize = Pages;
+            ulong newSize = (ulong)oldSize + delta;
+            if (Limits.Maximum.HasValue && newSize > Limits.Maximum)
+            {
+                return -1;
+            }
+            if (newSize > MaxPages)
+            {
+                return -1;
+            }
+            if (newSize << 16 > (ulong)data.Length)
+            {
+                uint capacity = (uint)data.Length >> 16;
+                capacity = CapacityFor((uint)newSize, Math.Max((uint)newSize, capacity * 2));
+                Array.Resize(ref data, (int)capacity << 16);
+            }
+            Size = (int)newSize << 16;
+            Limits.Minimum = (uint)newSize;
+            return (int)oldSize;
         }
+
+        // Returns the number of pages to allocate, at least needed and up to wanted, without
+        // exceeding the memory's maximum.
+        uint CapacityFor(uint needed, uint wanted)
+        {
+            uint limit = Math.Min(Limits.Maximum ?? MaxPages, MaxPages);
+            return Math.Max(needed, Math.Min(wanted, limit));
+        }
+
+#pragma warning disable CS8500 // This takes the address of, gets the size of, or declares a pointer to a managed type
+        // Gets a value from the memory at the given offset plus the given address ("address"
+        // in the sense of "address within the memory starting at the offset").
+        //
+        // Throws a Trap if the offset + address + size of value is out of bounds.
+        public unsafe T Load<T>(int offset, int address)
+            where T : struct
+        {
+            // Treat as uint, but do ulong math to avoid overflow.
+            ulong ea = (ulong)(uint)offset + (uint)address;
+            if (!InBounds(ea, (ulong)sizeof(T)))
+            {
+                throw OutOfBounds(offset, address, sizeof(T));
+            }
+            fixed (byte* ptr = data)
+            {
+                return *(T*)(ptr + ea);
+            }
+        }
+
+        // Sets a value in the memory at the given offset plus the given address.
+        //
+        // Throws a Trap if the offset + address + size of value is out of bounds.
+        public unsafe void Store<T>(int offset, int address, T value)
+            where T : struct
+        {
+            ulong ea = (ulong)(uint)offset + (uint)address;
+            if (!InBounds(ea, (ulong)sizeof(T)))
+            {
+                throw OutOfBounds(offset, address, sizeof(T));
+            }
+            fixed (byte* ptr = data)
+            {
+                *(T*)(ptr + ea) = value;
+            }
+        }
+#pragma warning restore CS8500 // This takes the address of, gets the size of, or declares a pointer to a managed type
+
+        static Trap OutOfBounds(int offset, int address, int sz) =>
+            new Trap(
+                $"Memory access out of bounds: offset 0x{offset:X8} address 0x{address:X8} size 0x{sz:X8}"
+            );
     }
 }
@@ -426,9 +426,21 @@ namespace Dergwasm.Runtime
             return other is FuncType funcType && Equals(funcType);
         }
 
+        // Hashes the contents of the arrays, to be consistent with Equals. This lets FuncTypes be
+        // used as dictionary keys, which is how the Machine interns them.
         public override int GetHashCode()
         {
-            return (args, returns).GetHashCode();
+            int hash = 17;
+            foreach (ValueType t in args ?? Array.Empty<ValueType>())
+            {
+                hash = hash * 31 + (int)t;
+            }
+            hash = hash * 31 + 0x60;
+            foreach (ValueType t in returns ?? Array.Empty<ValueType>())
+            {
+                hash = hash * 31 + (int)t;
+            }
+            return hash;
         }
 
         public static bool operator ==(FuncType lhs, FuncType rhs)
@@ -95,482 +95,336 @@ namespace Dergwasm
             object value
         )
         {
-            using (MemoryStream stream = new MemoryStream(machine.Heap))
+            using (MemoryStream stream = machine.HeapStream())
             {
                 stream.Position = PrimitiveDataBuffer;
                 BinaryWriter writer = new BinaryWriter(stream);
+                if (!Write(writer, value, resoniteEnv, frame))
+                {
+                    return 0;
+                }
+            }
+            return PrimitiveDataBuffer;
+        }
 
-                switch (value)
+        // Serializes a "simple" value into a standalone byte array. Unlike Serialize, strings
+        // and List<RefID> are written inline (as a count followed by the data), so the result
+        // doesn't point to any other memory.
+        //
+        // Returns null if the value could not be serialized.
+        public static byte[] SerializeInline(object value)
+        {
+            using (MemoryStream stream = new MemoryStream())
+            {
+                BinaryWriter writer = new BinaryWriter(stream);
+                if (!Write(writer, value, null, null))
                 {
-                    case null:
-                        writer.Write(SimpleType.Null);
-                        break;
-
-                    case bool b:
-                        writer.Write(SimpleType.Bool);
-                        writer.Write(b ? 1 : 0);
-                        break;
-
-                    case bool2 b2:
-                        writer.Write(SimpleType.Bool2);
-                        writer.Write(b2.x ? 1 : 0);
-                        writer.Write(b2.y ? 1 : 0);
-                        break;
-
-                    case bool3 b3:
-                        writer.Write(SimpleType.Bool3);
-                        writer.Write(b3.x ? 1 : 0);
-                        writer.Write(b3.y ? 1 : 0);
-                        writer.Write(b3.z ? 1 : 0);
-                        break;
-
-                    case bool4 b4:
-                        writer.Write(SimpleType.Bool4);
-                        writer.Write(b4.x ? 1 : 0);
-                        writer.Write(b4.y ? 1 : 0);
-                        writer.Write(b4.z ? 1 : 0);
-                        writer.Write(b4.w ? 1 : 0);
-                        break;
-
-                    case int i:
-                        writer.Write(SimpleType.Int);
-                        writer.Write(i);
-                        break;
-
-                    case int2 i2:
-                        writer.Write(SimpleType.Int2);
-                        writer.Write(i2.x);
-                        writer.Write(i2.y);
-                        break;
-
-                    case int3 i3:
-                        writer.Write(SimpleType.Int3);
-                        writer.Write(i3.x);
-                        writer.Write(i3.y);
-                        writer.Write(i3.z);
-                        break;
-
-                    case int4 i4:
-                        writer.Write(SimpleType.Int4);
-                        writer.Write(i4.x);
-                        writer.Write(i4.y);
-                        writer.Write(i4.z);
-                        writer.Write(i4.w);
-                        break;
-
-                    case uint ui:
-                        writer.Write(SimpleType.UInt);
-                        writer.Write(ui);
-                        break;
-
-                    case uint2 ui2:
-                        writer.Write(SimpleType.UInt2);
-                        writer.Write(ui2.x);
-                        writer.Write(ui2.y);
-                        break;
-
-                    case uint3 ui3:
-                        writer.Write(SimpleType.UInt3);
-                        writer.Write(ui3.x);
-                        writer.Write(ui3.y);
-                        writer.Write(ui3.z);
-                        break;
-
-                    case uint4 ui4:
-                        writer.Write(SimpleType.UInt4);
-                        writer.Write(ui4.x);
-                        writer.Write(ui4.y);
-                        writer.Write(ui4.z);
-                        writer.Write(ui4.w);
-                        break;
-
-                    case long l:
-                        writer.Write(SimpleType.Long);
-                        writer.Write(l);
-                        break;
-
-                    case long2 l2:
-                        writer.Write(SimpleType.Long2);
-                        writer.Write(l2.x);
-                        writer.Write(l2.y);
-                        break;
-
-                    case long3 l3:
-                        writer.Write(SimpleType.Long3);
-                        writer.Write(l3.x);
-                        writer.Write(l3.y);
-                        writer.Write(l3.z);
-                        break;
-
-                    case long4 l4:
-                        writer.Write(SimpleType.Long4);
-                        writer.Write(l4.x);
-                        writer.Write(l4.y);
-                        writer.Write(l4.z);
-                        writer.Write(l4.w);
-                        break;
-
-                    case ulong ul:
-                        writer.Write(SimpleType.ULong);
-                        writer.Write(ul);
-                        break;
-
-                    case ulong2 ul2:
-                        writer.Write(SimpleType.ULong2);
-                        writer.Write(ul2.x);
-                        writer.Write(ul2.y);
-                        break;
-
-                    case ulong3 ul3:
-                        writer.Write(SimpleType.ULong3);
-                        writer.Write(ul3.x);
-                        writer.Write(ul3.y);
-                        writer.Write(ul3.z);
-                        break;
-
-                    case ulong4 ul4:
-                        writer.Write(SimpleType.ULong4);
-                        writer.Write(ul4.x);
-                        writer.Write(ul4.y);
-                        writer.Write(ul4.z);
-                        writer.Write(ul4.w);
-                        break;
-
-                    case float f:
-                        writer.Write(SimpleType.Float);
-                        writer.Write(f);
-                        break;
-
-                    case float2 f2:
-                        writer.Write(SimpleType.Float2);
-                        writer.Write(f2.x);
-                        writer.Write(f2.y);
-                        break;
-
-                    case float3 f3:
-                        writer.Write(SimpleType.Float3);
-                        writer.Write(f3.x);
-                        writer.Write(f3.y);
-                        writer.Write(f3.z);
-                        break;
-
-                    case float4 f4:
-                        writer.Write(SimpleType.Float4);
-                        writer.Write(f4.x);
-                        writer.Write(f4.y);
-                        writer.Write(f4.z);
-                        writer.Write(f4.w);
-                        break;
-
-                    case floatQ fq:
-                        writer.Write(SimpleType.FloatQ);
-                        writer.Write(fq.x);
-                        writer.Write(fq.y);
-                        writer.Write(fq.z);
-                        writer.Write(fq.w);
-                        break;
-
-                    case double d:
-                        writer.Write(SimpleType.Double);
-                        writer.Write(d);
-                        break;
-
-                    case double2 d2:
-                        writer.Write(SimpleType.Double2);
-                        writer.Write(d2.x);
-                        writer.Write(d2.y);
-                        break;
-
-                    case double3 d3:
-                        writer.Write(SimpleType.Double3);
-                        writer.Write(d3.x);
-                        writer.Write(d3.y);
-                        writer.Write(d3.z);
-                        break;
-
-                    case double4 d4:
-                        writer.Write(SimpleType.Double4);
-                        writer.Write(d4.x);
-                        writer.Write(d4.y);
-                        writer.Write(d4.z);
-                        writer.Write(d4.w);
-                        break;
-
-                    case doubleQ dq:
-                        writer.Write(SimpleType.DoubleQ);
-                        writer.Write(dq.x);
-                        writer.Write(dq.y);
-                        writer.Write(dq.z);
-                        writer.Write(dq.w);
-                        break;
-
-                    case string s:
-                        writer.Write(SimpleType.String);
+                    return null;
+                }
+                writer.Flush();
+                return stream.ToArray();
+            }
+        }
+
+        // Writes a "simple" value. If resoniteEnv is null, strings and List<RefID> are written
+        // inline. Otherwise, their data is allocated in WASM memory and a pointer is written.
+        //
+        // Returns false if the value could not be serialized.
+        static bool Write(BinaryWriter writer, object value, ResoniteEnv resoniteEnv, Frame frame)
+        {
+            switch (value)
+            {
+                case null:
+                    writer.Write(SimpleType.Null);
+                    break;
+
+                case bool b:
+                    writer.Write(SimpleType.Bool);
+                    writer.Write(b ? 1 : 0);
+                    break;
+
+                case bool2 b2:
+                    writer.Write(SimpleType.Bool2);
+                    writer.Write(b2.x ? 1 : 0);
+                    writer.Write(b2.y ? 1 : 0);
+                    break;
+
+                case bool3 b3:
+                    writer.Write(SimpleType.Bool3);
+                    writer.Write(b3.x ? 1 : 0);
+                    writer.Write(b3.y ? 1 : 0);
+                    writer.Write(b3.z ? 1 : 0);
+                    break;
+
+                case bool4 b4:
+                    writer.Write(SimpleType.Bool4);
+                    writer.Write(b4.x ? 1 : 0);
+                    writer.Write(b4.y ? 1 : 0);
+                    writer.Write(b4.z ? 1 : 0);
+                    writer.Write(b4.w ? 1 : 0);
+                    break;
+
+                case int i:
+                    writer.Write(SimpleType.Int);
+                    writer.Write(i);
+                    break;
+
+                case int2 i2:
+                    writer.Write(SimpleType.Int2);
+                    writer.Write(i2.x);
+                    writer.Write(i2.y);
+                    break;
+
+                case int3 i3:
+                    writer.Write(SimpleType.Int3);
+                    writer.Write(i3.x);
+                    writer.Write(i3.y);
+                    writer.Write(i3.z);
+                    break;
+
+                case int4 i4:
+                    writer.Write(SimpleType.Int4);
+                    writer.Write(i4.x);
+                    writer.Write(i4.y);
+                    writer.Write(i4.z);
+                    writer.Write(i4.w);
+                    break;
+
+                case uint ui:
+                    writer.Write(SimpleType.UInt);
+                    writer.Write(ui);
+                    break;
+
+                case uint2 ui2:
+                    writer.Write(SimpleType.UInt2);
+                    writer.Write(ui2.x);
+                    writer.Write(ui2.y);
+                    break;
+
+                case uint3 ui3:
+                    writer.Write(SimpleType.UInt3);
+                    writer.Write(ui3.x);
+                    writer.Write(ui3.y);
+                    writer.Write(ui3.z);
+                    break;
+
+                case uint4 ui4:
+                    writer.Write(SimpleType.UInt4);
+                    writer.Write(ui4.x);
+                    writer.Write(ui4.y);
+                    writer.Write(ui4.z);
+                    writer.Write(ui4.w);
+                    break;
+
+                case long l:
+                    writer.Write(SimpleType.Long);
+                    writer.Write(l);
+                    break;
+
+                case long2 l2:
+                    writer.Write(SimpleType.Long2);
+                    writer.Write(l2.x);
+                    writer.Write(l2.y);
+                    break;
+
+                case long3 l3:
+                    writer.Write(SimpleType.Long3);
+                    writer.Write(l3.x);
+                    writer.Write(l3.y);
+                    writer.Write(l3.z);
+                    break;
+
+                case long4 l4:
+                    writer.Write(SimpleType.Long4);
+                    writer.Write(l4.x);
+                    writer.Write(l4.y);
+                    writer.Write(l4.z);
+                    writer.Write(l4.w);
+                    break;
+
+                case ulong ul:
+                    writer.Write(SimpleType.ULong);
+                    writer.Write(ul);
+                    break;
+
+                case ulong2 ul2:
+                    writer.Write(SimpleType.ULong2);
+                    writer.Write(ul2.x);
+                    writer.Write(ul2.y);
+                    break;
+
+                case ulong3 ul3:
+                    writer.Write(SimpleType.ULong3);
+                    writer.Write(ul3.x);
+                    writer.Write(ul3.y);
+                    writer.Write(ul3.z);
+                    break;
+
+                case ulong4 ul4:
+                    writer.Write(SimpleType.ULong4);
+                    writer.Write(ul4.x);
+                    writer.Write(ul4.y);
+                    writer.Write(ul4.z);
+                    writer.Write(ul4.w);
+                    break;
+
+                case float f:
+                    writer.Write(SimpleType.Float);
+                    writer.Write(f);
+                    break;
+
+                case float2 f2:
+                    writer.Write(SimpleType.Float2);
+                    writer.Write(f2.x);
+                    writer.Write(f2.y);
+                    break;
+
+                case float3 f3:
+                    writer.Write(SimpleType.Float3);
+                    writer.Write(f3.x);
+                    writer.Write(f3.y);
+                    writer.Write(f3.z);
+                    break;
+
+                case float4 f4:
+                    writer.Write(SimpleType.Float4);
+                    writer.Write(f4.x);
+                    writer.Write(f4.y);
+                    writer.Write(f4.z);
+                    writer.Write(f4.w);
+                    break;
+
+                case floatQ fq:
+                    writer.Write(SimpleType.FloatQ);
+                    writer.Write(fq.x);
+                    writer.Write(fq.y);
+                    writer.Write(fq.z);
+                    writer.Write(fq.w);
+                    break;
+
+                case double d:
+                    writer.Write(SimpleType.Double);
+                    writer.Write(d);
+                    break;
+
+                case double2 d2:
+                    writer.Write(SimpleType.Double2);
+                    writer.Write(d2.x);
+                    writer.Write(d2.y);
+                    break;
+
+                case double3 d3:
+                    writer.Write(SimpleType.Double3);
+                    writer.Write(d3.x);
+                    writer.Write(d3.y);
+                    writer.Write(d3.z);
+                    break;
+
+                case double4 d4:
+                    writer.Write(SimpleType.Double4);
+                    writer.Write(d4.x);
+                    writer.Write(d4.y);
+                    writer.Write(d4.z);
+                    writer.Write(d4.w);
+                    break;
+
+                case doubleQ dq:
+                    writer.Write(SimpleType.DoubleQ);
+                    writer.Write(dq.x);
+                    writer.Write(dq.y);
+                    writer.Write(dq.z);
+                    writer.Write(dq.w);
+                    break;
+
+                case string s:
+                    writer.Write(SimpleType.String);
+                    if (resoniteEnv == null)
+                    {
+                        byte[] utf8 = Encoding.UTF8.GetBytes(s);
+                        writer.Write(utf8.Length);
+                        writer.Write(utf8);
+                    }
+                    else
+                    {
                         writer.Write(
                             resoniteEnv.emscriptenEnv
                                 .AllocateUTF8StringInMemLenData(frame, s)
                                 .Buff.Ptr.Addr
                         );
-                        break;
-
-                    case color c:
-                        writer.Write(SimpleType.Color);
-                        writer.Write(c.r);
-                        writer.Write(c.g);
-                        writer.Write(c.b);
-                        writer.Write(c.a);
-                        break;
-
-                    case colorX cx:
-                        writer.Write(SimpleType.ColorX);
-                        writer.Write(cx.r);
-                        writer.Write(cx.g);
-                        writer.Write(cx.b);
-                        writer.Write(cx.a);
-                        break;
-
-                    case RefID refID:
-                        writer.Write(SimpleType.RefID);
-                        writer.Write((ulong)refID);
-                        break;
-
-                    case List<RefID> refIDList:
-
-                        {
-                            int dataPtr = resoniteEnv.emscriptenEnv.Malloc(
-                                frame,
-                                sizeof(int) + refIDList.Count * 8
-                            );
-                            writer.Write(SimpleType.RefIDList);
-                            writer.Write(dataPtr);
-                            writer.Flush(); // Unnecessary, but comforting.
-                            stream.Position = dataPtr;
-                            writer.Write(refIDList.Count);
-                            foreach (RefID id in refIDList)
-                                writer.Write((ulong)id);
-                        }
-                        break;
-
-                    case Slot slot:
-                        writer.Write(SimpleType.Slot);
-                        writer.Write((ulong)slot.ReferenceID);
-                        break;
-
-                    case User user:
-                        writer.Write(SimpleType.User);
-                        writer.Write((ulong)user.ReferenceID);
-                        break;
-
-                    case UserRoot userRoot:
-                        writer.Write(SimpleType.UserRoot);
-                        writer.Write((ulong)userRoot.ReferenceID);
-                        break;
-
-                    default:
-                        return 0;
-                }
+                    }
+                    break;
+
+                case color c:
+                    writer.Write(SimpleType.Color);
+                    writer.Write(c.r);
+                    writer.Write(c.g);
+                    writer.Write(c.b);
+                    writer.Write(c.a);
+                    break;
+
+                case colorX cx:
+                    writer.Write(SimpleType.ColorX);
+                    writer.Write(cx.r);
+                    writer.Write(cx.g);
+                    writer.Write(cx.b);
+                    writer.Write(cx.a);
+                    break;
+
+                case RefID refID:
+                    writer.Write(SimpleType.RefID);
+                    writer.Write((ulong)refID);
+                    break;
+
+                case List<RefID> refIDList:
+                    writer.Write(SimpleType.RefIDList);
+                    if (resoniteEnv != null)
+                    {
+                        int dataPtr = resoniteEnv.emscriptenEnv.Malloc(
+                            frame,
+                            sizeof(int) + refIDList.Count * 8
+                        );
+                        writer.Write(dataPtr);
+                        writer.Flush(); // Unnecessary, but comforting.
+                        writer.BaseStream.Position = dataPtr;
+                    }
+                    writer.Write(refIDList.Count);
+                    foreach (RefID id in refIDList)
+                        writer.Write((ulong)id);
+                    break;
+
+                case Slot slot:
+                    writer.Write(SimpleType.Slot);
+                    writer.Write((ulong)slot.ReferenceID);
+                    break;
+
+                case User user:
+                    writer.Write(SimpleType.User);
+                    writer.Write((ulong)user.ReferenceID);
+                    break;
+
+                case UserRoot userRoot:
+                    writer.Write(SimpleType.UserRoot);
+                    writer.Write((ulong)userRoot.ReferenceID);
+                    break;
+
+                default:
+                    return false;
             }
-            return PrimitiveDataBuffer;
+            return true;
         }
 
         // Deserializes a "simple" value. Returns the deserialized value, or null if it
         // couldn't be deserialized.
         public static object Deserialize(Machine machine, ResoniteEnv resoniteEnv, int dataPtr)
         {
-            using (MemoryStream memoryStream = new MemoryStream(machine.Heap))
+            using (MemoryStream memoryStream = machine.HeapStream())
             {
                 BinaryReader reader = new BinaryReader(memoryStream);
                 memoryStream.Position = dataPtr;
 
                 try
                 {
-                    int dataType = reader.ReadInt32();
-                    switch (dataType)
-                    {
-                        case SimpleType.Null:
-                            return null;
-
-                        case SimpleType.Bool:
-                            return reader.ReadInt32() != 0;
-                        case SimpleType.Bool2:
-                            return new bool2(reader.ReadInt32() != 0, reader.ReadInt32() != 0);
-                        case SimpleType.Bool3:
-                            return new bool3(
-                                reader.ReadInt32() != 0,
-                                reader.ReadInt32() != 0,
-                                reader.ReadInt32() != 0
-                            );
-                        case SimpleType.Bool4:
-                            return new bool4(
-                                reader.ReadInt32() != 0,
-                                reader.ReadInt32() != 0,
-                                reader.ReadInt32() != 0,
-                                reader.ReadInt32() != 0
-                            );
-
-                        case SimpleType.Int:
-                            return reader.ReadInt32();
-                        case SimpleType.Int2:
-                            return new int2(reader.ReadInt32(), reader.ReadInt32());
-                        case SimpleType.Int3:
-                            return new int3(
-                                reader.ReadInt32(),
-                                reader.ReadInt32(),
-                                reader.ReadInt32()
-                            );
-                        case SimpleType.Int4:
-                            return new int4(
-                                reader.ReadInt32(),
-                                reader.ReadInt32(),
-                                reader.ReadInt32(),
-                                reader.ReadInt32()
-                            );
-
-                        case SimpleType.UInt:
-                            return reader.ReadUInt32();
-                        case SimpleType.UInt2:
-                            return new uint2(reader.ReadUInt32(), reader.ReadUInt32());
-                        case SimpleType.UInt3:
-                            return new uint3(
-                                reader.ReadUInt32(),
-                                reader.ReadUInt32(),
-                                reader.ReadUInt32()
-                            );
-                        case SimpleType.UInt4:
-                            return new uint4(
-                                reader.ReadUInt32(),
-                                reader.ReadUInt32(),
-                                reader.ReadUInt32(),
-                                reader.ReadUInt32()
-                            );
-
-                        case SimpleType.Long:
-                            return reader.ReadInt64();
-                        case SimpleType.Long2:
-                            return new long2(reader.ReadInt64(), reader.ReadInt64());
-                        case SimpleType.Long3:
-                            return new long3(
-                                reader.ReadInt64(),
-                                reader.ReadInt64(),
-                                reader.ReadInt64()
-                            );
-                        case SimpleType.Long4:
-                            return new long4(
-                                reader.ReadInt64(),
-                                reader.ReadInt64(),
-                                reader.ReadInt64(),
-                                reader.ReadInt64()
-                            );
-
-                        case SimpleType.ULong:
-                            return reader.ReadUInt64();
-                        case SimpleType.ULong2:
-                            return new ulong2(reader.ReadUInt64(), reader.ReadUInt64());
-                        case SimpleType.ULong3:
-                            return new ulong3(
-                                reader.ReadUInt64(),
-                                reader.ReadUInt64(),
-                                reader.ReadUInt64()
-                            );
-                        case SimpleType.ULong4:
-                            return new ulong4(
-                                reader.ReadUInt64(),
-                                reader.ReadUInt64(),
-                                reader.ReadUInt64(),
-                                reader.ReadUInt64()
-                            );
-
-                        case SimpleType.Float:
-                            return reader.ReadSingle();
-                        case SimpleType.Float2:
-                            return new float2(reader.ReadSingle(), reader.ReadSingle());
-                        case SimpleType.Float3:
-                            return new float3(
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle()
-                            );
-                        case SimpleType.Float4:
-                            return new float4(
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle()
-                            );
-                        case SimpleType.FloatQ:
-                            return new floatQ(
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle()
-                            );
-
-                        case SimpleType.Double:
-                            return reader.ReadDouble();
-                        case SimpleType.Double2:
-                            return new double2(reader.ReadDouble(), reader.ReadDouble());
-                        case SimpleType.Double3:
-                            return new double3(
-                                reader.ReadDouble(),
-                                reader.ReadDouble(),
-                                reader.ReadDouble()
-                            );
-                        case SimpleType.Double4:
-                            return new double4(
-                                reader.ReadDouble(),
-                                reader.ReadDouble(),
-                                reader.ReadDouble(),
-                                reader.ReadDouble()
-                            );
-                        case SimpleType.DoubleQ:
-                            return new doubleQ(
-                                reader.ReadDouble(),
-                                reader.ReadDouble(),
-                                reader.ReadDouble(),
-                                reader.ReadDouble()
-                            );
-
-                        case SimpleType.String:
-                            memoryStream.Position = reader.ReadInt32();
-                            int stringLen = reader.ReadInt32();
-                            byte[] stringBytes = reader.ReadBytes(stringLen);
-                            return Encoding.UTF8.GetString(stringBytes);
-
-                        case SimpleType.Color:
-                            return new color(
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle()
-                            );
-                        case SimpleType.ColorX:
-                            return new colorX(
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle(),
-                                reader.ReadSingle()
-                            );
-
-                        case SimpleType.RefID:
-                            return (RefID)reader.ReadUInt64();
-                        case SimpleType.RefIDList:
-                            memoryStream.Position = reader.ReadInt32();
-                            int refIDListLen = reader.ReadInt32();
-                            List<RefID> refIDList = new List<RefID>(refIDListLen);
-                            for (int i = 0; i < refIDListLen; i++)
-                                refIDList.Add((RefID)reader.ReadUInt64());
-                            return refIDList;
-
-                        case SimpleType.Slot:
-                            return resoniteEnv.FromRefID<Slot>(reader.ReadUInt64());
-                        case SimpleType.User:
-                            return resoniteEnv.FromRefID<User>(reader.ReadUInt64());
-                        case SimpleType.UserRoot:
-                            return resoniteEnv.FromRefID<UserRoot>(reader.ReadUInt64());
-
-                        default:
-                            return null;
-                    }
+                    return Read(reader, resoniteEnv, false);
                 }
                 catch (Exception e)
                 {
@@ -579,5 +433,209 @@ namespace Dergwasm
                 }
             }
         }
+
+        // Deserializes a "simple" value written inline, as by SerializeInline, from the
+        // reader's current position. Unlike Deserialize, a malformed value throws, for
+        // example an InvalidDataException for an unknown type, or an EndOfStreamException if
+        // the value runs past the end of the stream.
+        public static object DeserializeInline(BinaryReader reader, ResoniteEnv resoniteEnv) =>
+            Read(reader, resoniteEnv, true);
+
+        // Reads a "simple" value. If inline, strings and List<RefID> are read inline.
+        // Otherwise, a pointer to their data is read, and the reader is moved there.
+        static object Read(BinaryReader reader, ResoniteEnv resoniteEnv, bool inline)
+        {
+            int dataType = reader.ReadInt32();
+            switch (dataType)
+            {
+                case SimpleType.Null:
+                    return null;
+
+                case SimpleType.Bool:
+                    return reader.ReadInt32() != 0;
+                case SimpleType.Bool2:
+                    return new bool2(reader.ReadInt32() != 0, reader.ReadInt32() != 0);
+                case SimpleType.Bool3:
+                    return new bool3(
+                        reader.ReadInt32() != 0,
+                        reader.ReadInt32() != 0,
+                        reader.ReadInt32() != 0
+                    );
+                case SimpleType.Bool4:
+                    return new bool4(
+                        reader.ReadInt32() != 0,
+                        reader.ReadInt32() != 0,
+                        reader.ReadInt32() != 0,
+                        reader.ReadInt32() != 0
+                    );
+
+                case SimpleType.Int:
+                    return reader.ReadInt32();
+                case SimpleType.Int2:
+                    return new int2(reader.ReadInt32(), reader.ReadInt32());
+                case SimpleType.Int3:
+                    return new int3(
+                        reader.ReadInt32(),
+                        reader.ReadInt32(),
+                        reader.ReadInt32()
+                    );
+                case SimpleType.Int4:
+                    return new int4(
+                        reader.ReadInt32(),
+                        reader.ReadInt32(),
+                        reader.ReadInt32(),
+                        reader.ReadInt32()
+                    );
+
+                case SimpleType.UInt:
+                    return reader.ReadUInt32();
+                case SimpleType.UInt2:
+                    return new uint2(reader.ReadUInt32(), reader.ReadUInt32());
+                case SimpleType.UInt3:
+                    return new uint3(
+                        reader.ReadUInt32(),
+                        reader.ReadUInt32(),
+                        reader.ReadUInt32()
+                    );
+                case SimpleType.UInt4:
+                    return new uint4(
+                        reader.ReadUInt32(),
+                        reader.ReadUInt32(),
+                        reader.ReadUInt32(),
+                        reader.ReadUInt32()
+                    );
+
+                case SimpleType.Long:
+                    return reader.ReadInt64();
+                case SimpleType.Long2:
+                    return new long2(reader.ReadInt64(), reader.ReadInt64());
+                case SimpleType.Long3:
+                    return new long3(
+                        reader.ReadInt64(),
+                        reader.ReadInt64(),
+                        reader.ReadInt64()
+                    );
+                case SimpleType.Long4:
+                    return new long4(
+                        reader.ReadInt64(),
+                        reader.ReadInt64(),
+                        reader.ReadInt64(),
+                        reader.ReadInt64()
+                    );
+
+                case SimpleType.ULong:
+                    return reader.ReadUInt64();
+                case SimpleType.ULong2:
+                    return new ulong2(reader.ReadUInt64(), reader.ReadUInt64());
+                case SimpleType.ULong3:
+                    return new ulong3(
+                        reader.ReadUInt64(),
+                        reader.ReadUInt64(),
+                        reader.ReadUInt64()
+                    );
+                case SimpleType.ULong4:
+                    return new ulong4(
+                        reader.ReadUInt64(),
+                        reader.ReadUInt64(),
+                        reader.ReadUInt64(),
+                        reader.ReadUInt64()
+                    );
+
+                case SimpleType.Float:
+                    return reader.ReadSingle();
+                case SimpleType.Float2:
+                    return new float2(reader.ReadSingle(), reader.ReadSingle());
+                case SimpleType.Float3:
+                    return new float3(
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle()
+                    );
+                case SimpleType.Float4:
+                    return new float4(
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle()
+                    );
+                case SimpleType.FloatQ:
+                    return new floatQ(
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle()
+                    );
+
+                case SimpleType.Double:
+                    return reader.ReadDouble();
+                case SimpleType.Double2:
+                    return new double2(reader.ReadDouble(), reader.ReadDouble());
+                case SimpleType.Double3:
+                    return new double3(
+                        reader.ReadDouble(),
+                        reader.ReadDouble(),
+                        reader.ReadDouble()
+                    );
+                case SimpleType.Double4:
+                    return new double4(
+                        reader.ReadDouble(),
+                        reader.ReadDouble(),
+                        reader.ReadDouble(),
+                        reader.ReadDouble()
+                    );
+                case SimpleType.DoubleQ:
+                    return new doubleQ(
+                        reader.ReadDouble(),
+                        reader.ReadDouble(),
+                        reader.ReadDouble(),
+                        reader.ReadDouble()
+                    );
+
+                case SimpleType.String:
+                    if (!inline)
+                        reader.BaseStream.Position = reader.ReadInt32();
+                    int stringLen = reader.ReadInt32();
+                    byte[] stringBytes = reader.ReadBytes(stringLen);
+                    if (stringBytes.Length != stringLen)
+                        throw new EndOfStreamException();
+                    return Encoding.UTF8.GetString(stringBytes);
+
+                case SimpleType.Color:
+                    return new color(
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle()
+                    );
+                case SimpleType.ColorX:
+                    return new colorX(
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle(),
+                        reader.ReadSingle()
+                    );
+
+                case SimpleType.RefID:
+                    return (RefID)reader.ReadUInt64();
+                case SimpleType.RefIDList:
+                    if (!inline)
+                        reader.BaseStream.Position = reader.ReadInt32();
+                    int refIDListLen = reader.ReadInt32();
+                    List<RefID> refIDList = new List<RefID>(refIDListLen);
+                    for (int i = 0; i < refIDListLen; i++)
+                        refIDList.Add((RefID)reader.ReadUInt64());
+                    return refIDList;
+
+                case SimpleType.Slot:
+                    return resoniteEnv.FromRefID<Slot>(reader.ReadUInt64());
+                case SimpleType.User:
+                    return resoniteEnv.FromRefID<User>(reader.ReadUInt64());
+                case SimpleType.UserRoot:
+                    return resoniteEnv.FromRefID<UserRoot>(reader.ReadUInt64());
+
+                default:
+                    throw new InvalidDataException($"Unknown simple type {dataType}");
+            }
+        }
     }
 }
@@ -1,7 +1,9 @@
 ﻿using System;
 using System.Collections.Generic;
+using System.Diagnostics;
 using System.IO;
 using Dergwasm.Instructions;
+using Dergwasm.Modules;
 using Dergwasm.Runtime;
 using Dergwasm.Environments;
 
@@ -15,22 +17,31 @@ namespace DergwasmLoadModule
         public EmscriptenWasi emscriptenWasi;
         public ResoniteEnv resoniteEnv;
         public FilesystemEnv filesystemEnv;
+        public HostCallReplayer replayer;
 
-        public Program(string filename)
+        // Loads the WASM file. If a host call trace is given, the host functions it recorded
+        // are replayed from it instead of running (see HostCallTrace), and nothing is run
+        // until Replay is called.
+        public Program(string filename, System.IO.Stream trace = null)
         {
             machine = new Machine();
             // machine.Debug = true;
+            if (trace != null)
+            {
+                replayer = new HostCallReplayer(machine, trace);
+            }
+
             emscriptenEnv = new EmscriptenEnv(machine);
             machine.RegisterModule(emscriptenEnv);
 
             emscriptenWasi = new EmscriptenWasi(machine, emscriptenEnv);
-            machine.RegisterModule(emscriptenWasi);
+            machine.RegisterModule(Replayed(emscriptenWasi));
 
             resoniteEnv = new ResoniteEnv(machine, null, emscriptenEnv);
-            machine.RegisterModule(resoniteEnv);
+            machine.RegisterModule(Replayed(resoniteEnv));
 
             filesystemEnv = new FilesystemEnv(machine, null, emscriptenEnv, emscriptenWasi);
-            machine.RegisterModule(filesystemEnv);
+            machine.RegisterModule(Replayed(filesystemEnv));
 
             Module module;
 
@@ -52,7 +63,21 @@ namespace DergwasmLoadModule
                 // Console.WriteLine($"Func [{i}]: {f.ModuleName}.{f.Name}: {f.Signature}");
             }
 
-            MaybeRunEmscriptenCtors();
+            // When replaying, the constructors are the trace's first entry.
+            if (replayer == null)
+            {
+                MaybeRunEmscriptenCtors();
+            }
+        }
+
+        IHostModule Replayed(IHostModule module) =>
+            replayer == null ? module : replayer.Wrap(module);
+
+        // Replays the whole host call trace.
+        public void Replay()
+        {
+            emscriptenEnv.outputWriter = _ => { };
+            replayer.ReplayAll();
         }
 
         void CheckForUnimplementedInstructions()
@@ -96,6 +121,7 @@ namespace DergwasmLoadModule
             Frame frame = new Frame(ctors as ModuleFunc, moduleInstance, null);
             frame.Label = new Label(0, 0);
             frame.InvokeFunc(machine, ctors);
+            machine.ThrowIfLongjmpPending();
         }
 
         void RunMain()
@@ -117,6 +143,7 @@ namespace DergwasmLoadModule
                 frame.Push(new Value { s32 = 0 }); // argc
                 frame.Push(new Value { s32 = 0 }); // argv
                 frame.InvokeFunc(machine, main);
+                machine.ThrowIfLongjmpPending();
             }
             catch (ExitTrap) { }
         }
@@ -149,6 +176,7 @@ namespace DergwasmLoadModule
                 frame.Label = new Label(1, 0);
                 frame.Push(new Value { s32 = stackPtr }); // source
                 frame.InvokeFunc(machine, mp_js_do_str);
+                machine.ThrowIfLongjmpPending();
             }
             catch (ExitTrap) { }
         }
@@ -167,6 +195,7 @@ namespace DergwasmLoadModule
                 frame.Label = new Label(1, 0);
                 frame.Push(new Value { s32 = stackSizeBytes });
                 frame.InvokeFunc(machine, mp_js_init);
+                machine.ThrowIfLongjmpPending();
             }
             catch (ExitTrap) { }
         }
@@ -184,9 +213,24 @@ namespace DergwasmLoadModule
 
         public static void Main(string[] args)
         {
-            if (args.Length < 1)
+            if (args.Length < 1 || (args.Length > 1 && (args.Length != 3 || args[1] != "--replay")))
             {
-                Console.WriteLine("Usage: LoadModule <filename>");
+                Console.WriteLine("Usage: LoadModule <filename> [--replay <host call trace>]");
+                return;
+            }
+            if (args.Length == 3)
+            {
+                Console.WriteLine($"Replaying '{args[2]}' against '{args[0]}'");
+                using (var trace = File.OpenRead(args[2]))
+                {
+                    Program replay = new Program(args[0], trace);
+                    Stopwatch stopwatch = Stopwatch.StartNew();
+                    replay.Replay();
+                    Console.WriteLine(
+                        $"Replayed {replay.replayer.Entries} entries and "
+                            + $"{replay.replayer.Calls} host calls in {stopwatch.Elapsed}"
+                    );
+                }
                 return;
             }
             Module.Debug = true;